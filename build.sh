@@ -29,7 +29,7 @@ build_cann() {
   echo "Create build directory and build CANN"
 
   mk_dir "${BUILD_PATH}/install/community/aicpu/cfg" > /dev/null
-  python scripts/parser_ini.py *.ini ${BUILD_PATH}/install/community/aicpu/cfg/aicpu_kernel.json
+  python scripts/parser_ini.py -j 0 -i -x *.ini ${BUILD_PATH}/install/community/aicpu/cfg/aicpu_kernel.json
 
   mk_dir "${CMAKE_HOST_PATH}"
   cd "${CMAKE_HOST_PATH}" && cmake  ../..
@@ -0,0 +1,331 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_UTILS_BINARY_ELEWISE_H
+#define AICPU_UTILS_BINARY_ELEWISE_H
+
+#include <algorithm>
+#include <complex>
+#include <cstdint>
+#include <type_traits>
+#include <vector>
+
+#include "cpu_kernel_utils.h"
+#include "unsupported/Eigen/CXX11/Tensor"
+#include "bcast.h"
+#include "broadcast_iterator.h"
+#include "kernel_util.h"
+#include "log.h"
+#include "parallel_cost_model.h"
+#include "status.h"
+
+/*
+ * Engine of binary elementwise kernels, out = Functor(x, y) with numpy broadcast.
+ *
+ * A kernel only names its functor and its data types, eg.
+ *   return BinaryElewiseKernelCompute<Eigen::internal::scalar_sum_op, float, double>(ctx);
+ * and the engine checks the tensors, dispatches on the data type, classifies the shapes,
+ * walks broadcasts by BroadcastIterator blocks, picks aligned or unaligned Eigen maps and shards the output
+ * by the plan of ParallelCostModel. The functor is an Eigen binary functor template, its
+ * packetOp makes every contiguous run vectorized.
+ *
+ * A functor of a type without packets, like Eigen::half, may name a wider type and the functor
+ * of it as WidenedType and WidenedFunctor. Runs are then converted by blocks into buffers of
+ * the wider type, computed there by packets and converted back.
+ *
+ * The output may be the buffer of an input of its own shape, so that the graph can reuse the
+ * input in place. Every element is read before it is written at the same position, by all the
+ * walks above. Any other overlap of the output and an input is rejected.
+ */
+namespace aicpu {
+template <typename T>
+struct ElewiseDataType;
+
+#define ELEWISE_DATA_TYPE(TYPE, DTYPE)                \
+  template <>                                         \
+  struct ElewiseDataType<TYPE> {                      \
+    static constexpr DataType value = (DTYPE);        \
+  };
+
+ELEWISE_DATA_TYPE(int8_t, DT_INT8)
+ELEWISE_DATA_TYPE(int16_t, DT_INT16)
+ELEWISE_DATA_TYPE(int32_t, DT_INT32)
+ELEWISE_DATA_TYPE(int64_t, DT_INT64)
+ELEWISE_DATA_TYPE(uint8_t, DT_UINT8)
+ELEWISE_DATA_TYPE(uint16_t, DT_UINT16)
+ELEWISE_DATA_TYPE(uint32_t, DT_UINT32)
+ELEWISE_DATA_TYPE(uint64_t, DT_UINT64)
+ELEWISE_DATA_TYPE(Eigen::half, DT_FLOAT16)
+ELEWISE_DATA_TYPE(float, DT_FLOAT)
+ELEWISE_DATA_TYPE(double, DT_DOUBLE)
+ELEWISE_DATA_TYPE(std::complex<float>, DT_COMPLEX64)
+ELEWISE_DATA_TYPE(std::complex<double>, DT_COMPLEX128)
+#undef ELEWISE_DATA_TYPE
+
+template <typename T>
+struct ElewiseVoid {
+  using type = void;
+};
+
+template <typename Functor, typename = void>
+struct ElewiseIsWidened : std::false_type {};
+
+template <typename Functor>
+struct ElewiseIsWidened<Functor, typename ElewiseVoid<typename Functor::WidenedType>::type> : std::true_type {};
+
+template <typename T, typename Functor>
+class BinaryElewiseEngine {
+ public:
+  explicit BinaryElewiseEngine(CpuKernelContext &ctx)
+      : ctx_(ctx),
+        x_(reinterpret_cast<const T *>(ctx.Input(kFirstInputIndex)->GetData())),
+        y_(reinterpret_cast<const T *>(ctx.Input(kSecondInputIndex)->GetData())),
+        out_(reinterpret_cast<T *>(ctx.Output(kFirstOutputIndex)->GetData())) {}
+
+  uint32_t Compute() {
+    Tensor *x = ctx_.Input(kFirstInputIndex);
+    Tensor *y = ctx_.Input(kSecondInputIndex);
+    Tensor *out = ctx_.Output(kFirstOutputIndex);
+    std::vector<int64_t> x_shape = x->GetTensorShape()->GetDimSizes();
+    std::vector<int64_t> y_shape = y->GetTensorShape()->GetDimSizes();
+    int64_t data_num = out->NumElements();
+
+    BcastShapeType type = BcastShapeType::DIFF_SHAPE;
+    if (x_shape == y_shape) {
+      type = BcastShapeType::SAME_SHAPE;
+    } else if (x->NumElements() == 1) {
+      type = BcastShapeType::X_ONE_ELEMENT;
+    } else if (y->NumElements() == 1) {
+      type = BcastShapeType::Y_ONE_ELEMENT;
+    } else {
+      KERNEL_HANDLE_ERROR(GetBroadcastShape(x_shape, y_shape, out_shape_),
+                          "[%s] Broadcast input shapes failed.", ctx_.GetOpType().c_str())
+      x_shape_ = x_shape;
+      y_shape_ = y_shape;
+    }
+    int64_t expect_num = std::max(x->NumElements(), y->NumElements());
+    if (type == BcastShapeType::DIFF_SHAPE) {
+      expect_num = 1;
+      for (int64_t dim : out_shape_) {
+        expect_num *= dim;
+      }
+    }
+    KERNEL_CHECK_FALSE((data_num == expect_num), KERNEL_STATUS_PARAM_INVALID,
+                       "[%s] Output elements [%lld] should be [%lld].", ctx_.GetOpType().c_str(),
+                       data_num, expect_num)
+    KERNEL_CHECK_FALSE((InplaceCheck(x_, x->NumElements(), data_num) && InplaceCheck(y_, y->NumElements(), data_num)),
+                       KERNEL_STATUS_PARAM_INVALID,
+                       "[%s] Output can only share the whole buffer of an input of the same shape.",
+                       ctx_.GetOpType().c_str())
+
+    bool aligned = (type != BcastShapeType::DIFF_SHAPE) && AddrAlignedCheck(x_) && AddrAlignedCheck(y_) &&
+                   AddrAlignedCheck(out_);
+    PartitionPlan plan = ParallelCostModel::Instance().GetPartitionPlan(
+        ctx_, ElewiseDataType<T>::value, type, data_num);
+    auto shard = [this, type, aligned](int64_t start, int64_t end) {
+      if (type == BcastShapeType::DIFF_SHAPE) {
+        BcastRange(start, end);
+      } else if (ElewiseIsWidened<Functor>::value) {
+        StepRange(type, start, end);
+      } else if (aligned && RangeAligned(type, start)) {
+        FlatRange<Eigen::Aligned>(type, start, end);
+      } else {
+        FlatRange<Eigen::Unaligned>(type, start, end);
+      }
+    };
+    if (!plan.IsParallel()) {
+      shard(0, data_num);
+      return KERNEL_STATUS_OK;
+    }
+    // shards of a multiple of the alignment start aligned, unless the sharder evens them out
+    int64_t shard_size = plan.shard_size;
+    if (aligned) {
+      int64_t align_num = std::max(static_cast<int64_t>(kEigenAlignmentBytes / sizeof(T)), int64_t{1});
+      shard_size = (shard_size + align_num - 1) / align_num * align_num;
+    }
+    KERNEL_HANDLE_ERROR(CpuKernelUtils::ParallelFor(ctx_, data_num, shard_size, shard),
+                        "[%s] Compute failed.", ctx_.GetOpType().c_str())
+    return KERNEL_STATUS_OK;
+  }
+
+ private:
+  // runs shorter than this are computed by the scalar functor
+  static constexpr int64_t kMinVectorRun = 16;
+  // elements of a widened block, two buffers of 2K floats stay in L1
+  static constexpr int64_t kWidenBlockNum = 2 * 1024;
+
+  // the output is either the same buffer as an input of data_num elements or apart from it
+  bool InplaceCheck(const T *input, int64_t input_num, int64_t data_num) const {
+    uintptr_t input_begin = reinterpret_cast<uintptr_t>(input);
+    uintptr_t out_begin = reinterpret_cast<uintptr_t>(out_);
+    if (input_begin == out_begin) {
+      return input_num == data_num;
+    }
+    return (input_begin + input_num * sizeof(T) <= out_begin) || (out_begin + data_num * sizeof(T) <= input_begin);
+  }
+
+  // the Eigen maps of a range are aligned only if the elements at its start are
+  bool RangeAligned(BcastShapeType type, int64_t start) const {
+    return AddrAlignedCheck(out_ + start) &&
+           ((type == BcastShapeType::X_ONE_ELEMENT) || AddrAlignedCheck(x_ + start)) &&
+           ((type == BcastShapeType::Y_ONE_ELEMENT) || AddrAlignedCheck(y_ + start));
+  }
+
+  template <int OPTION>
+  void FlatRange(BcastShapeType type, int64_t start, int64_t end) {
+    int64_t num = end - start;
+    Eigen::TensorMap<Eigen::Tensor<T, 1>, OPTION> out(out_ + start, num);
+    if (type == BcastShapeType::SAME_SHAPE) {
+      Eigen::TensorMap<Eigen::Tensor<const T, 1>, OPTION> x(x_ + start, num);
+      Eigen::TensorMap<Eigen::Tensor<const T, 1>, OPTION> y(y_ + start, num);
+      out = x.binaryExpr(y, functor_);
+    } else if (type == BcastShapeType::X_ONE_ELEMENT) {
+      Eigen::TensorMap<Eigen::Tensor<const T, 1>, OPTION> y(y_ + start, num);
+      out = y.constant(*x_).binaryExpr(y, functor_);
+    } else {
+      Eigen::TensorMap<Eigen::Tensor<const T, 1>, OPTION> x(x_ + start, num);
+      out = x.binaryExpr(x.constant(*y_), functor_);
+    }
+  }
+
+  // output [start, end) of the no broadcast types, by Run
+  void StepRange(BcastShapeType type, int64_t start, int64_t end) {
+    int64_t x_step = (type == BcastShapeType::X_ONE_ELEMENT) ? 0 : 1;
+    int64_t y_step = (type == BcastShapeType::Y_ONE_ELEMENT) ? 0 : 1;
+    Run(x_ + start * x_step, x_step, y_ + start * y_step, y_step, out_ + start, end - start);
+  }
+
+  // a contiguous run of output, each input either contiguous (step 1) or one element (step 0)
+  void Run(const T *x, int64_t x_step, const T *y, int64_t y_step, T *out, int64_t num) {
+    if (num < kMinVectorRun) {
+      for (int64_t i = 0; i < num; i++) {
+        out[i] = functor_(x[i * x_step], y[i * y_step]);
+      }
+      return;
+    }
+    VectorRun(x, x_step, y, y_step, out, num, ElewiseIsWidened<Functor>());
+  }
+
+  void VectorRun(const T *x, int64_t x_step, const T *y, int64_t y_step, T *out, int64_t num, std::true_type) {
+    using W = typename Functor::WidenedType;
+    typename Functor::WidenedFunctor widened_functor;
+    alignas(EIGEN_MAX_ALIGN_BYTES) W x_buffer[kWidenBlockNum];
+    alignas(EIGEN_MAX_ALIGN_BYTES) W y_buffer[kWidenBlockNum];
+    for (int64_t block_start = 0; block_start < num; block_start += kWidenBlockNum) {
+      int64_t block_num = std::min(kWidenBlockNum, num - block_start);
+      Eigen::TensorMap<Eigen::Tensor<W, 1>, Eigen::Aligned> x_widened(x_buffer, block_num);
+      Eigen::TensorMap<Eigen::Tensor<W, 1>, Eigen::Aligned> y_widened(y_buffer, block_num);
+      if (x_step != 0) {
+        Eigen::TensorMap<Eigen::Tensor<const T, 1>> x_map(x + block_start, block_num);
+        x_widened = x_map.template cast<W>();
+      } else {
+        x_widened.setConstant(static_cast<W>(*x));
+      }
+      if (y_step != 0) {
+        Eigen::TensorMap<Eigen::Tensor<const T, 1>> y_map(y + block_start, block_num);
+        y_widened = y_map.template cast<W>();
+      } else {
+        y_widened.setConstant(static_cast<W>(*y));
+      }
+      x_widened = x_widened.binaryExpr(y_widened, widened_functor);
+      Eigen::TensorMap<Eigen::Tensor<T, 1>> out_map(out + block_start, block_num);
+      out_map = x_widened.template cast<T>();
+    }
+  }
+
+  void VectorRun(const T *x, int64_t x_step, const T *y, int64_t y_step, T *out, int64_t num, std::false_type) {
+    Eigen::TensorMap<Eigen::Tensor<T, 1>> out_map(out, num);
+    Eigen::TensorMap<Eigen::Tensor<const T, 1>> x_map(x, num);
+    Eigen::TensorMap<Eigen::Tensor<const T, 1>> y_map(y, num);
+    if ((x_step != 0) && (y_step != 0)) {
+      out_map = x_map.binaryExpr(y_map, functor_);
+    } else if (x_step != 0) {
+      out_map = x_map.binaryExpr(x_map.constant(*y), functor_);
+    } else if (y_step != 0) {
+      out_map = y_map.constant(*x).binaryExpr(y_map, functor_);
+    } else {
+      out_map.setConstant(functor_(*x, *y));
+    }
+  }
+
+  // walk output [start, end) by runs of the innermost merged dimension
+  void BcastRange(int64_t start, int64_t end) {
+    std::vector<int64_t> x_shape = x_shape_;
+    std::vector<int64_t> y_shape = y_shape_;
+    std::vector<int64_t> out_shape = out_shape_;
+    BroadcastIterator iter(x_shape, y_shape, out_shape);
+    iter.SetPos(start);
+    for (int64_t pos = start; pos < end;) {
+      BroadcastBlock block = iter.NextBlock(end - pos);
+      Run(x_ + block.input_pos_a, block.stride_a, y_ + block.input_pos_b, block.stride_b, out_ + pos, block.length);
+      pos += block.length;
+    }
+  }
+
+  CpuKernelContext &ctx_;
+  const T *x_;
+  const T *y_;
+  T *out_;
+  Functor functor_;
+  std::vector<int64_t> x_shape_;
+  std::vector<int64_t> y_shape_;
+  std::vector<int64_t> out_shape_;
+};
+
+template <template <typename...> class Functor>
+uint32_t BinaryElewiseDispatch(CpuKernelContext &ctx, DataType dtype) {
+  KERNEL_LOG_ERROR("[%s] Data type of input is not support, input data type is [%s].",
+                   ctx.GetOpType().c_str(), DTypeStr(dtype).c_str());
+  return KERNEL_STATUS_PARAM_INVALID;
+}
+
+template <template <typename...> class Functor, typename T, typename... Ts>
+uint32_t BinaryElewiseDispatch(CpuKernelContext &ctx, DataType dtype) {
+  if (dtype == ElewiseDataType<T>::value) {
+    return BinaryElewiseEngine<T, Functor<T>>(ctx).Compute();
+  }
+  return BinaryElewiseDispatch<Functor, Ts...>(ctx, dtype);
+}
+
+/**
+ * @brief compute a binary elementwise kernel, out = Functor<T>(x, y)
+ * @param ctx cpu kernel context with two inputs and one output of the same data type
+ * @tparam Functor Eigen binary functor template, eg. Eigen::internal::scalar_sum_op
+ * @tparam Ts supported data types
+ * @return status code
+ */
+template <template <typename...> class Functor, typename... Ts>
+uint32_t BinaryElewiseKernelCompute(CpuKernelContext &ctx) {
+  KERNEL_HANDLE_ERROR(NormalMathCheck(ctx), "[%s] Check params failed.", ctx.GetOpType().c_str())
+  Tensor *x = ctx.Input(kFirstInputIndex);
+  Tensor *y = ctx.Input(kSecondInputIndex);
+  Tensor *out = ctx.Output(kFirstOutputIndex);
+  if ((x->NumElements() == 0) || (y->NumElements() == 0)) {
+    KERNEL_LOG_INFO("[%s] Input is empty tensor.", ctx.GetOpType().c_str());
+    return KERNEL_STATUS_OK;
+  }
+  KERNEL_CHECK_NULLPTR(x->GetData(), KERNEL_STATUS_PARAM_INVALID, "[%s] Get input[0] data failed",
+                       ctx.GetOpType().c_str())
+  KERNEL_CHECK_NULLPTR(y->GetData(), KERNEL_STATUS_PARAM_INVALID, "[%s] Get input[1] data failed",
+                       ctx.GetOpType().c_str())
+  KERNEL_CHECK_NULLPTR(out->GetData(), KERNEL_STATUS_PARAM_INVALID, "[%s] Get output data failed",
+                       ctx.GetOpType().c_str())
+  KERNEL_LOG_DEBUG("[%s] Input[0] data size is [%llu], input[1] data size is [%llu], output data size is [%llu].",
+                   ctx.GetOpType().c_str(), x->GetDataSize(), y->GetDataSize(), out->GetDataSize());
+  return BinaryElewiseDispatch<Functor, Ts...>(ctx, static_cast<DataType>(x->GetDataType()));
+}
+}  // namespace aicpu
+#endif  // AICPU_UTILS_BINARY_ELEWISE_H
@@ -25,6 +25,7 @@ BroadcastIterator::BroadcastIterator(std::vector<int64_t> &input_shape_a, std::v
       output_shape_(std::move(output_shape)) {
   output_dimension_ = output_shape_.size();  // Assign dimension to int for iterator
   BroadcastShape();
+  CoalesceShape();
   // Allocate strides memory
   input_strides_a_.resize(output_dimension_);
   input_strides_b_.resize(output_dimension_);
@@ -35,7 +36,9 @@ BroadcastIterator::BroadcastIterator(std::vector<int64_t> &input_shape_a, std::v
 }
 
 void BroadcastIterator::SetPos(int64_t pos) {
-  for (int i = output_dimension_ - 1; i >= 0 && pos != 0; --i) {
+  input_pos_[0] = 0;
+  input_pos_[1] = 0;
+  for (int i = output_dimension_ - 1; i >= 0; --i) {
     coordinates_[i] = pos % output_shape_[i];
     input_pos_[0] += coordinates_[i] * input_strides_a_[i];
     input_pos_[1] += coordinates_[i] * input_strides_b_[i];
@@ -59,6 +62,44 @@ void BroadcastIterator::GenNextPos() {
   }
 }
 
+BroadcastBlock BroadcastIterator::NextBlock(int64_t max_length) {
+  size_t inner = output_dimension_ - 1;
+  BroadcastBlock block;
+  block.input_pos_a = input_pos_[0];
+  block.input_pos_b = input_pos_[1];
+  block.length = std::min(output_shape_[inner] - coordinates_[inner], max_length);
+  block.stride_a = input_strides_a_[inner];
+  block.stride_b = input_strides_b_[inner];
+  Advance(block.length);
+  return block;
+}
+
+void BroadcastIterator::Advance(int64_t length) {
+  size_t inner = output_dimension_ - 1;
+  coordinates_[inner] += length;
+  input_pos_[0] += length * input_strides_a_[inner];
+  input_pos_[1] += length * input_strides_b_[inner];
+  if (coordinates_[inner] < output_shape_[inner]) {
+    return;
+  }
+  // the innermost dimension is done, step back to its start and carry
+  coordinates_[inner] = 0;
+  input_pos_[0] -= output_shape_[inner] * input_strides_a_[inner];
+  input_pos_[1] -= output_shape_[inner] * input_strides_b_[inner];
+  for (int i = static_cast<int>(inner) - 1; i >= 0; --i) {
+    if (coordinates_[i] + 1 == output_shape_[i]) {
+      coordinates_[i] = 0;
+      input_pos_[0] -= input_back_strides_a_[i];
+      input_pos_[1] -= input_back_strides_b_[i];
+    } else {
+      ++coordinates_[i];
+      input_pos_[0] += input_strides_a_[i];
+      input_pos_[1] += input_strides_b_[i];
+      break;
+    }
+  }
+}
+
 void BroadcastIterator::BroadcastShape() {
   size_t input_dimension_a = input_shape_a_.size();
   if (input_dimension_a < output_dimension_) {
@@ -71,14 +112,46 @@ void BroadcastIterator::BroadcastShape() {
   }
 }
 
+void BroadcastIterator::CoalesceShape() {
+  // drop output dimensions of 1, merge neighbours whose inputs are broadcast the same way
+  std::vector<int64_t> shape_a;
+  std::vector<int64_t> shape_b;
+  std::vector<int64_t> shape_out;
+  int32_t last_pattern = -1;
+  for (size_t i = 0; i < output_dimension_; ++i) {
+    if (output_shape_[i] == 1) {
+      continue;
+    }
+    int32_t pattern = ((input_shape_a_[i] == 1) ? 1 : 0) | ((input_shape_b_[i] == 1) ? 2 : 0);
+    if (pattern == last_pattern) {
+      shape_a.back() *= input_shape_a_[i];
+      shape_b.back() *= input_shape_b_[i];
+      shape_out.back() *= output_shape_[i];
+    } else {
+      shape_a.push_back(input_shape_a_[i]);
+      shape_b.push_back(input_shape_b_[i]);
+      shape_out.push_back(output_shape_[i]);
+      last_pattern = pattern;
+    }
+  }
+  // a scalar output is walked as one element
+  if (shape_out.empty()) {
+    shape_a.push_back(1);
+    shape_b.push_back(1);
+    shape_out.push_back(1);
+  }
+  input_shape_a_ = std::move(shape_a);
+  input_shape_b_ = std::move(shape_b);
+  output_shape_ = std::move(shape_out);
+  output_dimension_ = output_shape_.size();
+}
+
 void BroadcastIterator::InitStrides() {
   input_strides_a_[output_dimension_ - 1] = 1;
   input_strides_b_[output_dimension_ - 1] = 1;
   for (int i = output_dimension_ - 2; i >= 0; --i) {
     input_strides_a_[i] = input_shape_a_[i + 1] * input_strides_a_[i + 1];
     input_strides_b_[i] = input_shape_b_[i + 1] * input_strides_b_[i + 1];
-    input_back_strides_a_[i + 1] = (input_shape_a_[i + 1] - 1) * input_strides_a_[i + 1];
-    input_back_strides_b_[i + 1] = (input_shape_b_[i + 1] - 1) * input_strides_b_[i + 1];
   }
 
   // Update strides for broadcast
@@ -89,6 +162,10 @@ void BroadcastIterator::InitStrides() {
   (void)std::transform(
       input_strides_b_.begin(), input_strides_b_.end(), input_shape_b_.begin(), input_strides_b_.begin(),
       [](const int64_t &a, const int64_t &b) { return (b == 1) ? 0 : a; });
+  for (size_t i = 0; i < output_dimension_; ++i) {
+    input_back_strides_a_[i] = (output_shape_[i] - 1) * input_strides_a_[i];
+    input_back_strides_b_[i] = (output_shape_[i] - 1) * input_strides_b_[i];
+  }
 }
 
 uint32_t GetBroadcastShape(const std::vector<int64_t>& x, const std::vector<int64_t>& y,
@@ -17,12 +17,40 @@
 #define AICPU_UTILS_BROADCAST_ITERATOR_H
 
 #include <array>
+#include <cstddef>
 #include <cstdint>
 #include <vector>
 
 #include "status.h"
 
 namespace aicpu {
+/*
+ * a contiguous run of output, the i-th element of it reads input a at
+ * input_pos_a + i * stride_a and input b at input_pos_b + i * stride_b,
+ * a stride is 0 where the input is broadcast
+ */
+struct BroadcastBlock {
+  int64_t input_pos_a;
+  int64_t input_pos_b;
+  int64_t length;
+  int64_t stride_a;
+  int64_t stride_b;
+};
+
+/*
+ * Walks the output of a broadcast and gives the positions of both inputs.
+ * Adjacent output dimensions broadcast the same way are merged and dimensions of size 1 are
+ * dropped first, so [2, 3, 4] + [1, 1, 4] is walked as [6, 4] + [1, 4]. GenNextPos moves one
+ * element, NextBlock moves a whole run of the innermost merged dimension:
+ *   iter.SetPos(start);
+ *   for (int64_t pos = start; pos < end;) {
+ *     BroadcastBlock block = iter.NextBlock(end - pos);
+ *     for (int64_t i = 0; i < block.length; ++i) {
+ *       out[pos + i] = a[block.input_pos_a + i * block.stride_a] + b[block.input_pos_b + i * block.stride_b];
+ *     }
+ *     pos += block.length;
+ *   }
+ */
 class BroadcastIterator {
  public:
   BroadcastIterator(std::vector<int64_t> &input_shape_a, std::vector<int64_t> &input_shape_b,
@@ -31,7 +59,7 @@ class BroadcastIterator {
   inline int64_t GetInputPosA() const { return input_pos_[0]; }
   inline int64_t GetInputPosB() const { return input_pos_[1]; }
   /**
-   * @brief set broadcast start position
+   * @brief set broadcast start position, any position can be set at any time
    * @param broadcast start position
    */
   void SetPos(int64_t pos);
@@ -39,10 +67,23 @@ class BroadcastIterator {
    * @brief generate next position
    */
   void GenNextPos();
+  /**
+   * @brief get the run from the current position to the end of the innermost merged dimension,
+   *        at most max_length long, and move past it
+   * @param max_length most elements of the run
+   * @return the run
+   */
+  BroadcastBlock NextBlock(int64_t max_length);
+  /**
+   * @brief rank after merging dimensions
+   */
+  inline size_t GetCoalescedRank() const { return output_dimension_; }
 
  private:
   void BroadcastShape();
+  void CoalesceShape();
   void InitStrides();
+  void Advance(int64_t length);
 
   std::vector<int64_t> coordinates_;
   std::vector<int64_t> input_shape_a_;
@@ -0,0 +1,330 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*!
+ * \file format_transfer_plan.h
+ * \brief tables of the shape transfer between formats, applied to the dims of a shape in one pass on the stack
+ */
+#ifndef OPS_BUILT_IN_OP_PROTO_UTIL_FORMAT_TRANSFER_PLAN_H_
+#define OPS_BUILT_IN_OP_PROTO_UTIL_FORMAT_TRANSFER_PLAN_H_
+
+#include <cstddef>
+#include <cstdint>
+
+namespace ge {
+// shapes of a rank up to kTransferMaxRank take the plans, FRACTAL_NZ adds two dims to them
+const size_t kTransferMaxRank = 8;
+const size_t kTransferMaxNewRank = kTransferMaxRank + 2;
+// value of a factor that stands for the c0 of the data type
+const int32_t kTransferC0 = 0;
+// NI and the other side of the fractals
+const int32_t kTransferFractalSize = 16;
+const size_t kTransferFractalZ2DRank = 2;
+const size_t kTransferMinNzRank = 2;
+
+// the same order as AxisValueType of axis_util.h
+enum TransferAxis {
+  kTransferAxisN = 0,
+  kTransferAxisC,
+  kTransferAxisH,
+  kTransferAxisW,
+  kTransferAxisC1,
+  kTransferAxisC0,
+  kTransferAxisCo,
+  kTransferAxisNum
+};
+
+// original formats that have axis values
+enum TransferSrcLayout {
+  kTransferSrcNCHW = 0,
+  kTransferSrcNHWC,
+  kTransferSrcNC1HWC0,
+  kTransferSrcHWCN,
+  kTransferSrcND,
+  kTransferSrcC1HWNCoC0,
+  kTransferSrcNum
+};
+
+// current formats that have a new shape
+enum TransferDstLayout {
+  kTransferDstNCHW = 0,
+  kTransferDstNHWC,
+  kTransferDstNC1HWC0,
+  kTransferDstFractalZ,
+  kTransferDstHWCN,
+  kTransferDstC1HWNCoC0,
+  kTransferDstFractalNz,
+  kTransferDstNum
+};
+
+/*
+ * a factor of an axis value, DivisionCeiling(dims[dim], value), or value itself when dim is negative.
+ * a value of kTransferC0 is the c0 of the data type
+ */
+struct TransferFactor {
+  int8_t dim;
+  int32_t value;
+};
+
+// an axis value is the product of its factors, 1 without any
+struct TransferAxisRule {
+  uint8_t factor_num;
+  TransferFactor factors[2];
+};
+
+/*
+ * axis values of a shape of an original format and a rank, as AxisUtil::GetAxisValueByOriginFormat
+ * gets them. is_valid is false where it fails, then only FRACTAL_NZ takes a new shape
+ */
+struct TransferSourcePlan {
+  bool is_valid;
+  TransferAxisRule axes[kTransferAxisNum];
+};
+
+struct TransferSourcePlans {
+  TransferSourcePlan plans[kTransferSrcNum][kTransferMaxRank + 1];
+};
+
+enum TransferDstKind {
+  // the axis values of axes in order
+  kTransferPermute = 0,
+  // C1 * H * W, N / NI, NI, C0
+  kTransferFractalZ,
+  // the last two dims split into fractals of 16 x C0
+  kTransferFractalNz
+};
+
+/*
+ * new dims of a current format, as the Get*ShapeByAxisValue of ShapeTransferAccordingToFormat.
+ * split_2d: a shape of 2 dims splits its dims into fractals instead, as FRACTAL_Z does
+ */
+struct TransferDestPlan {
+  TransferDstKind kind;
+  bool split_2d;
+  uint8_t axis_num;
+  uint8_t axes[6];
+};
+
+// the plan of one original format, current format and data type, it applies to shapes of any rank
+struct FormatTransferPlan {
+  // one source plan for each rank from 0 to kTransferMaxRank
+  const TransferSourcePlan* source;
+  const TransferDestPlan* dest;
+  int64_t c0;
+};
+
+inline int64_t TransferDivisionCeiling(int64_t dividend, int64_t divisor) {
+  return (divisor == 0) ? 0 : (dividend + divisor - 1) / divisor;
+}
+
+inline TransferAxisRule TransferRule(TransferFactor first) {
+  TransferAxisRule rule = {1, {first, {-1, 1}}};
+  return rule;
+}
+
+inline TransferAxisRule TransferRule(TransferFactor first, TransferFactor second) {
+  TransferAxisRule rule = {2, {first, second}};
+  return rule;
+}
+
+inline TransferSourcePlans BuildTransferSourcePlans() {
+  // dims of N, C, H, W in the four dims layouts
+  const int8_t kNchwDims[] = {0, 1, 2, 3};
+  const int8_t kNhwcDims[] = {0, 3, 1, 2};
+  const int8_t kHwcnDims[] = {3, 2, 0, 1};
+  const TransferFactor kC0 = {-1, kTransferC0};
+  const size_t kFourDimsRank = 4;
+  const size_t kFiveDimsRank = 5;
+
+  TransferSourcePlans source_plans;
+  for (size_t layout = 0; layout < kTransferSrcNum; layout++) {
+    for (size_t rank = 0; rank <= kTransferMaxRank; rank++) {
+      TransferSourcePlan& plan = source_plans.plans[layout][rank];
+      plan.is_valid = true;
+      for (size_t axis = 0; axis < kTransferAxisNum; axis++) {
+        plan.axes[axis].factor_num = 0;
+      }
+      // a shape without dims keeps all axis values 1
+      if (rank == 0) {
+        continue;
+      }
+      const int8_t* nchw = nullptr;
+      if (layout == kTransferSrcNCHW || (layout == kTransferSrcND && rank == kFourDimsRank)) {
+        nchw = kNchwDims;
+      } else if (layout == kTransferSrcNHWC) {
+        nchw = kNhwcDims;
+      } else if (layout == kTransferSrcHWCN) {
+        nchw = kHwcnDims;
+      }
+
+      if (layout == kTransferSrcND && nchw == nullptr) {
+        plan.axes[kTransferAxisC0] = TransferRule(kC0);
+      } else if (layout == kTransferSrcNC1HWC0) {
+        // c0 is not set before the check of the dims
+        plan.is_valid = (rank >= kFourDimsRank);
+        if (!plan.is_valid) {
+          continue;
+        }
+        plan.axes[kTransferAxisN] = TransferRule({0, 1});
+        plan.axes[kTransferAxisH] = TransferRule({2, 1});
+        plan.axes[kTransferAxisW] = TransferRule({3, 1});
+        if (rank == kFiveDimsRank) {
+          plan.axes[kTransferAxisC1] = TransferRule({1, 1});
+          plan.axes[kTransferAxisC0] = TransferRule({4, 1});
+          plan.axes[kTransferAxisC] = TransferRule({1, 1}, {4, 1});
+        } else {
+          plan.axes[kTransferAxisC1] = TransferRule({1, kTransferC0});
+          plan.axes[kTransferAxisC0] = TransferRule(kC0);
+          plan.axes[kTransferAxisC] = TransferRule({1, 1});
+        }
+      } else if (layout == kTransferSrcC1HWNCoC0) {
+        // Co is the fifth dim
+        plan.axes[kTransferAxisC0] = TransferRule(kC0);
+        plan.is_valid = (rank >= kFiveDimsRank);
+        if (!plan.is_valid) {
+          continue;
+        }
+        plan.axes[kTransferAxisN] = TransferRule({3, 1});
+        plan.axes[kTransferAxisC] = TransferRule({0, 1}, kC0);
+        plan.axes[kTransferAxisH] = TransferRule({1, 1});
+        plan.axes[kTransferAxisW] = TransferRule({2, 1});
+        plan.axes[kTransferAxisC1] = TransferRule({0, 1});
+        plan.axes[kTransferAxisCo] = TransferRule({4, 1});
+      } else {
+        plan.axes[kTransferAxisC0] = TransferRule(kC0);
+        plan.is_valid = (rank >= kFourDimsRank);
+        if (!plan.is_valid) {
+          continue;
+        }
+        plan.axes[kTransferAxisN] = TransferRule({nchw[kTransferAxisN], 1});
+        plan.axes[kTransferAxisC] = TransferRule({nchw[kTransferAxisC], 1});
+        plan.axes[kTransferAxisH] = TransferRule({nchw[kTransferAxisH], 1});
+        plan.axes[kTransferAxisW] = TransferRule({nchw[kTransferAxisW], 1});
+        plan.axes[kTransferAxisC1] = TransferRule({nchw[kTransferAxisC], kTransferC0});
+        plan.axes[kTransferAxisCo] = TransferRule(kC0);
+      }
+    }
+  }
+  return source_plans;
+}
+
+/*
+ * @brief: plans of the axis values of an original format, built once
+ * @return const TransferSourcePlan*: one plan for each rank from 0 to kTransferMaxRank
+ */
+inline const TransferSourcePlan* GetTransferSourcePlans(TransferSrcLayout layout) {
+  static const TransferSourcePlans source_plans = BuildTransferSourcePlans();
+  return source_plans.plans[layout];
+}
+
+/*
+ * @brief: plan of the new dims of a current format
+ * @param [in] is_tbe: the op is a tbe op, NC1HWC0 and FRACTAL_Z keep four dims otherwise
+ */
+inline const TransferDestPlan* GetTransferDestPlan(TransferDstLayout layout, bool is_tbe) {
+  static const TransferDestPlan dest_plans[kTransferDstNum][2] = {
+      {{kTransferPermute, false, 4, {kTransferAxisN, kTransferAxisC, kTransferAxisH, kTransferAxisW}},
+       {kTransferPermute, false, 4, {kTransferAxisN, kTransferAxisC, kTransferAxisH, kTransferAxisW}}},
+      {{kTransferPermute, false, 4, {kTransferAxisN, kTransferAxisH, kTransferAxisW, kTransferAxisC}},
+       {kTransferPermute, false, 4, {kTransferAxisN, kTransferAxisH, kTransferAxisW, kTransferAxisC}}},
+      {{kTransferPermute, false, 4, {kTransferAxisN, kTransferAxisC, kTransferAxisH, kTransferAxisW}},
+       {kTransferPermute, false, 5,
+        {kTransferAxisN, kTransferAxisC1, kTransferAxisH, kTransferAxisW, kTransferAxisC0}}},
+      {{kTransferPermute, true, 4, {kTransferAxisN, kTransferAxisC, kTransferAxisH, kTransferAxisW}},
+       {kTransferFractalZ, true, 0, {}}},
+      {{kTransferPermute, false, 4, {kTransferAxisH, kTransferAxisW, kTransferAxisC, kTransferAxisN}},
+       {kTransferPermute, false, 4, {kTransferAxisH, kTransferAxisW, kTransferAxisC, kTransferAxisN}}},
+      {{kTransferPermute, false, 6,
+        {kTransferAxisC1, kTransferAxisH, kTransferAxisW, kTransferAxisN, kTransferAxisCo, kTransferAxisC0}},
+       {kTransferPermute, false, 6,
+        {kTransferAxisC1, kTransferAxisH, kTransferAxisW, kTransferAxisN, kTransferAxisCo, kTransferAxisC0}}},
+      {{kTransferFractalNz, false, 0, {}}, {kTransferFractalNz, false, 0, {}}}};
+  return &dest_plans[layout][is_tbe ? 1 : 0];
+}
+
+inline FormatTransferPlan GetFormatTransferPlan(TransferSrcLayout src_layout, TransferDstLayout dst_layout,
+                                                int64_t c0, bool is_tbe) {
+  FormatTransferPlan plan = {GetTransferSourcePlans(src_layout), GetTransferDestPlan(dst_layout, is_tbe), c0};
+  return plan;
+}
+
+/*
+ * @brief: new dims of a shape, the same as ShapeTransferAccordingToFormat gets them from the axis values
+ * @param [in] dims: dims of the shape, rank up to kTransferMaxRank
+ * @param [out] new_dims: kTransferMaxNewRank dims at least
+ * @param [out] c: axis value C, set whenever the current format takes the axis values, may be nullptr
+ * @return bool: false when the shape keeps its dims
+ */
+inline bool ApplyFormatTransferPlan(const FormatTransferPlan& plan, const int64_t* dims, size_t rank,
+                                    int64_t* new_dims, size_t& new_rank, int64_t* c) {
+  const TransferSourcePlan& source = plan.source[rank];
+  const TransferDestPlan& dest = *plan.dest;
+  if (!source.is_valid && dest.kind != kTransferFractalNz) {
+    return false;
+  }
+  int64_t axes[kTransferAxisNum];
+  for (size_t axis = 0; axis < kTransferAxisNum; axis++) {
+    const TransferAxisRule& rule = source.axes[axis];
+    int64_t value = 1;
+    for (uint8_t i = 0; i < rule.factor_num; i++) {
+      const TransferFactor& factor = rule.factors[i];
+      int64_t factor_value = (factor.value == kTransferC0) ? plan.c0 : factor.value;
+      if (factor.dim >= 0) {
+        factor_value = (factor_value == 1) ? dims[factor.dim] : TransferDivisionCeiling(dims[factor.dim], factor_value);
+      }
+      value *= factor_value;
+    }
+    axes[axis] = value;
+  }
+  if (c != nullptr) {
+    *c = axes[kTransferAxisC];
+  }
+
+  int64_t c0 = axes[kTransferAxisC0];
+  if (dest.kind == kTransferFractalNz) {
+    if (rank < kTransferMinNzRank) {
+      return false;
+    }
+    for (size_t i = 0; i + kTransferMinNzRank < rank; i++) {
+      new_dims[i] = dims[i];
+    }
+    new_dims[rank - 2] = TransferDivisionCeiling(dims[rank - 1], c0);
+    new_dims[rank - 1] = TransferDivisionCeiling(dims[rank - 2], kTransferFractalSize);
+    new_dims[rank] = kTransferFractalSize;
+    new_dims[rank + 1] = c0;
+    new_rank = rank + 2;
+  } else if (dest.split_2d && rank == kTransferFractalZ2DRank) {
+    new_dims[0] = TransferDivisionCeiling(dims[0], c0);
+    new_dims[1] = TransferDivisionCeiling(dims[1], kTransferFractalSize);
+    new_dims[2] = kTransferFractalSize;
+    new_dims[3] = c0;
+    new_rank = 4;
+  } else if (dest.kind == kTransferFractalZ) {
+    new_dims[0] = axes[kTransferAxisC1] * axes[kTransferAxisH] * axes[kTransferAxisW];
+    new_dims[1] = TransferDivisionCeiling(axes[kTransferAxisN], kTransferFractalSize);
+    new_dims[2] = kTransferFractalSize;
+    new_dims[3] = c0;
+    new_rank = 4;
+  } else {
+    for (uint8_t i = 0; i < dest.axis_num; i++) {
+      new_dims[i] = axes[dest.axes[i]];
+    }
+    new_rank = dest.axis_num;
+  }
+  return true;
+}
+}  // namespace ge
+#endif  // OPS_BUILT_IN_OP_PROTO_UTIL_FORMAT_TRANSFER_PLAN_H_
@@ -0,0 +1,226 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "parallel_cost_model.h"
+
+#include <algorithm>
+#include <cstdlib>
+#include <fstream>
+#include <sstream>
+#include <vector>
+
+#include "cpu_kernel_utils.h"
+#include "kernel_util.h"
+#include "log.h"
+
+namespace aicpu {
+namespace {
+const char *const kProfileEnv = "AICPU_PARALLEL_COST_PROFILE";
+const char *const kAnyKey = "*";
+const int32_t kAnyDataType = static_cast<int32_t>(DT_UNDEFINED);
+const int32_t kAnyBcastShapeType = -1;
+
+const std::map<std::string, BcastShapeType> kBcastShapeTypeMap = {
+    {"same_shape", BcastShapeType::SAME_SHAPE},
+    {"x_one_element", BcastShapeType::X_ONE_ELEMENT},
+    {"y_one_element", BcastShapeType::Y_ONE_ELEMENT},
+    {"diff_shape", BcastShapeType::DIFF_SHAPE},
+};
+
+// data types of the elementwise kernels and their sizes, for thresholds given in bytes
+const std::vector<std::pair<DataType, int64_t>> kDataTypeSizes = {
+    {DT_INT8, 1}, {DT_UINT8, 1}, {DT_INT16, 2}, {DT_UINT16, 2}, {DT_FLOAT16, 2},
+    {DT_INT32, 4}, {DT_UINT32, 4}, {DT_FLOAT, 4}, {DT_INT64, 8}, {DT_UINT64, 8},
+    {DT_DOUBLE, 8}, {DT_COMPLEX64, 8}, {DT_COMPLEX128, 16},
+};
+
+const std::vector<BcastShapeType> kNoBcastShapeTypes = {
+    BcastShapeType::SAME_SHAPE, BcastShapeType::X_ONE_ELEMENT, BcastShapeType::Y_ONE_ELEMENT};
+
+// used when neither a profile nor a built-in line matches
+const ParallelCost kDefaultCost = {16 * 1024, 0, 0, 4 * 1024, 2};
+
+int64_t CeilDiv(int64_t value, int64_t factor) {
+  return (value + factor - 1) / factor;
+}
+}  // namespace
+
+ParallelCostModel &ParallelCostModel::Instance() {
+  static ParallelCostModel instance;
+  return instance;
+}
+
+ParallelCostModel::ParallelCostModel() {
+  // Sub, counted in elements whatever the dtype
+  for (auto type : kNoBcastShapeTypes) {
+    SetCost("Sub", DT_UNDEFINED, type, {7 * 1024, 35 * 1024, 4, 1, 2});
+  }
+  SetCost("Sub", DT_UNDEFINED, BcastShapeType::DIFF_SHAPE, {2 * 1024, 16 * 1024, 4, 1, 2});
+  // Add, Tanh and AddTanh, counted in bytes
+  for (const auto &dtype_size : kDataTypeSizes) {
+    DataType dtype = dtype_size.first;
+    int64_t size = dtype_size.second;
+    for (auto type : kNoBcastShapeTypes) {
+      SetCost("Add", dtype, type, {64 * 1024 / size, 0, 0, std::max(8 * 1024 / size, int64_t{1}), 2});
+    }
+    SetCost("Add", dtype, BcastShapeType::DIFF_SHAPE,
+            {16 * 1024 / size, 0, 0, std::max(8 * 1024 / size, int64_t{1}), 2});
+    SetCost("Tanh", dtype, BcastShapeType::SAME_SHAPE, {128 * 1024 / size + 1, 0, 0, 1, 2});
+    // AddTanh costs as much as Tanh per element, whatever the broadcast
+    for (auto type : kNoBcastShapeTypes) {
+      SetCost("AddTanh", dtype, type, {128 * 1024 / size + 1, 0, 0, 1, 2});
+    }
+    SetCost("AddTanh", dtype, BcastShapeType::DIFF_SHAPE, {128 * 1024 / size + 1, 0, 0, 1, 2});
+  }
+
+  const char *profile = std::getenv(kProfileEnv);
+  if ((profile != nullptr) && (profile[0] != '\0')) {
+    if (LoadProfile(profile) != KERNEL_STATUS_OK) {
+      KERNEL_LOG_WARN("Load parallel cost profile [%s] failed, use built-in thresholds.", profile);
+    }
+  }
+}
+
+bool ParallelCostModel::ParseBcastShapeType(const std::string &str, BcastShapeType &type) {
+  auto iter = kBcastShapeTypeMap.find(str);
+  if (iter == kBcastShapeTypeMap.end()) {
+    return false;
+  }
+  type = iter->second;
+  return true;
+}
+
+std::string ParallelCostModel::BcastShapeTypeStr(BcastShapeType type) {
+  for (const auto &item : kBcastShapeTypeMap) {
+    if (item.second == type) {
+      return item.first;
+    }
+  }
+  return kAnyKey;
+}
+
+uint32_t ParallelCostModel::LoadProfile(const std::string &path) {
+  std::ifstream file(path);
+  if (!file.is_open()) {
+    KERNEL_LOG_ERROR("Open parallel cost profile [%s] failed.", path.c_str());
+    return KERNEL_STATUS_PARAM_INVALID;
+  }
+  std::vector<std::pair<CostKey, ParallelCost>> lines;
+  std::string line;
+  int32_t line_no = 0;
+  while (std::getline(file, line)) {
+    line_no++;
+    std::istringstream fields(line);
+    std::string op_type;
+    if (!(fields >> op_type) || op_type[0] == '#') {
+      continue;
+    }
+    std::string dtype_str;
+    std::string type_str;
+    ParallelCost cost;
+    if (!(fields >> dtype_str >> type_str >> cost.parallel_data_num >> cost.mid_data_num >> cost.mid_core_num >>
+          cost.min_shard_data_num >> cost.reserved_core_num)) {
+      KERNEL_LOG_ERROR("Parallel cost profile [%s] line [%d] is malformed.", path.c_str(), line_no);
+      return KERNEL_STATUS_PARAM_INVALID;
+    }
+    int32_t dtype = kAnyDataType;
+    if (dtype_str != kAnyKey) {
+      dtype = static_cast<int32_t>(DType(dtype_str));
+      if (dtype == kAnyDataType) {
+        KERNEL_LOG_ERROR("Parallel cost profile [%s] line [%d] has unknown dtype [%s].", path.c_str(), line_no,
+                         dtype_str.c_str());
+        return KERNEL_STATUS_PARAM_INVALID;
+      }
+    }
+    int32_t type = kAnyBcastShapeType;
+    BcastShapeType bcast_type;
+    if (type_str != kAnyKey) {
+      if (!ParseBcastShapeType(type_str, bcast_type)) {
+        KERNEL_LOG_ERROR("Parallel cost profile [%s] line [%d] has unknown broadcast type [%s].", path.c_str(),
+                         line_no, type_str.c_str());
+        return KERNEL_STATUS_PARAM_INVALID;
+      }
+      type = static_cast<int32_t>(bcast_type);
+    }
+    if ((cost.parallel_data_num < 0) || (cost.mid_data_num < 0) || (cost.min_shard_data_num < 1)) {
+      KERNEL_LOG_ERROR("Parallel cost profile [%s] line [%d] has invalid thresholds.", path.c_str(), line_no);
+      return KERNEL_STATUS_PARAM_INVALID;
+    }
+    lines.emplace_back(CostKey(op_type == kAnyKey ? "" : op_type, dtype, type), cost);
+  }
+
+  // a malformed profile changes nothing
+  for (const auto &item : lines) {
+    costs_[item.first] = item.second;
+  }
+  KERNEL_LOG_INFO("Load [%zu] lines of parallel cost profile [%s].", lines.size(), path.c_str());
+  return KERNEL_STATUS_OK;
+}
+
+void ParallelCostModel::SetCost(const std::string &op_type, DataType dtype, BcastShapeType type,
+                                const ParallelCost &cost) {
+  costs_[CostKey(op_type, static_cast<int32_t>(dtype), static_cast<int32_t>(type))] = cost;
+}
+
+bool ParallelCostModel::FindCost(const CostKey &key, ParallelCost &cost) const {
+  auto iter = costs_.find(key);
+  if (iter == costs_.end()) {
+    return false;
+  }
+  cost = iter->second;
+  return true;
+}
+
+ParallelCost ParallelCostModel::GetCost(const std::string &op_type, DataType dtype, BcastShapeType type) const {
+  int32_t dtype_key = static_cast<int32_t>(dtype);
+  int32_t type_key = static_cast<int32_t>(type);
+  const CostKey candidates[] = {
+      CostKey(op_type, dtype_key, type_key),     CostKey(op_type, kAnyDataType, type_key),
+      CostKey(op_type, dtype_key, kAnyBcastShapeType), CostKey(op_type, kAnyDataType, kAnyBcastShapeType),
+      CostKey("", dtype_key, type_key),          CostKey("", kAnyDataType, type_key),
+      CostKey("", dtype_key, kAnyBcastShapeType),  CostKey("", kAnyDataType, kAnyBcastShapeType),
+  };
+  ParallelCost cost;
+  for (const auto &key : candidates) {
+    if (FindCost(key, cost)) {
+      return cost;
+    }
+  }
+  return kDefaultCost;
+}
+
+PartitionPlan ParallelCostModel::GetPartitionPlan(const CpuKernelContext &ctx, DataType dtype, BcastShapeType type,
+                                                  int64_t data_num) const {
+  return GetPartitionPlan(ctx.GetOpType(), dtype, type, data_num, CpuKernelUtils::GetCPUNum(ctx));
+}
+
+PartitionPlan ParallelCostModel::GetPartitionPlan(const std::string &op_type, DataType dtype, BcastShapeType type,
+                                                  int64_t data_num, uint32_t cpu_num) const {
+  PartitionPlan plan = {data_num, 1};
+  ParallelCost cost = GetCost(op_type, dtype, type);
+  if ((data_num <= 1) || (data_num < cost.parallel_data_num)) {
+    return plan;
+  }
+  int64_t core_num = cpu_num > cost.reserved_core_num ? static_cast<int64_t>(cpu_num - cost.reserved_core_num) : 1;
+  if ((cost.mid_data_num > 0) && (data_num <= cost.mid_data_num) && (cost.mid_core_num > 0)) {
+    core_num = std::min(core_num, static_cast<int64_t>(cost.mid_core_num));
+  }
+  core_num = std::min(core_num, std::max(data_num / std::max(cost.min_shard_data_num, int64_t{1}), int64_t{1}));
+  plan.shard_size = CeilDiv(data_num, core_num);
+  plan.shard_num = static_cast<uint32_t>(CeilDiv(data_num, plan.shard_size));
+  return plan;
+}
+}  // namespace aicpu
@@ -0,0 +1,126 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_UTILS_PARALLEL_COST_MODEL_H
+#define AICPU_UTILS_PARALLEL_COST_MODEL_H
+
+#include <cstdint>
+#include <map>
+#include <string>
+#include <tuple>
+
+#include "cpu_context.h"
+#include "cpu_types.h"
+#include "bcast.h"
+
+namespace aicpu {
+/*
+ * thresholds of one (op, dtype, broadcast type), counted in elements of the output
+ */
+struct ParallelCost {
+  // below this the kernel runs on one core
+  int64_t parallel_data_num;
+  // up to this at most mid_core_num cores are used, 0 disables the limit
+  int64_t mid_data_num;
+  uint32_t mid_core_num;
+  // least elements of one shard, so that a shard pays for its dispatch
+  int64_t min_shard_data_num;
+  // cores left to the other tasks of the aicpu
+  uint32_t reserved_core_num;
+};
+
+/*
+ * how a kernel splits its output, shard_num is 1 when it runs serially
+ */
+struct PartitionPlan {
+  int64_t shard_size;
+  uint32_t shard_num;
+  bool IsParallel() const { return shard_num > 1; }
+};
+
+/*
+ * Cost model deciding the serial/parallel cutoff and the shard count of elementwise kernels.
+ *
+ * Built-in thresholds keep the kernels' previous behaviour. A profile generated by
+ * tests/benchmark/parallel_cost_model_calibrate on the target host replaces them, it is
+ * read from the file named by the environment variable AICPU_PARALLEL_COST_PROFILE
+ * when the model is built at first use. Every line of a profile is
+ *   <op type|*> <dtype|*> <broadcast type|*> parallel_data_num mid_data_num mid_core_num
+ *   min_shard_data_num reserved_core_num
+ * with dtype like DT_FLOAT and broadcast type one of same_shape, x_one_element,
+ * y_one_element, diff_shape. Empty lines and lines starting with # are skipped.
+ * A lookup prefers the most specific line: exact, any dtype, any op, then any of both.
+ * The thresholds are not changed once the model is built, so lookups take no lock.
+ */
+class ParallelCostModel {
+ public:
+  static ParallelCostModel &Instance();
+
+  /**
+   * @brief get thresholds of an (op, dtype, broadcast type)
+   */
+  ParallelCost GetCost(const std::string &op_type, DataType dtype, BcastShapeType type) const;
+
+  /**
+   * @brief split data_num elements of output
+   * @param ctx cpu kernel context, gives the cpu number
+   * @param dtype data type of the output
+   * @param type broadcast type of the inputs, unary ops use SAME_SHAPE
+   * @param data_num elements of output
+   * @return partition plan
+   */
+  PartitionPlan GetPartitionPlan(const CpuKernelContext &ctx, DataType dtype, BcastShapeType type,
+                                 int64_t data_num) const;
+
+  /**
+   * @brief split data_num elements of output on cpu_num cores
+   */
+  PartitionPlan GetPartitionPlan(const std::string &op_type, DataType dtype, BcastShapeType type,
+                                 int64_t data_num, uint32_t cpu_num) const;
+
+  /**
+   * @brief parse and print broadcast types as they are written in profiles
+   */
+  static bool ParseBcastShapeType(const std::string &str, BcastShapeType &type);
+  static std::string BcastShapeTypeStr(BcastShapeType type);
+
+ private:
+  ParallelCostModel();
+  ~ParallelCostModel() = default;
+  ParallelCostModel(const ParallelCostModel &) = delete;
+  ParallelCostModel &operator=(const ParallelCostModel &) = delete;
+
+  /**
+   * @brief load thresholds from a profile, lines of it replace the ones of the same key
+   * @param path profile file
+   * @return status code
+   */
+  uint32_t LoadProfile(const std::string &path);
+
+  /**
+   * @brief set thresholds of one key, empty op type or DT_UNDEFINED match any
+   */
+  void SetCost(const std::string &op_type, DataType dtype, BcastShapeType type,
+               const ParallelCost &cost);
+
+  using CostKey = std::tuple<std::string, int32_t, int32_t>;
+  bool FindCost(const CostKey &key, ParallelCost &cost) const;
+
+  // filled by the constructor only, read without a lock afterwards
+  std::map<CostKey, ParallelCost> costs_;
+};
+}  // namespace aicpu
+#endif  // AICPU_UTILS_PARALLEL_COST_MODEL_H
@@ -0,0 +1,130 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*!
+ * \file small_shape.h
+ * \brief shape and range of a few dims kept on the stack, and the broadcast of N of them in one pass
+ */
+#ifndef OPS_BUILT_IN_OP_PROTO_UTIL_SMALL_SHAPE_H_
+#define OPS_BUILT_IN_OP_PROTO_UTIL_SMALL_SHAPE_H_
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <utility>
+
+namespace ge {
+/*
+ * dims and their ranges of a shape of rank up to kMaxRank, an unknown dim is -1 and its range
+ * is (min, max) with -1 as an unbounded max, a known dim d has the range (d, d)
+ */
+struct SmallShape {
+  static constexpr size_t kMaxRank = 8;
+  size_t rank = 0;
+  int64_t dims[kMaxRank];
+  std::pair<int64_t, int64_t> ranges[kMaxRank];
+
+  bool IsUnknown() const {
+    return std::find(dims, dims + rank, -1) != dims + rank;
+  }
+};
+
+/*
+ * @brief: range of a broadcast unknown dim, the same as InferShapeRangeTwoInOneOutBroadcast
+ */
+inline std::pair<int64_t, int64_t> BroadcastDimRange(const std::pair<int64_t, int64_t>& range_x,
+                                                     const std::pair<int64_t, int64_t>& range_y) {
+  // first_range == max first
+  int64_t first_range = (range_x.first * range_y.first == 0) ? 0 : std::max(range_x.first, range_y.first);
+  if (range_x.second * range_y.second == -1) {
+    return std::make_pair(first_range, int64_t{-1});
+  }
+  if (range_x.first == 1 && range_y.first == 1) {
+    int64_t second_range =
+        (range_x.second == -1 || range_y.second == -1) ? -1 : std::max(range_x.second, range_y.second);
+    return std::make_pair(first_range, second_range);
+  }
+  if (range_x.first == 1 || range_y.first == 1) {
+    // one shape size maybe 1, so will support broadcast
+    return std::make_pair(first_range, range_x.first == 1 ? range_y.second : range_x.second);
+  }
+  // no 1 in range.first, mean no broadcast for range, get intersect range
+  int64_t second_range = (range_x.second == -1 || range_y.second == -1) ? std::max(range_x.second, range_y.second)
+                                                                        : std::min(range_x.second, range_y.second);
+  return std::make_pair(first_range, second_range);
+}
+
+/*
+ * @brief: broadcast one pair of dims
+ * static shapes take the max dim, or 0 if one of them is 0, as InferBroadcastshapeForStatic.
+ * dynamic shapes check the broadcast rule and keep -1 unless the other dim is larger than 1,
+ * as the dynamic case of InferShapeAndTypeTwoInOneOutBroadcast
+ * @return bool: false when the dims do not match the broadcast rule
+ */
+inline bool BroadcastDim(int64_t dim_x, int64_t dim_y, bool is_static, int64_t& dim_out) {
+  if (is_static || ((dim_x != -1) && (dim_y != -1))) {
+    if (!is_static && (dim_x != dim_y) && (dim_x != 1) && (dim_y != 1)) {
+      return false;
+    }
+    dim_out = (dim_x == 0 || dim_y == 0) ? 0 : std::max(dim_x, dim_y);
+  } else if (dim_x == -1) {
+    dim_out = dim_y > 1 ? dim_y : -1;
+  } else {
+    dim_out = dim_x > 1 ? dim_x : -1;
+  }
+  return true;
+}
+
+/*
+ * @brief: broadcast input_num shapes into output in one pass over the dims, shorter shapes are
+ *         aligned on their last dims and padded with dims of 1
+ * @param [in] inputs: input shapes, at least one
+ * @param [in] input_num: number of inputs
+ * @param [out] output: broadcast shape, with the range (d, d) for a known dim d
+ * @param [out] mismatch_dim: dim of output that does not match the broadcast rule when it fails
+ * @return bool: false when the shapes do not match the broadcast rule
+ */
+inline bool BroadcastSmallShapes(const SmallShape* inputs, size_t input_num, SmallShape& output,
+                                 size_t& mismatch_dim) {
+  bool is_static = true;
+  output.rank = 0;
+  for (size_t i = 0; i < input_num; i++) {
+    output.rank = std::max(output.rank, inputs[i].rank);
+    is_static = is_static && !inputs[i].IsUnknown();
+  }
+  for (size_t d = 0; d < output.rank; d++) {
+    // a dim of 1 and its range (1, 1) broadcast to the dim and range of any input
+    int64_t dim = 1;
+    std::pair<int64_t, int64_t> range(1, 1);
+    for (size_t i = 0; i < input_num; i++) {
+      const SmallShape& input = inputs[i];
+      if (d + input.rank < output.rank) {
+        continue;
+      }
+      size_t input_d = d + input.rank - output.rank;
+      if (!BroadcastDim(dim, input.dims[input_d], is_static, dim)) {
+        mismatch_dim = d;
+        return false;
+      }
+      range = BroadcastDimRange(range, input.ranges[input_d]);
+    }
+    output.dims[d] = dim;
+    output.ranges[d] = (dim == -1) ? range : std::make_pair(dim, dim);
+  }
+  return true;
+}
+}  // namespace ge
+#endif  // OPS_BUILT_IN_OP_PROTO_UTIL_SMALL_SHAPE_H_
@@ -18,6 +18,7 @@
 #define AICPU_SPARSETENSOR_H
 
 #include <algorithm>
+#include <atomic>
 #include <memory>
 
 #include "cpu_tensor.h"
@@ -25,6 +26,7 @@
 #include "kernel_util.h"
 #include "cpu_kernel_utils.h"
 #include "log.h"
+#include "parallel_cost_model.h"
 #include "sparse_group.h"
 #include "status.h"
 
@@ -187,54 +189,6 @@ class SparseTensor {
    */
   bool ValidateToDense(const Tensor *out) const;
   
-  /*
-   * sparse tensor to dense tensor
-   * @param output: output tensor
-   * @return uint32_t: 0->success other->failed
-   */
-  template <typename IndiceT, typename ValueT>
-  uint32_t ToDenseParallel(const CpuKernelContext &ctx, Tensor *output) {
-    EigenTensor outputET(output, output->GetData());
-    auto output_t = outputET.flat<ValueT>();
-    auto ix_t = ix_->matrix<IndiceT>();
-    std::vector<int64_t> strides(dims_);
-    const auto &out_shape = output->GetTensorShape();
-    if (dims_ > 0) {
-      strides[dims_ - 1] = 1;
-    }
-    for (int32_t d = dims_ - 2; d >= 0; --d) {
-      strides[d] = strides[d + 1] * out_shape->GetDimSize(d + 1);
-    }
-    auto vals_t = vals_->vec<ValueT>();
-    int64_t vals_size = vals_t.dimension(0);
-    uint32_t min_core_num = 1;
-    int64_t max_core_num = std::max(min_core_num, aicpu::CpuKernelUtils::GetCPUNum(ctx) - kResvCpuNum);
-    uint32_t result = static_cast<uint32_t>(KERNEL_STATUS_OK);
-    auto parallel_proc = [&](std::int64_t begin, std::int64_t end) {
-      for (int64_t n = begin; n < end; ++n) {
-        bool invalid_dims = false;
-        int64_t ix = 0;
-        for (int d = 0; d < dims_; ++d) {
-          const int64_t ix_n_d = ix_t(n, d);
-          if (ix_n_d > out_shape->GetDimSize(d)) {
-            invalid_dims = true;
-          }
-          ix += strides[d] * ix_n_d;
-        }
-        if (invalid_dims) {
-          result = static_cast<uint32_t>(KERNEL_STATUS_INNER_ERROR);
-          KERNEL_LOG_ERROR("Sparse to dense got invalid dims.");
-          return;
-        }
-        output_t(ix) = vals_t(n);
-      }
-      return;
-    };
-    KERNEL_HANDLE_ERROR(aicpu::CpuKernelUtils::ParallelFor(ctx, vals_size, vals_size / max_core_num, parallel_proc),
-                        "SparseToDense Compute failed.")
-    return result;
-  }
-
   /*
    * sparse tensor to dense tensor
    * @param output: output tensor
@@ -251,43 +205,102 @@ class SparseTensor {
       KERNEL_LOG_ERROR("Validate to dense param failed.");
       return KERNEL_STATUS_INNER_ERROR;
     }
-    auto vals_t = vals_->vec<ValueT>();
-    int64_t vals_size = vals_t.dimension(0);
-    const int64_t paralled_data_size = 16 *1024;
-    if (vals_size >= paralled_data_size) {
-      return ToDenseParallel<IndiceT, ValueT>(ctx, output);
-    }
-    EigenTensor outputET(output, output->GetData());
-    auto output_t = outputET.flat<ValueT>();
-    auto ix_t = ix_->matrix<IndiceT>();
-    std::vector<int64_t> strides(dims_);
+    // dims and strides of the output are taken once, not for every value
     const auto &out_shape = output->GetTensorShape();
-    if (dims_ > 0) {
-      strides[dims_ - 1] = 1;
+    std::vector<int64_t> dim_sizes(dims_);
+    std::vector<int64_t> strides(dims_);
+    int64_t stride = 1;
+    for (int32_t d = dims_ - 1; d >= 0; --d) {
+      dim_sizes[d] = out_shape->GetDimSize(d);
+      strides[d] = stride;
+      stride *= dim_sizes[d];
     }
-    for (int32_t d = dims_ - 2; d >= 0; --d) {
-      strides[d] = strides[d + 1] * out_shape->GetDimSize(d + 1);
+    int64_t vals_size = vals_->vec<ValueT>().dimension(0);
+    PartitionPlan plan = ParallelCostModel::Instance().GetPartitionPlan(ctx, output->GetDataType(),
+                                                                        BcastShapeType::SAME_SHAPE, vals_size);
+    if (!plan.IsParallel()) {
+      return ToDenseSerial<IndiceT, ValueT>(output, dim_sizes.data(), strides.data());
     }
-    for (int64_t n = 0; n < vals_size; ++n) {
-      bool invalid_dims = false;
-      int64_t ix = 0;
-      for (int d = 0; d < dims_; ++d) {
-        const int64_t ix_n_d = ix_t(n, d);
-        if (ix_n_d > out_shape->GetDimSize(d)) {
-          invalid_dims = true;
-        }
-        ix += strides[d] * ix_n_d;
+    return ToDenseParallel<IndiceT, ValueT>(ctx, output, plan, dim_sizes.data(), strides.data());
+  }
+
+ private:
+  /*
+   * offset of the n-th index in the dense output
+   * @return bool: false when the index is out of the output shape
+   */
+  template <typename IndiceT>
+  bool DenseOffset(const IndiceT *ix_data, int64_t n, const int64_t *dim_sizes, const int64_t *strides,
+                   int64_t &offset) const {
+    const IndiceT *ix_n = ix_data + n * dims_;
+    offset = 0;
+    for (int32_t d = 0; d < dims_; ++d) {
+      const int64_t ix_n_d = static_cast<int64_t>(ix_n[d]);
+      if (ix_n_d < 0 || ix_n_d >= dim_sizes[d]) {
+        return false;
       }
-      if (invalid_dims) {
-        KERNEL_LOG_ERROR("Sparse to dense got invalid dims.");
+      offset += strides[d] * ix_n_d;
+    }
+    return true;
+  }
+
+  /*
+   * to dense on the calling thread
+   */
+  template <typename IndiceT, typename ValueT>
+  uint32_t ToDenseSerial(Tensor *output, const int64_t *dim_sizes, const int64_t *strides) {
+    ValueT *out = reinterpret_cast<ValueT *>(output->GetData());
+    const IndiceT *ix_data = ix_->matrix<IndiceT>().data();
+    auto vals_t = vals_->vec<ValueT>();
+    const ValueT *vals = vals_t.data();
+    int64_t vals_size = vals_t.dimension(0);
+    for (int64_t n = 0; n < vals_size; ++n) {
+      int64_t offset = 0;
+      if (!DenseOffset(ix_data, n, dim_sizes, strides, offset)) {
+        KERNEL_LOG_ERROR("Sparse to dense got invalid indices, index=%lld.", n);
         return KERNEL_STATUS_INNER_ERROR;
       }
-      output_t(ix) = vals_t(n);
+      out[offset] = vals[n];
+    }
+    return KERNEL_STATUS_OK;
+  }
+
+  /*
+   * to dense on the shards of plan, the least invalid index any shard meets is kept, so the index reported
+   * does not depend on how ParallelFor splits the values
+   */
+  template <typename IndiceT, typename ValueT>
+  uint32_t ToDenseParallel(const CpuKernelContext &ctx, Tensor *output, const PartitionPlan &plan,
+                           const int64_t *dim_sizes, const int64_t *strides) {
+    ValueT *out = reinterpret_cast<ValueT *>(output->GetData());
+    const IndiceT *ix_data = ix_->matrix<IndiceT>().data();
+    auto vals_t = vals_->vec<ValueT>();
+    const ValueT *vals = vals_t.data();
+    int64_t vals_size = vals_t.dimension(0);
+    // vals_size while every index is valid
+    std::atomic<int64_t> invalid_index(vals_size);
+    auto parallel_proc = [&](int64_t begin, int64_t end) {
+      for (int64_t n = begin; n < end; ++n) {
+        int64_t offset = 0;
+        if (!DenseOffset(ix_data, n, dim_sizes, strides, offset)) {
+          int64_t current = invalid_index.load(std::memory_order_relaxed);
+          while ((n < current) && !invalid_index.compare_exchange_weak(current, n, std::memory_order_relaxed)) {
+          }
+          return;
+        }
+        out[offset] = vals[n];
+      }
+    };
+    KERNEL_HANDLE_ERROR(CpuKernelUtils::ParallelFor(ctx, vals_size, plan.shard_size, parallel_proc),
+                        "SparseToDense Compute failed.")
+    int64_t n = invalid_index.load();
+    if (n < vals_size) {
+      KERNEL_LOG_ERROR("Sparse to dense got invalid indices, index=%lld.", n);
+      return KERNEL_STATUS_INNER_ERROR;
     }
     return KERNEL_STATUS_OK;
   }
 
- private:
   std::shared_ptr<EigenTensor> ix_;
   std::shared_ptr<EigenTensor> vals_;
   std::vector<int64_t> shape_;
@@ -22,23 +22,92 @@
 #include "framework/omg/omg_inner_types.h"
 
 namespace ge {
-ShapeTransferAccordingToFormat::ShapeTransferAccordingToFormat(void) {
-  getNewShapeFuncMap = {
-      {ge::FORMAT_NCHW, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNCHWShapeByAxisValue)},
-      {ge::FORMAT_NHWC, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNHWCShapeByAxisValue)},
-      {ge::FORMAT_NC1HWC0, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNC1HWC0ShapeByAxisValue)},
-      {ge::FORMAT_FRACTAL_Z, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetFzShapeByAxisValue)},
-      {ge::FORMAT_HWCN, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetHWCNShapeByAxisValue)},
-      {ge::FORMAT_C1HWNCoC0, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetC1HWNCoC0ShapeByAxisValue)},
-      {ge::FORMAT_FRACTAL_NZ, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNzShapeByAxisValue)}};
+namespace {
+static_assert(static_cast<int32_t>(kTransferAxisCo) == static_cast<int32_t>(AXIS_Co),
+              "TransferAxis has to keep the order of AxisValueType");
+
+bool GetTransferSrcLayout(const ge::Format& format, TransferSrcLayout& layout) {
+  switch (format) {
+    case ge::FORMAT_NCHW:
+      layout = kTransferSrcNCHW;
+      return true;
+    case ge::FORMAT_NHWC:
+      layout = kTransferSrcNHWC;
+      return true;
+    case ge::FORMAT_NC1HWC0:
+      layout = kTransferSrcNC1HWC0;
+      return true;
+    case ge::FORMAT_HWCN:
+      layout = kTransferSrcHWCN;
+      return true;
+    case ge::FORMAT_ND:
+      layout = kTransferSrcND;
+      return true;
+    case ge::FORMAT_C1HWNCoC0:
+      layout = kTransferSrcC1HWNCoC0;
+      return true;
+    default:
+      return false;
+  }
+}
+
+bool GetTransferDstLayout(const ge::Format& format, TransferDstLayout& layout) {
+  switch (format) {
+    case ge::FORMAT_NCHW:
+      layout = kTransferDstNCHW;
+      return true;
+    case ge::FORMAT_NHWC:
+      layout = kTransferDstNHWC;
+      return true;
+    case ge::FORMAT_NC1HWC0:
+      layout = kTransferDstNC1HWC0;
+      return true;
+    case ge::FORMAT_FRACTAL_Z:
+      layout = kTransferDstFractalZ;
+      return true;
+    case ge::FORMAT_HWCN:
+      layout = kTransferDstHWCN;
+      return true;
+    case ge::FORMAT_C1HWNCoC0:
+      layout = kTransferDstC1HWNCoC0;
+      return true;
+    case ge::FORMAT_FRACTAL_NZ:
+      layout = kTransferDstFractalNz;
+      return true;
+    default:
+      return false;
+  }
+}
 
-  mapOfDtypeAndC0 = {
-      {ge::DT_FLOAT16, SHAPE_NUMBER_16}, {ge::DT_FLOAT, SHAPE_NUMBER_16},  {ge::DT_INT8, SHAPE_NUMBER_32},
-      {ge::DT_INT16, SHAPE_NUMBER_16},   {ge::DT_INT32, SHAPE_NUMBER_16},  {ge::DT_INT64, SHAPE_NUMBER_16},
-      {ge::DT_UINT8, SHAPE_NUMBER_16},   {ge::DT_UINT16, SHAPE_NUMBER_32}, {ge::DT_UINT32, SHAPE_NUMBER_16},
-      {ge::DT_UINT64, SHAPE_NUMBER_16},  {ge::DT_BOOL, SHAPE_NUMBER_16}};
+/* c0 of the data type, 0 when it is not supported */
+uint32_t GetC0ByDataType(const ge::DataType& dataType) {
+  switch (dataType) {
+    case ge::DT_INT8:
+    case ge::DT_UINT16:
+      return SHAPE_NUMBER_32;
+    case ge::DT_FLOAT16:
+    case ge::DT_FLOAT:
+    case ge::DT_INT16:
+    case ge::DT_INT32:
+    case ge::DT_INT64:
+    case ge::DT_UINT8:
+    case ge::DT_UINT32:
+    case ge::DT_UINT64:
+    case ge::DT_BOOL:
+      return SHAPE_NUMBER_16;
+    default:
+      return 0;
+  }
 }
 
+bool IsTbeImplType(const int64_t& implType) {
+  return implType == static_cast<int64_t>(EN_IMPL_HW_TBE) || implType == static_cast<int64_t>(EN_IMPL_CUSTOM_TBE) ||
+         implType == static_cast<int64_t>(EN_IMPL_NON_PERSISTENT_CUSTOM_TBE);
+}
+}  // namespace
+
+ShapeTransferAccordingToFormat::ShapeTransferAccordingToFormat(void) {}
+
 bool ShapeTransferAccordingToFormat::GetNCHWShapeByAxisValue(ge::GeShape& newShape, const int64_t& implType,
                                                              const vector<int64_t>& axisValue,
                                                              const vector<int64_t>& ndValue) {
@@ -196,76 +265,133 @@ bool ShapeTransferAccordingToFormat::GetNzShapeByAxisValue(ge::GeShape& newShape
   return true;
 }
 
-bool ShapeTransferAccordingToFormat::GetShapeAccordingToFormat(ShapeAndFormat& shapeAndFormatInfo, int64_t* c) {
-  /* The default new shape is old shape */
-  shapeAndFormatInfo.newShape = shapeAndFormatInfo.oldShape;
-  if (shapeAndFormatInfo.oldFormat >= ge::FORMAT_RESERVED || shapeAndFormatInfo.newFormat >= ge::FORMAT_RESERVED) {
-    LOG_ERROR("Old format %u or new format %u is invalid!", 
-              shapeAndFormatInfo.oldFormat, shapeAndFormatInfo.newFormat);
+bool ShapeTransferAccordingToFormat::LookUpFormatTransferPlan(const ge::Format& oldFormat,
+                                                              const ge::Format& newFormat,
+                                                              const ge::DataType& currentDataType,
+                                                              const int64_t& opImplType, FormatTransferPlan& plan,
+                                                              bool& hasPlan) {
+  hasPlan = false;
+  if (oldFormat >= ge::FORMAT_RESERVED || newFormat >= ge::FORMAT_RESERVED) {
+    LOG_ERROR("Old format %u or new format %u is invalid!", oldFormat, newFormat);
     return false;
   }
 
-  if (shapeAndFormatInfo.currentDataType >= ge::DT_UNDEFINED) {
-    LOG_ERROR("currentDataType %u is invalid!", shapeAndFormatInfo.currentDataType);
-    return false;
-  }
-  AxisUtil* axisutil_object = new (std::nothrow) AxisUtil();
-  if (axisutil_object == nullptr) {
+  if (currentDataType >= ge::DT_UNDEFINED) {
+    LOG_ERROR("currentDataType %u is invalid!", currentDataType);
     return false;
   }
-  if (!axisutil_object->HasAxisValueFunc(shapeAndFormatInfo.oldFormat)) {
-    delete axisutil_object;
+  TransferSrcLayout srcLayout;
+  if (!GetTransferSrcLayout(oldFormat, srcLayout)) {
+    LOG_INFO("Can not get axis value of format %u!", static_cast<int>(oldFormat));
     return true;
   }
-
-  auto iterGetNewShapeFunc = getNewShapeFuncMap.find(shapeAndFormatInfo.newFormat);
-  if (iterGetNewShapeFunc == getNewShapeFuncMap.end()) {
-    LOG_INFO("Can not get new shape of new format %u!", shapeAndFormatInfo.newFormat);
-    delete axisutil_object;
+  TransferDstLayout dstLayout;
+  if (!GetTransferDstLayout(newFormat, dstLayout)) {
+    LOG_INFO("Can not get new shape of new format %u!", newFormat);
     return true;
   }
-  LOG_INFO("Original format %u, new format %u", shapeAndFormatInfo.oldFormat, shapeAndFormatInfo.newFormat);
-  GetNewShapeByAxisValueAndFormatPtr getNewShapeFunc = iterGetNewShapeFunc->second;
-  if (getNewShapeFunc == nullptr) {
-    LOG_ERROR("getNewShapeFunc is nullptr return false.");
-    delete axisutil_object;
-    return false;
-  }
-  std::vector<int64_t> axisValue;
-  for (uint32_t i = 0; i < static_cast<size_t>(AXIS_BOTTOM); i++) {
-    axisValue.push_back(1);
-  }
-  std::vector<int64_t> ndValue;
-  uint32_t c0;
-  if (mapOfDtypeAndC0.empty()) {
-    c0 = SHAPE_NUMBER_16;
-  } else {
-    auto iterGetC0 = mapOfDtypeAndC0.find(shapeAndFormatInfo.currentDataType);
-    if (iterGetC0 == mapOfDtypeAndC0.end()) {
-      LOG_ERROR("Dtype is not support.");
-      delete axisutil_object;
-      return true;
-    }
-    c0 = iterGetC0->second;
+  LOG_INFO("Original format %u, new format %u", oldFormat, newFormat);
+  uint32_t c0 = GetC0ByDataType(currentDataType);
+  if (c0 == 0) {
+    LOG_ERROR("Dtype is not support.");
+    return true;
   }
 
   // The value of C0 should be 4 while format is 5HD-4 or FRAZ-4
-  if (shapeAndFormatInfo.newFormat == ge::FORMAT_NC1HWC0_C04) {
+  if (newFormat == ge::FORMAT_NC1HWC0_C04) {
     c0 = SHAPE_DIM_VALUE_C04;
   }
+  plan = ge::GetFormatTransferPlan(srcLayout, dstLayout, c0, IsTbeImplType(opImplType));
+  hasPlan = true;
+  return true;
+}
 
-  bool status = axisutil_object->GetAxisValueByOriginFormat(
-      shapeAndFormatInfo.oldFormat, shapeAndFormatInfo.oldShape.GetDims(), c0, axisValue, ndValue);
+void ShapeTransferAccordingToFormat::TransferShape(const FormatTransferPlan& plan, ShapeAndFormat& shapeAndFormatInfo,
+                                                   int64_t* c) {
+  size_t rank = shapeAndFormatInfo.oldShape.GetDimNum();
+  if (rank > kTransferMaxRank) {
+    GetShapeByAxisValue(shapeAndFormatInfo, static_cast<uint32_t>(plan.c0), c);
+    return;
+  }
+  int64_t dims[kTransferMaxRank];
+  for (size_t i = 0; i < rank; i++) {
+    dims[i] = shapeAndFormatInfo.oldShape.GetDim(i);
+  }
+  int64_t newDims[kTransferMaxNewRank];
+  size_t newRank = 0;
+  if (ApplyFormatTransferPlan(plan, dims, rank, newDims, newRank, c)) {
+    shapeAndFormatInfo.newShape = ge::GeShape(std::vector<int64_t>(newDims, newDims + newRank));
+  }
+}
+
+void ShapeTransferAccordingToFormat::GetShapeByAxisValue(ShapeAndFormat& shapeAndFormatInfo, const uint32_t& c0,
+                                                         int64_t* c) {
+  static const std::map<ge::Format, GetNewShapeByAxisValueAndFormatPtr> getNewShapeFuncMap = {
+      {ge::FORMAT_NCHW, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNCHWShapeByAxisValue)},
+      {ge::FORMAT_NHWC, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNHWCShapeByAxisValue)},
+      {ge::FORMAT_NC1HWC0, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNC1HWC0ShapeByAxisValue)},
+      {ge::FORMAT_FRACTAL_Z, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetFzShapeByAxisValue)},
+      {ge::FORMAT_HWCN, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetHWCNShapeByAxisValue)},
+      {ge::FORMAT_C1HWNCoC0, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetC1HWNCoC0ShapeByAxisValue)},
+      {ge::FORMAT_FRACTAL_NZ, std::make_shared<GetNewShapeByAxisValueAndFormat>(GetNzShapeByAxisValue)}};
+
+  auto iterGetNewShapeFunc = getNewShapeFuncMap.find(shapeAndFormatInfo.newFormat);
+  if (iterGetNewShapeFunc == getNewShapeFuncMap.end()) {
+    LOG_INFO("Can not get new shape of new format %u!", shapeAndFormatInfo.newFormat);
+    return;
+  }
+  std::vector<int64_t> axisValue(static_cast<size_t>(AXIS_BOTTOM), 1);
+  std::vector<int64_t> ndValue;
+  AxisUtil axisUtil;
+  bool status = axisUtil.GetAxisValueByOriginFormat(shapeAndFormatInfo.oldFormat, shapeAndFormatInfo.oldShape.GetDims(),
+                                                    c0, axisValue, ndValue);
   if (status != true && shapeAndFormatInfo.newFormat != ge::FORMAT_FRACTAL_NZ) {
-    delete axisutil_object;
-    return true;
+    return;
   }
-  delete axisutil_object;
 
-  (void)(*getNewShapeFunc)(shapeAndFormatInfo.newShape, shapeAndFormatInfo.opImplType, axisValue, ndValue);
+  (void)(*iterGetNewShapeFunc->second)(shapeAndFormatInfo.newShape, shapeAndFormatInfo.opImplType, axisValue,
+                                       ndValue);
   if (c != nullptr) {
     *c = static_cast<size_t>(axisValue[AXIS_C]);
   }
+}
+
+bool ShapeTransferAccordingToFormat::GetShapeAccordingToFormat(ShapeAndFormat& shapeAndFormatInfo, int64_t* c) {
+  /* The default new shape is old shape */
+  shapeAndFormatInfo.newShape = shapeAndFormatInfo.oldShape;
+  FormatTransferPlan plan;
+  bool hasPlan = false;
+  if (!LookUpFormatTransferPlan(shapeAndFormatInfo.oldFormat, shapeAndFormatInfo.newFormat,
+                                shapeAndFormatInfo.currentDataType, shapeAndFormatInfo.opImplType, plan, hasPlan)) {
+    return false;
+  }
+  if (hasPlan) {
+    TransferShape(plan, shapeAndFormatInfo, c);
+  }
+  return true;
+}
+
+bool ShapeTransferAccordingToFormat::GetShapesAccordingToFormat(const ge::Format& oldFormat,
+                                                                const ge::Format& newFormat,
+                                                                const ge::DataType& currentDataType,
+                                                                const int64_t& opImplType,
+                                                                const vector<ge::GeShape>& oldShapes,
+                                                                vector<ge::GeShape>& newShapes) {
+  /* The default new shapes are old shapes */
+  newShapes = oldShapes;
+  FormatTransferPlan plan;
+  bool hasPlan = false;
+  if (!LookUpFormatTransferPlan(oldFormat, newFormat, currentDataType, opImplType, plan, hasPlan)) {
+    return false;
+  }
+  if (!hasPlan) {
+    return true;
+  }
+  for (size_t i = 0; i < oldShapes.size(); i++) {
+    ShapeAndFormat shapeAndFormatInfo = {oldShapes[i], newShapes[i], oldFormat, newFormat, currentDataType,
+                                         opImplType};
+    TransferShape(plan, shapeAndFormatInfo, nullptr);
+  }
   return true;
 }
 };  // namespace ge
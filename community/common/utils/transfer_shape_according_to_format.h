@@ -22,6 +22,7 @@
 #define OPS_BUILT_IN_OP_PROTO_UTIL_TRANSFER_SHAPE_ACCORDING_TO_FORMAT_H_
 
 #include "axis_util.h"
+#include "format_transfer_plan.h"
 
 #include <memory.h>
 #include <functional>
@@ -93,6 +94,11 @@ class ShapeTransferAccordingToFormat {
 
   bool GetShapeAccordingToFormat(ShapeAndFormat& inputAndOutputInfo, int64_t* c = nullptr);
 
+  /* New shapes of shapes of the same formats and data type, the format transfer plan is looked up once. */
+  bool GetShapesAccordingToFormat(const ge::Format& oldFormat, const ge::Format& newFormat,
+                                  const ge::DataType& currentDataType, const int64_t& opImplType,
+                                  const vector<ge::GeShape>& oldShapes, vector<ge::GeShape>& newShapes);
+
   /* ----------Below is the function of getting new shape---------------------- */
   static bool GetNCHWShapeByAxisValue(ge::GeShape& newShape, const int64_t& implType, const vector<int64_t>& axisValue,
                                       const vector<int64_t>& ndValue);
@@ -116,10 +122,15 @@ class ShapeTransferAccordingToFormat {
                                     const vector<int64_t>& ndValue);
 
  private:
-  /* map of GetAxisValueInfoByFormat, get axis value by different original
-   * formats. */
-  std::map<ge::Format, GetNewShapeByAxisValueAndFormatPtr> getNewShapeFuncMap;
-  std::map<ge::DataType, uint32_t> mapOfDtypeAndC0;
+  /* Look up the plan of the formats and data type, hasPlan is false when shapes keep their dims. */
+  static bool LookUpFormatTransferPlan(const ge::Format& oldFormat, const ge::Format& newFormat,
+                                       const ge::DataType& currentDataType, const int64_t& opImplType,
+                                       FormatTransferPlan& plan, bool& hasPlan);
+
+  static void TransferShape(const FormatTransferPlan& plan, ShapeAndFormat& shapeAndFormatInfo, int64_t* c);
+
+  /* Get new shape through the axis values, for shapes of a rank above kTransferMaxRank. */
+  static void GetShapeByAxisValue(ShapeAndFormat& shapeAndFormatInfo, const uint32_t& c0, int64_t* c);
 };
 
 }  // namespace ge
@@ -30,6 +30,8 @@
 #include "./vector_proto_profiling.h"
 #include "op_common_util.h"
 #include "graph/utils/type_utils.h"
+#include "graph/ge_attr_value.h"
+#include "graph/debug/ge_attr_define.h"
 #include "axis_util.h"
 
 namespace ge {
@@ -906,29 +908,7 @@ std::string ToFormatString(ge::Format format) {
 static void AddToOutputRange(std::vector<std::pair<int64_t, int64_t>>& out_range,
                              const std::pair<int64_t, int64_t>& shape_range_x,
                              const std::pair<int64_t, int64_t>& shape_range_y) {
-  // first_range == max first
-  int64_t first_range = (shape_range_x.first * shape_range_y.first == 0)
-                        ? 0 : std::max(shape_range_x.first, shape_range_y.first);
-
-  if (shape_range_x.second * shape_range_y.second == -1) {
-    out_range.push_back(std::pair<int64_t, int64_t>(first_range, -1));
-  } else if (shape_range_x.first == 1 && shape_range_y.first == 1) {
-    int64_t second_range = (shape_range_x.second == -1 || shape_range_y.second == -1)
-                            ? -1 : std::max(shape_range_x.second, shape_range_y.second);
-    out_range.push_back(std::pair<int64_t, int64_t>(first_range, second_range));
-  } else if (shape_range_x.first == 1 || shape_range_y.first == 1) {
-    // one shape size maybe 1, so will support broadcast
-    int64_t second_range = shape_range_x.first == 1 ? shape_range_y.second : shape_range_x.second;
-    out_range.push_back(std::pair<int64_t, int64_t>(first_range, second_range));
-  } else {
-    // no 1 in range.first, mean no broadcast for range
-    // get intersect range
-    int64_t second_range = std::min(shape_range_x.second, shape_range_y.second);
-    second_range = (shape_range_x.second == -1 || shape_range_y.second == -1)
-                    ? std::max(shape_range_x.second, shape_range_y.second)
-                    : second_range;
-    out_range.push_back(std::pair<int64_t, int64_t>(first_range, second_range));
-  }
+  out_range.push_back(BroadcastDimRange(shape_range_x, shape_range_y));
 }
 
 bool InferShapeRangeTwoInOneOutBroadcast(Operator& op, const string& input_name1, const string& input_name2,
@@ -992,6 +972,114 @@ bool InferShapeRangeTwoInOneOutBroadcast(Operator& op, const string& input_name1
   return true;
 }
 
+// inputs broadcast by InferElewiseShapeAndType on the stack, more take InferShapeAndTypeBroadcast
+static const size_t kMaxSmallBroadcastInputNum = 8;
+
+// dims of the tensor and the ranges of its unknown dims, false if its rank is larger than SmallShape::kMaxRank
+static bool GetSmallShape(const GeTensorDescPtr& tensor_desc, std::vector<std::pair<int64_t, int64_t>>& range_buffer,
+                          SmallShape& small_shape) {
+  const GeShape& shape = tensor_desc->MutableShape();
+  size_t rank = shape.GetDimNum();
+  if (rank > SmallShape::kMaxRank) {
+    return false;
+  }
+  small_shape.rank = rank;
+  bool is_unknown = false;
+  for (size_t i = 0; i < rank; i++) {
+    int64_t dim = shape.GetDim(i);
+    small_shape.dims[i] = dim;
+    // same as MakeUpShapeRange for a tensor without range
+    small_shape.ranges[i] = (dim == -1) ? std::pair<int64_t, int64_t>(0, -1) : std::pair<int64_t, int64_t>(dim, dim);
+    is_unknown = is_unknown || (dim == -1);
+  }
+  if (is_unknown) {
+    range_buffer.clear();
+    tensor_desc->GetShapeRange(range_buffer);
+    if (range_buffer.size() == rank) {
+      std::copy(range_buffer.begin(), range_buffer.end(), small_shape.ranges);
+    }
+  }
+  return true;
+}
+
+bool InferElewiseShapeAndType(Operator& op, std::initializer_list<int64_t> input_idxs, const int64_t& output_idx,
+                              bool& is_dynamic) {
+  auto op_desc = OpDescUtils::GetOpDescFromOperator(op);
+  CHECK(op_desc == nullptr || input_idxs.size() == 0,
+        VECTOR_INFER_SHAPE_INNER_ERR_REPORT(TbeGetName(op), OtherErrMsg("invalid OpDesc.")),
+        return false);
+  GeTensorDescPtr tensordesc_output = op_desc->MutableOutputDesc(output_idx);
+  CHECK(tensordesc_output == nullptr,
+        VECTOR_INFER_SHAPE_INNER_ERR_REPORT(TbeGetName(op), OtherErrMsg("invalid tensordesc.")),
+        return false);
+
+  // kept by the thread so that ranges are read without allocating once it has grown
+  static thread_local std::vector<std::pair<int64_t, int64_t>> range_buffer;
+  SmallShape inputs[kMaxSmallBroadcastInputNum];
+  size_t input_num = 0;
+  bool is_small = input_idxs.size() <= kMaxSmallBroadcastInputNum;
+  for (const int64_t& input_idx : input_idxs) {
+    GeTensorDescPtr tensordesc_input = op_desc->MutableInputDesc(input_idx);
+    CHECK(tensordesc_input == nullptr,
+          VECTOR_INFER_SHAPE_INNER_ERR_REPORT(TbeGetName(op), OtherErrMsg("invalid tensordesc.")),
+          return false);
+    if (input_num == 0) {
+      tensordesc_output->SetDataType(tensordesc_input->GetDataType());
+    }
+    if (tensordesc_input->MutableShape().IsUnknownDimNum()) {
+      OP_LOGI(TbeGetName(op).c_str(), "do unknownrank infershape for Broadcast");
+      tensordesc_output->SetShape(GeShape(UNKNOWN_RANK));
+      if (input_idxs.size() == 1) {
+        tensordesc_output->SetOriginShape(GeShape(UNKNOWN_RANK));
+      }
+      is_dynamic = false;
+      return true;
+    }
+    is_small = is_small && GetSmallShape(tensordesc_input, range_buffer, inputs[input_num]);
+    input_num++;
+  }
+
+  if (!is_small) {
+    const int64_t* idxs = input_idxs.begin();
+    if (input_num == 1) {
+      bool ret = OneInOneOutDynamicInfer(op, idxs[0], {output_idx});
+      is_dynamic = tensordesc_output->MutableShape().IsUnknownShape();
+      if (is_dynamic) {
+        tensordesc_output->SetOriginShape(tensordesc_output->MutableShape());
+      }
+      return ret;
+    }
+    if (input_num == 2) {
+      return InferShapeAndTypeTwoInOneOutBroadcast(op, idxs[0], idxs[1], output_idx, is_dynamic);
+    }
+    return InferShapeAndTypeBroadcast(op, std::vector<int64_t>(input_idxs), output_idx, is_dynamic);
+  }
+
+  SmallShape output;
+  size_t mismatch_dim = 0;
+  CHECK(!BroadcastSmallShapes(inputs, input_num, output, mismatch_dim),
+        VECTOR_INFER_SHAPE_INNER_ERR_REPORT(TbeGetName(op),
+                                            OtherErrMsg(ConcatString("The ", TbeGetName(op),
+                                                                     "'s dimensions does not match the broadcast rule"
+                                                                     " at dim ", mismatch_dim, " of output."))),
+        return false);
+  GeShape& shape_output = tensordesc_output->MutableShape();
+  shape_output.SetDimNum(output.rank);
+  for (size_t i = 0; i < output.rank; i++) {
+    shape_output.SetDim(i, output.dims[i]);
+  }
+  is_dynamic = output.IsUnknown();
+  if (is_dynamic) {
+    range_buffer.assign(output.ranges, output.ranges + output.rank);
+    tensordesc_output->SetShapeRange(range_buffer);
+    // as OneInOneOutDynamicInfer by names, the unknown output of a one input op takes its shape as origin shape
+    if (input_num == 1) {
+      tensordesc_output->SetOriginShape(shape_output);
+    }
+  }
+  return true;
+}
+
 bool GetInputDataType(const ge::DataType& dataType, const std::vector<ge::DataType>& supportList, std::string& dType) {
   std::vector<ge::DataType>::const_iterator supportIter = find(supportList.begin(), supportList.end(), dataType);
   if (supportIter == supportList.end()) {
@@ -1247,6 +1335,9 @@ bool DynamicShapeInfer::UpdateFormatAndShape() {
     tensor_desc_output->SetOriginShape(tensor_desc_output->GetShape());
   }
 
+  // the transfer keeps no state, one object serves all inputs and outputs
+  ShapeTransferAccordingToFormat shapeTransfer;
+
   // transfer input's origin shape to current shape
   Format ori_input_format, cur_input_format;
   GeShape ori_infer_shape, current_shape;
@@ -1271,12 +1362,7 @@ bool DynamicShapeInfer::UpdateFormatAndShape() {
       // no need to transfer shape
       continue;
     } else {
-      ShapeTransferAccordingToFormat* global_object = new (std::nothrow) ShapeTransferAccordingToFormat();
-      CHECK(global_object == nullptr,
-            VECTOR_INFER_SHAPE_INNER_ERR_REPORT(TbeGetName(op),
-                                                OtherErrMsg("new ShapeTransferAccordingToFormat failed.")),
-            return false);
-      global_object->GetShapeAccordingToFormat(shapeAndFormatInfoInput);
+      shapeTransfer.GetShapeAccordingToFormat(shapeAndFormatInfoInput);
 
       // print some info
       OP_LOGI(TbeGetName(op).c_str(), "current input shape %s is %s", input_name.c_str(),
@@ -1284,7 +1370,6 @@ bool DynamicShapeInfer::UpdateFormatAndShape() {
 
       tensor_desc_input->SetFormat(cur_input_format);
       tensor_desc_input->SetShape(current_shape);
-      delete global_object;
     }
   }
 
@@ -1312,12 +1397,7 @@ bool DynamicShapeInfer::UpdateFormatAndShape() {
       // no need to transfer shape
       continue;
     } else {
-      ShapeTransferAccordingToFormat* global_object = new(std::nothrow) ShapeTransferAccordingToFormat();
-      CHECK(global_object == nullptr,
-            VECTOR_INFER_SHAPE_INNER_ERR_REPORT(TbeGetName(op),
-                                                OtherErrMsg("new ShapeTransferAccordingToFormat failed.")),
-            return false);
-      global_object->GetShapeAccordingToFormat(shapeAndFormatInfoOutput);
+      shapeTransfer.GetShapeAccordingToFormat(shapeAndFormatInfoOutput);
 
       // print some info
       OP_LOGI(TbeGetName(op).c_str(), "current output shape %s is %s", output_name.c_str(),
@@ -1325,7 +1405,6 @@ bool DynamicShapeInfer::UpdateFormatAndShape() {
 
       tensor_desc_output->SetFormat(cur_output_format);
       tensor_desc_output->SetShape(current_out_shape);
-      delete global_object;
     }
   }
 
@@ -1889,6 +1968,126 @@ ge::graphStatus GetDimNumForOp(const Operator& op,
   return GRAPH_SUCCESS;
 }
 
+static void InferElewiseTwoInput(vector<vector<int64_t>>& in_data_slice, const vector<vector<int64_t>> out_data_slice,
+                                 const vector<int64_t> in_dims, const vector<int64_t> out_dims) {
+  if (in_dims.size() == out_dims.size()) {
+    for (size_t i = 0UL; i < in_dims.size(); i++) {
+      if (in_dims[i] == 1) {
+        in_data_slice.push_back({0, 1});
+      } else {
+        in_data_slice.push_back(out_data_slice[i]);
+      }
+    }
+  } else {
+    for (size_t i = 0; i < in_dims.size(); i++) {
+      if (in_dims[i] == 1) {
+        in_data_slice.push_back({0, 1});
+      } else {
+        in_data_slice.push_back(out_data_slice[out_dims.size() - in_dims.size() + i]);
+      }
+    }
+  }
+}
+
+static void InferElewiseTwoInputdif(vector<vector<int64_t>>& in_data_slice,
+                                    const vector<vector<int64_t>> out_data_slice,
+                                    const vector<int64_t> in_dims, const vector<int64_t> out_dims,
+                                    const int64_t aixs) {
+  if (in_dims.size() == out_dims.size()) {
+    for (size_t i = 0UL; i < in_dims.size(); i++) {
+      if (in_dims[i] == 1) {
+        in_data_slice.push_back({0, 1});
+      } else {
+        in_data_slice.push_back(out_data_slice[i]);
+      }
+    }
+  } else if (in_dims.size() == 1 && in_dims[0] != 1) {
+    in_data_slice.push_back({out_data_slice[aixs][0] * 16, out_data_slice[aixs][1] * 16});
+  }
+}
+
+graphStatus InferDataSlice4BroadcastOp(const Operator& op, const string& input_name1, const string& input_name2,
+                                        const string& output_name) {
+  auto op_desc = ge::OpDescUtils::GetOpDescFromOperator(op);
+  CHECK(op_desc == nullptr, OP_LOGW(TbeGetName(op), "GetOpDescFromOperator failed."), return GRAPH_FAILED);
+
+  auto tensor_desc_in_x1 = op_desc->MutableInputDesc(input_name1);
+  CHECK(tensor_desc_in_x1 == nullptr, OP_LOGW(TbeGetName(op), "Get input desc %s failed.", input_name1.c_str()),
+        return GRAPH_FAILED);
+  auto x1_shape = tensor_desc_in_x1->MutableShape();
+  auto x1_format = tensor_desc_in_x1->GetFormat();
+  std::vector<int64_t> x1_dims = x1_shape.GetDims();
+
+  auto tensor_desc_in_x2 = op_desc->MutableInputDesc(input_name2);
+  CHECK(tensor_desc_in_x2 == nullptr, OP_LOGW(TbeGetName(op), "Get input desc %s failed.", input_name2.c_str()),
+        return GRAPH_FAILED);
+  auto x2_shape = tensor_desc_in_x2->MutableShape();
+  auto x2_format = tensor_desc_in_x2->GetFormat();
+  std::vector<int64_t> x2_dims = x2_shape.GetDims();
+
+  auto tensor_desc_out_y = op_desc->MutableOutputDesc(output_name);
+  CHECK(tensor_desc_out_y == nullptr, OP_LOGW(TbeGetName(op), "Get output desc %s failed.", output_name.c_str()),
+        return GRAPH_FAILED);
+  auto y_shape = tensor_desc_out_y->MutableShape();
+  std::vector<int64_t> y_dims = y_shape.GetDims();
+
+  vector<vector<int64_t>> y_data_slice = {};
+  vector<vector<int64_t>> x1_data_slice = {};
+  vector<vector<int64_t>> x2_data_slice = {};
+  CHECK(!ge::AttrUtils::GetListListInt(tensor_desc_out_y, ge::ATTR_NAME_DATA_SLICE, y_data_slice),
+        OP_LOGW(TbeGetName(op), "No data slice of %s.", output_name.c_str()), return GRAPH_FAILED);
+
+  if ((x1_format == FORMAT_NHWC and x2_format == FORMAT_ND) or (x1_format == FORMAT_ND and x2_format == FORMAT_NHWC) or
+      (x1_format == x2_format)) {
+    InferElewiseTwoInput(x1_data_slice, y_data_slice, x1_dims, y_dims);
+    InferElewiseTwoInput(x2_data_slice, y_data_slice, x2_dims, y_dims);
+  } else {
+    if ((x1_format == FORMAT_NC1HWC0 && x2_dims.size() <= 1) ||
+        (x1_dims.size() <= 1 && x2_format == FORMAT_NC1HWC0)) {
+      // 5HD+ND
+      InferElewiseTwoInputdif(x1_data_slice, y_data_slice, x1_dims, y_dims, 1);
+      InferElewiseTwoInputdif(x2_data_slice, y_data_slice, x2_dims, y_dims, 1);
+    } else if ((x1_format == FORMAT_FRACTAL_NZ && x2_dims.size() <= 1) ||
+               (x1_dims.size() <= 1 && x2_format == FORMAT_FRACTAL_NZ)) {
+      // NZ+ND
+      InferElewiseTwoInputdif(x1_data_slice, y_data_slice, x1_dims, y_dims, y_dims.size() - 3);
+      InferElewiseTwoInputdif(x2_data_slice, y_data_slice, x2_dims, y_dims, y_dims.size() - 3);
+    } else if ((x1_format == FORMAT_FRACTAL_Z && x2_dims.size() <= 1) ||
+               (x1_dims.size() <= 1 && x2_format == FORMAT_FRACTAL_Z)) {
+      // F_Z+ND
+      InferElewiseTwoInputdif(x1_data_slice, y_data_slice, x1_dims, y_dims, 0);
+      InferElewiseTwoInputdif(x2_data_slice, y_data_slice, x2_dims, y_dims, 0);
+    } else {
+      x1_data_slice.assign(x1_dims.size(), {});
+      x2_data_slice.assign(x2_dims.size(), {});
+    }
+  }
+
+  CHECK(!ge::AttrUtils::SetListListInt(tensor_desc_in_x1, ge::ATTR_NAME_DATA_SLICE, x1_data_slice),
+        OP_LOGW(TbeGetName(op), "Set data slice of %s failed.", input_name1.c_str()), return GRAPH_FAILED);
+  CHECK(!ge::AttrUtils::SetListListInt(tensor_desc_in_x2, ge::ATTR_NAME_DATA_SLICE, x2_data_slice),
+        OP_LOGW(TbeGetName(op), "Set data slice of %s failed.", input_name2.c_str()), return GRAPH_FAILED);
+  return GRAPH_SUCCESS;
+}
+
+graphStatus InferDataSlice4ElementwiseOp(const Operator& op, const string& input_name, const string& output_name) {
+  auto op_desc = ge::OpDescUtils::GetOpDescFromOperator(op);
+  CHECK(op_desc == nullptr, OP_LOGD(TbeGetName(op), "GetOpDescFromOperator failed."), return GRAPH_FAILED);
+  auto tensor_desc_in = op_desc->MutableInputDesc(input_name);
+  auto tensor_desc_out = op_desc->MutableOutputDesc(output_name);
+  CHECK(tensor_desc_in == nullptr || tensor_desc_out == nullptr,
+        OP_LOGD(TbeGetName(op), "Get desc of %s or %s failed.", input_name.c_str(), output_name.c_str()),
+        return GRAPH_FAILED);
+
+  // the input has the shape and format of the output, so it takes the same slice
+  vector<vector<int64_t>> data_slice;
+  CHECK(!ge::AttrUtils::GetListListInt(tensor_desc_out, ge::ATTR_NAME_DATA_SLICE, data_slice),
+        OP_LOGD(TbeGetName(op), "No data slice of %s.", output_name.c_str()), return GRAPH_FAILED);
+  CHECK(!ge::AttrUtils::SetListListInt(tensor_desc_in, ge::ATTR_NAME_DATA_SLICE, data_slice),
+        OP_LOGD(TbeGetName(op), "Set data slice of %s failed.", input_name.c_str()), return GRAPH_FAILED);
+  return GRAPH_SUCCESS;
+}
+
 ge::graphStatus InferAxisType4ElementwiseOp(const Operator& op, vector<AxisTypeInfo>& axis_type) {
   OP_LOGD(TbeGetName(op), "Infer axis type for element-wise op begin");
 
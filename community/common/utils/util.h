@@ -22,6 +22,7 @@
 #define OPS_BUILT_IN_OP_PROTO_UTIL_UTIL_H_
 
 #include <memory.h>
+#include <initializer_list>
 #include <string>
 #include <vector>
 #include <map>
@@ -42,6 +43,7 @@
 #include "graph/axis_type_info.h"
 
 #include "op_log.h"
+#include "small_shape.h"
 
 #define CHECK_KEY_IN_MAP(map, key, name, re_expr)                \
   if (map.find(key) == map.end()) {                              \
@@ -190,6 +192,21 @@ bool InferShapeAndTypeTwoInOneOutBroadcast(Operator& op, const int64_t& input_id
 bool InferShapeAndTypeBroadcast(Operator& op, std::vector<int64_t> input_idxs, const int64_t& output_idx,
                                 bool& is_dynamic);
 
+/*
+ * infer shape, range and dtype of an elementwise output from its inputs with broadcast.
+ * Inputs of rank up to SmallShape::kMaxRank are broadcast on the stack in one pass over the dims,
+ * without a temporary vector or GeShape. Other inputs take InferShapeAndTypeTwoInOneOutBroadcast,
+ * OneInOneOutDynamicInfer or InferShapeAndTypeBroadcast.
+ * param[in] op  op desc supply by ge
+ * param[in] input_idxs  input idxs, the output of one input is the same as it
+ * param[in] output_idx  output idx, it takes the dtype of the first input
+ * param[out] is_dynamic  whether the shape of output is dynamic shape
+ * return SUCCESS:infer success
+ *        FAILED:infer failed like unsupported broadcast input shape
+ */
+bool InferElewiseShapeAndType(Operator& op, std::initializer_list<int64_t> input_idxs, const int64_t& output_idx,
+                              bool& is_dynamic);
+
 bool InferShapeRangeTwoInOneOutBroadcast(Operator& op, const string& input_name1, const string& input_name2,
                                          const string& output_name);
 
@@ -532,6 +549,27 @@ private:
   AxisTypeInfo axis_type_info_;
 };
 
+/*
+ * @brief: infer data slice of the two inputs of a broadcast op from the data slice of its output,
+ *         for inputs of the same format or ND with NHWC, and 5HD, FRACTAL_NZ or FRACTAL_Z with a 1D input
+ * @param [in] op: ge operator
+ * @param [in] input_name1: first input name
+ * @param [in] input_name2: second input name
+ * @param [in] output_name: output name
+ * @return graphStatus: GRAPH_FAILED when the output has no data slice
+ */
+graphStatus InferDataSlice4BroadcastOp(const Operator& op, const string& input_name1, const string& input_name2,
+                                       const string& output_name);
+
+/*
+ * @brief: infer data slice of the input of an elementwise op, it is the data slice of its output
+ * @param [in] op: ge operator
+ * @param [in] input_name: input name
+ * @param [in] output_name: output name
+ * @return graphStatus: GRAPH_FAILED when the output has no data slice
+ */
+graphStatus InferDataSlice4ElementwiseOp(const Operator& op, const string& input_name, const string& output_name);
+
 /*
  * @brief: infer axis type for elemwise op register
  * @param [in] op: ge operator. The parameter name should be same to declaration in macro define
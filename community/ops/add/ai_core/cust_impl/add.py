@@ -16,26 +16,69 @@
 dynamic add
 """
 import functools
-from impl.util.platform_adapter import tbe
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
 from impl.util.platform_adapter import tbe_platform
+from impl.util.platform_adapter import tbe_context
 from impl.util.platform_adapter import para_check
 from impl.util.platform_adapter import shape_util
-from impl.util.platform_adapter import tvm
 from impl.util.platform_adapter import register_operator
 from impl.util.platform_adapter import register_operator_compute
-from impl.util.platform_adapter import classify
 from impl.util.platform_adapter import OpPatternMode
 from impl.util.platform_adapter import error_manager_vector
 from impl.util import util_common
 from impl.util import util_select_op_base
-from impl.util.util_compute import check_fc_fuse
-from impl.util.util_compute import batchmatmul_elem_nd2nz
-from impl.util.util_compute import batchmatmul_elem_reshape
-from impl.util.util_compute import check_batchmatmul_fuse
-from impl.util.util_compute import fetch_batchmatmul_fuse_tensor
 from impl.util.util_select_op_base import gen_param
 from impl.util.util_select_op_base import get_dynamic_param_in_json
 
+_PLATFORM_ADAPTER = "impl.util.platform_adapter"
+_UTIL_COMPUTE = "impl.util.util_compute"
+
+
+# 'pylint: disable=too-few-public-methods
+class _LazyImport:
+    """
+    A module, or an attribute of one, imported at its first use.
+    Only the compute dependencies, which kernel builds need and format selection does not, are loaded
+    this way. The op registration decorators are imported and applied when this file is imported.
+    """
+
+    def __init__(self, module_name, attr_name=None):
+        self._module_name = module_name
+        self._attr_name = attr_name
+        self._target = None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def _load(self):
+        if self._target is None:
+            target = importlib.import_module(self._module_name)
+            self._target = target if self._attr_name is None else getattr(target, self._attr_name)
+        return self._target
+
+
+tbe = _LazyImport(_PLATFORM_ADAPTER, "tbe")
+tvm = _LazyImport(_PLATFORM_ADAPTER, "tvm")
+classify = _LazyImport(_PLATFORM_ADAPTER, "classify")
+check_fc_fuse = _LazyImport(_UTIL_COMPUTE, "check_fc_fuse")
+batchmatmul_elem_nd2nz = _LazyImport(_UTIL_COMPUTE, "batchmatmul_elem_nd2nz")
+batchmatmul_elem_reshape = _LazyImport(_UTIL_COMPUTE, "batchmatmul_elem_reshape")
+check_batchmatmul_fuse = _LazyImport(_UTIL_COMPUTE, "check_batchmatmul_fuse")
+fetch_batchmatmul_fuse_tensor = _LazyImport(_UTIL_COMPUTE, "fetch_batchmatmul_fuse_tensor")
+
 
 # 'pylint: disable=too-few-public-methods
 class Constant:
@@ -45,6 +88,278 @@ class Constant:
     GENERAL_INPUT_LENGTH = 5
     FC_LENGTH_MIN = 2
     FC_LENGTH_MAX = 4
+    MAX_SHAPE_RANK = 8
+    # op_select_format results kept by _SELECT_FORMAT_CACHE
+    SELECT_FORMAT_CACHE_SIZE = 1024
+    # the input keys op_select_format reads, the cache key is made of them and the soc version
+    SELECT_FORMAT_INPUT_KEYS = ("ori_shape", "ori_format", "shape", "format", "sub_format", "dtype")
+    # compiled kernels are reused from this directory when the env is set
+    KERNEL_CACHE_DIR_ENV = "ADD_KERNEL_CACHE_DIR"
+    # tbe.build writes <kernel_name>.o and <kernel_name>.json to this directory under the
+    # kernel_meta_parent_dir of the build config
+    KERNEL_META_DIR = "kernel_meta"
+    KERNEL_META_PARENT_DIR_CONFIG = "kernel_meta_parent_dir"
+    KERNEL_FILE_SUFFIXES = (".o", ".json")
+    # the input keys that decide the compiled kernel, after static_reshape
+    KERNEL_CACHE_INPUT_KEYS = ("shape", "range", "format", "ori_format", "dtype")
+    # compile info the op context held after the build, added to it again on a cache hit
+    KERNEL_CACHE_COMPILE_INFO_FILE = "compile_info.json"
+    # build config entries that change the compiled kernel
+    KERNEL_CACHE_BUILD_CONFIGS = ("op_debug_level", "op_debug_config", "enable_op_prebuild")
+    # the toolkit is told apart by the version file of its opp directory and the versions of its packages
+    TOOLKIT_OPP_PATH_ENV = "ASCEND_OPP_PATH"
+    TOOLKIT_VERSION_FILE = "version.info"
+    TOOLKIT_PACKAGES = ("te", "tbe")
+
+
+class SelectFormatCache:
+    """
+    Bounded LRU cache of op_select_format results
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _freeze(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(SelectFormatCache._freeze(item) for item in value)
+        return value
+
+    @staticmethod
+    def make_key(select_func, soc_version, *inputs):
+        """
+        build a hashable key from the parts of the inputs the selection depends on
+        """
+        descriptors = tuple(
+            tuple(SelectFormatCache._freeze(input_dict.get(key)) for key in Constant.SELECT_FORMAT_INPUT_KEYS)
+            for input_dict in inputs)
+        return select_func.__name__, soc_version, descriptors
+
+    def get_or_compute(self, key, compute_func):
+        """
+        return the cached json string of key, compute_func is called on a miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries.get(key)
+            self.misses += 1
+        result = compute_func()
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def cache_info(self):
+        """
+        hit and miss counters, same fields as functools.lru_cache
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "maxsize": self.maxsize,
+                    "currsize": len(self._entries)}
+
+    def cache_clear(self):
+        """
+        drop all the cached results and reset the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_SELECT_FORMAT_CACHE = SelectFormatCache(Constant.SELECT_FORMAT_CACHE_SIZE)
+
+
+def select_format_cache_info():
+    """
+    hit and miss counters of the op_select_format cache
+    """
+    return _SELECT_FORMAT_CACHE.cache_info()
+
+
+def select_format_cache_clear():
+    """
+    clear the op_select_format cache
+    """
+    _SELECT_FORMAT_CACHE.cache_clear()
+
+
+class KernelCache:
+    """
+    Content addressed on disk cache of compiled static shape Add kernels.
+    A kernel built for one kernel_name is reused for any later build with the same normalized
+    shapes, ranges, dtype, soc version, toolkit version, build config and implementation file:
+    its binary and json are copied
+    under the new kernel_name instead of compiling again, and the compile info recorded by the
+    first build is added to the op context again. The function symbol inside the binary keeps
+    the name of the first build, the copied json points to it.
+    """
+    _impl_hash = None
+    _toolkit_version = None
+
+    def __init__(self, cache_dir, kernel_meta_dir):
+        self.cache_dir = os.path.realpath(cache_dir)
+        self.kernel_meta_dir = os.path.realpath(kernel_meta_dir)
+
+    @classmethod
+    def from_env(cls):
+        """
+        the cache configured by ADD_KERNEL_CACHE_DIR, None if it is not set or the toolkit version is unknown
+        """
+        cache_dir = os.environ.get(Constant.KERNEL_CACHE_DIR_ENV)
+        if not cache_dir or cls.toolkit_version() is None:
+            return None
+        return cls(cache_dir, _get_kernel_meta_dir())
+
+    @classmethod
+    def impl_hash(cls):
+        """
+        content hash of this file, kernels built by another implementation are never reused
+        """
+        if cls._impl_hash is None:
+            with open(os.path.realpath(__file__), "rb") as impl_file:
+                cls._impl_hash = hashlib.sha256(impl_file.read()).hexdigest()
+        return cls._impl_hash
+
+    @classmethod
+    def toolkit_version(cls):
+        """
+        version file of the opp directory and versions of the loaded tbe packages, kernels built by another
+        toolkit are never reused. None if none of them can be read
+        """
+        if cls._toolkit_version is None:
+            version = {}
+            opp_path = os.environ.get(Constant.TOOLKIT_OPP_PATH_ENV)
+            if opp_path:
+                try:
+                    with open(os.path.join(opp_path, Constant.TOOLKIT_VERSION_FILE), "r") as version_file:
+                        version["opp"] = version_file.read().strip()
+                except OSError:
+                    pass
+            for package in Constant.TOOLKIT_PACKAGES:
+                package_version = getattr(sys.modules.get(package), "__version__", None)
+                if package_version is not None:
+                    version[package] = str(package_version)
+            cls._toolkit_version = version
+        return cls._toolkit_version or None
+
+    @staticmethod
+    def _get_build_config():
+        """
+        the build config entries that change the compiled kernel, None for an entry the build config lacks
+        """
+        build_config = {}
+        for name in Constant.KERNEL_CACHE_BUILD_CONFIGS:
+            try:
+                build_config[name] = tbe_platform.get_current_build_config(name)
+            except (KeyError, RuntimeError):
+                build_config[name] = None
+        return build_config
+
+    @staticmethod
+    def _get_compile_info():
+        """
+        compile info recorded in the op context, {} without an op context, None if it can not be read back
+        """
+        context = tbe_context.get_context()
+        if context is None:
+            return {}
+        get_all_compile_info = getattr(context, "get_all_compile_info", None)
+        return None if get_all_compile_info is None else dict(get_all_compile_info())
+
+    def make_key(self, input_x, input_y):
+        """
+        cache key of the kernel built for input_x and input_y
+        """
+        desc = {
+            "op_type": "Add",
+            "soc_version": tbe_platform.get_soc_spec("SHORT_SOC_VERSION"),
+            "impl_hash": self.impl_hash(),
+            "toolkit_version": self.toolkit_version(),
+            "build_config": self._get_build_config(),
+            "inputs": [{key: input_dict.get(key) for key in Constant.KERNEL_CACHE_INPUT_KEYS}
+                       for input_dict in (input_x, input_y)]
+        }
+        return hashlib.sha256(json.dumps(desc, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def materialize(self, key, kernel_name):
+        """
+        copy the cached kernel of key to kernel_meta as kernel_name and add its compile info to the op context
+
+        Returns
+        -------
+        True if the kernel was found in the cache
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        cached_files = [os.path.join(entry_dir, "kernel" + suffix)
+                        for suffix in Constant.KERNEL_FILE_SUFFIXES]
+        compile_info_file = os.path.join(entry_dir, Constant.KERNEL_CACHE_COMPILE_INFO_FILE)
+        if not all(os.path.isfile(cached_file) for cached_file in cached_files + [compile_info_file]):
+            return False
+        with open(cached_files[1], "r") as json_file:
+            kernel_json = json.load(json_file)
+        with open(compile_info_file, "r") as json_file:
+            compile_info = json.load(json_file)
+        kernel_json["binFileName"] = kernel_name
+        os.makedirs(self.kernel_meta_dir, exist_ok=True)
+        shutil.copyfile(cached_files[0], self._kernel_file(kernel_name, Constant.KERNEL_FILE_SUFFIXES[0]))
+        with open(self._kernel_file(kernel_name, Constant.KERNEL_FILE_SUFFIXES[1]), "w") as json_file:
+            json.dump(kernel_json, json_file)
+        context = tbe_context.get_context()
+        if context is not None:
+            for info_key, info_value in compile_info.items():
+                context.add_compile_info(info_key, info_value)
+        return True
+
+    def store(self, key, kernel_name):
+        """
+        put the kernel just built as kernel_name and the compile info of its build into the cache,
+        nothing is stored if the compile info can not be read back from the op context
+        """
+        built_files = [self._kernel_file(kernel_name, suffix) for suffix in Constant.KERNEL_FILE_SUFFIXES]
+        entry_dir = os.path.join(self.cache_dir, key)
+        if not all(os.path.isfile(built_file) for built_file in built_files) or os.path.isdir(entry_dir):
+            return
+        compile_info = self._get_compile_info()
+        if compile_info is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".%s." % key, dir=self.cache_dir)
+        try:
+            for built_file, suffix in zip(built_files, Constant.KERNEL_FILE_SUFFIXES):
+                shutil.copyfile(built_file, os.path.join(tmp_dir, "kernel" + suffix))
+            with open(os.path.join(tmp_dir, Constant.KERNEL_CACHE_COMPILE_INFO_FILE), "w") as json_file:
+                json.dump(compile_info, json_file)
+            os.rename(tmp_dir, entry_dir)
+        except (OSError, TypeError, ValueError):
+            # another process stored the same kernel first, or the compile info is not json
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _kernel_file(self, kernel_name, suffix):
+        return os.path.join(self.kernel_meta_dir, kernel_name + suffix)
+
+
+def _get_kernel_meta_dir():
+    """
+    the kernel_meta directory tbe.build writes to, under kernel_meta_parent_dir of the build config
+    """
+    parent_dir = tbe_platform.get_current_build_config(Constant.KERNEL_META_PARENT_DIR_CONFIG)
+    return os.path.join(parent_dir or os.getcwd(), Constant.KERNEL_META_DIR)
+
+
+def _get_dtype_list(cce_product):
+    if cce_product in ("Hi3796CV300ES", "Hi3796CV300CS", "SD3403"):
+        return ["float16", "int32", "int8", "uint8"]
+    return ["float32", "float16", "int32", "int8", "uint8"]
 
 
 # 'pylint: disable=locally-disabled,too-many-arguments,unused-argument,not-use-list-comprehension
@@ -76,9 +391,21 @@ def op_select_format(input_x, input_y, output_z, kernel_name="add"):
         outputs:
             y        ori shape = [2] ori_format = "ND"
 
+    the result only depends on the shapes and formats of the inputs and the soc version,
+    it is cached by _SELECT_FORMAT_CACHE
+    """
+    cce_product = tbe_platform.get_soc_spec("SHORT_SOC_VERSION")
+    key = SelectFormatCache.make_key(op_select_format, cce_product, input_x, input_y)
+    return _SELECT_FORMAT_CACHE.get_or_compute(
+        key, lambda: _op_select_format(input_x, input_y, output_z, kernel_name, cce_product))
+
+
+def _op_select_format(input_x, input_y, output_z, kernel_name, cce_product):
+    """
+    select format without cache, see op_select_format
     """
     # do this scene like: input_x shape is [2,3,4] input_y shape is [1,]
-    param_dynamic_in_json = op_sub_select_format(input_x, input_y, output_z, kernel_name)
+    param_dynamic_in_json = _op_sub_select_format(input_x, input_y, output_z, kernel_name, cce_product)
     if param_dynamic_in_json != 'None':
         return param_dynamic_in_json
 
@@ -90,11 +417,7 @@ def op_select_format(input_x, input_y, output_z, kernel_name="add"):
 
     format_4d_list = ["NCHW", "NHWC", "HWCN"]
     format_5d_list = ["NDHWC", "DHWCN", "NCDHW"]
-    cce_product = tbe_platform.get_soc_spec("SHORT_SOC_VERSION")
-    if cce_product in ("Hi3796CV300ES", "Hi3796CV300CS", "SD3403"):
-        dtype_list = ["float16", "int32", "int8", "uint8"]
-    else:
-        dtype_list = ["float32", "float16", "int32", "int8", "uint8"]
+    dtype_list = _get_dtype_list(cce_product)
 
     format_x = input_x.get("ori_format")
     format_y = input_y.get("ori_format")
@@ -303,6 +626,16 @@ def op_sub_select_format(x1, x2, y, kernel_name="add"):
     -------
     None
     """
+    cce_product = tbe_platform.get_soc_spec("SHORT_SOC_VERSION")
+    key = SelectFormatCache.make_key(op_sub_select_format, cce_product, x1, x2)
+    return _SELECT_FORMAT_CACHE.get_or_compute(
+        key, lambda: _op_sub_select_format(x1, x2, y, kernel_name, cce_product))
+
+
+def _op_sub_select_format(x1, x2, y, kernel_name, cce_product):
+    """
+    op_sub_select_format without cache
+    """
     shape_x1 = x1.get("ori_shape")
     shape_x2 = x2.get("ori_shape")
 
@@ -312,11 +645,7 @@ def op_sub_select_format(x1, x2, y, kernel_name="add"):
     enum_x1 = functools.reduce(lambda x, y: x * y, shape_x1)
     enum_x2 = functools.reduce(lambda x, y: x * y, shape_x2)
 
-    cce_product = tbe_platform.get_soc_spec("SHORT_SOC_VERSION")
-    if cce_product in ("Hi3796CV300ES", "Hi3796CV300CS", "SD3403"):
-        dtype_list = ["float16", "int32", "int8", "uint8"]
-    else:
-        dtype_list = ["float32", "float16", "int32", "int8", "uint8"]
+    dtype_list = _get_dtype_list(cce_product)
 
     # 5HD + scalar
     if len(shape_x2) == 1 and enum_x2 == 1:
@@ -623,6 +952,146 @@ def static_reshape(input_x, input_y):
     return shape_x, shape_y, broadcast_flag, is_scene_1d
 
 
+def _pad_shape_batch(shapes, rank):
+    """
+    right align shapes into an int64 array of [batch, rank], padded with 1 on the left like broadcast_shapes
+
+    Returns
+    -------
+    padded shapes and the rank of each shape
+    """
+    ranks = [len(shape) for shape in shapes]
+    padded = np.array([[1] * (rank - shape_rank) + shape for shape, shape_rank in zip(shapes, ranks)],
+                      dtype=np.int64).reshape(len(shapes), rank)
+    return padded, np.array(ranks, dtype=np.int64)
+
+
+def _can_broadcast_batch(shapes1, shapes2):
+    """
+    _can_broadcast for arrays of padded shapes, both [batch, rank]
+    """
+    return np.all((shapes1 == shapes2) | (shapes1 == 1) | (shapes2 == 1), axis=1)
+
+
+def _add_check_format_batch(formats_x, formats_y, x_is_one, y_is_one):
+    """
+    _add_check_format for arrays of formats, x_is_one/y_is_one mark the shapes equal to [1]
+    """
+    pairs = np.char.add(np.char.add(np.asarray(formats_x, dtype=str), ","), np.asarray(formats_y, dtype=str))
+    nz_vector = np.isin(pairs, ("FRACTAL_NZ,ND", "FRACTAL_NZ,NHWC", "FRACTAL_NZ,NCHW")) & ~y_is_one
+    vector_nz = np.isin(pairs, ("ND,FRACTAL_NZ", "HWCN,FRACTAL_NZ", "NHWC,FRACTAL_NZ", "NCHW,FRACTAL_NZ")) & ~x_is_one
+    return np.where(nz_vector, 1, np.where(vector_nz, 2, 0))
+
+
+def _infer_shape_batch(rows, nz_shape, nz_rank, vec_shape, vec_rank, ori_nz_shape, ori_nz_rank):
+    """
+    one branch of _infer_shape on the selected rows: the vector side is broadcast against the
+    ori shape of the Nz side, then gets two more dims to line up with the Nz shape
+
+    Returns
+    -------
+    new vector shapes and ranks of all rows, and the rows _infer_shape would raise on
+    """
+    vec_len = np.maximum(ori_nz_rank, vec_rank)
+    fallback = rows & ((vec_len < 2) | ~_can_broadcast_batch(ori_nz_shape, vec_shape))
+    last_dim_bcast = (vec_shape[:, -2] == 1) & (vec_shape[:, -1] == ori_nz_shape[:, -1])
+    last_dim_bcast = rows & last_dim_bcast
+    second_dim_bcast = rows & ~last_dim_bcast & (vec_shape[:, -2] == ori_nz_shape[:, -2]) & (vec_shape[:, -1] == 1)
+    both_bcast = rows & ~last_dim_bcast & ~second_dim_bcast & (vec_shape[:, -2] == 1) & (vec_shape[:, -1] == 1)
+    # shape_x[-4] and shape_x[-3] of a too short Nz shape raise in the scalar function
+    fallback |= (last_dim_bcast & (nz_rank < 4)) | (second_dim_bcast & (nz_rank < 3))
+
+    extended = last_dim_bcast | second_dim_bcast | both_bcast
+    new_shape = vec_shape.copy()
+    new_shape[extended, :-2] = vec_shape[extended, 2:]
+    new_shape[extended, -2:] = 1
+    new_shape[last_dim_bcast, -3] = 1
+    new_shape[last_dim_bcast, -1] = nz_shape[last_dim_bcast, -1]
+    new_shape[last_dim_bcast, -4] = nz_shape[last_dim_bcast, -4]
+    new_shape[second_dim_bcast, -4] = 1
+    new_shape[second_dim_bcast, -2] = nz_shape[second_dim_bcast, -2]
+    new_shape[second_dim_bcast, -3] = nz_shape[second_dim_bcast, -3]
+    new_rank = np.where(rows, vec_len + np.where(extended, 2, 0), vec_rank)
+    return new_shape, new_rank, fallback
+
+
+def static_reshape_batch(shapes_x, shapes_y, formats_x, formats_y, ori_shapes_x=None, ori_shapes_y=None):
+    """
+    static_reshape for many shape pairs at once, the result of each pair is the same as
+    static_reshape({"shape": shape_x, "ori_shape": ori_shape_x, "format": format_x}, {... y ...}).
+    Pairs static_reshape would raise on are passed to static_reshape itself, so it raises the same error.
+
+    Parameters
+    ----------
+    shapes_x, shapes_y: sequences of shapes
+    formats_x, formats_y: sequences of formats
+    ori_shapes_x, ori_shapes_y: sequences of ori shapes, the same as shapes if None
+
+    Returns
+    -------
+    dict of "shape_x", "shape_y" (lists of shapes), "format_pattern" (int array),
+    "broadcast_flag" and "is_scene_1d" (bool arrays)
+    """
+    shapes_x = [list(shape_util.scalar2tensor_one(shape)) for shape in shapes_x]
+    shapes_y = [list(shape_util.scalar2tensor_one(shape)) for shape in shapes_y]
+    ori_shapes_x = shapes_x if ori_shapes_x is None else [list(shape) for shape in ori_shapes_x]
+    ori_shapes_y = shapes_y if ori_shapes_y is None else [list(shape) for shape in ori_shapes_y]
+    batch = len(shapes_x)
+    # two more dims may be appended by _infer_shape, which also reads shape[-4]
+    rank = max([len(shape) for shape in shapes_x + shapes_y + ori_shapes_x + ori_shapes_y] + [2]) + 2
+    shape_x, rank_x = _pad_shape_batch(shapes_x, rank)
+    shape_y, rank_y = _pad_shape_batch(shapes_y, rank)
+    ori_shape_x, ori_rank_x = (shape_x, rank_x) if ori_shapes_x is shapes_x else _pad_shape_batch(ori_shapes_x, rank)
+    ori_shape_y, ori_rank_y = (shape_y, rank_y) if ori_shapes_y is shapes_y else _pad_shape_batch(ori_shapes_y, rank)
+
+    x_is_one = (rank_x == 1) & (shape_x[:, -1] == 1)
+    y_is_one = (rank_y == 1) & (shape_y[:, -1] == 1)
+    is_scene_1d = y_is_one
+    rows = ~is_scene_1d
+    format_pattern = np.where(rows, _add_check_format_batch(formats_x, formats_y, x_is_one, y_is_one), 0)
+
+    fallback = np.zeros(batch, dtype=bool)
+    shape_y, rank_y, failed = _infer_shape_batch(rows & (format_pattern == 1), shape_x, rank_x, shape_y, rank_y,
+                                                 ori_shape_x, ori_rank_x)
+    fallback |= failed
+    shape_x, rank_x, failed = _infer_shape_batch(rows & (format_pattern == 2), shape_y, rank_y, shape_x, rank_x,
+                                                 ori_shape_y, ori_rank_y)
+    fallback |= failed
+
+    # para_check.check_shape and broadcast_shapes raise on these
+    valid_dims = np.arange(rank)[None, :] >= (rank - np.maximum(rank_x, rank_y))[:, None]
+    fallback |= rows & np.any(valid_dims & ((shape_x <= 0) | (shape_y <= 0)), axis=1)
+    fallback |= rows & ((rank_x > Constant.MAX_SHAPE_RANK) | (rank_y > Constant.MAX_SHAPE_RANK))
+    fallback |= rows & ~_can_broadcast_batch(shape_x, shape_y)
+
+    out_rank = np.maximum(rank_x, rank_y)
+    shape_max = np.where(shape_x == 1, shape_y, shape_x)
+    squeeze = rows & (out_rank > 1) & (shape_x[:, -1] == 1) & (shape_y[:, -1] == 1) & (shape_max[:, -1] == 1)
+    out_rank = out_rank - squeeze
+    out_end = rank - squeeze
+
+    out_shapes_x = []
+    out_shapes_y = []
+    rows_x, rows_y = shape_x.tolist(), shape_y.tolist()
+    out_begin, out_end = (out_end - out_rank).tolist(), out_end.tolist()
+    for i in range(batch):
+        if is_scene_1d[i]:
+            out_shapes_x.append(shapes_x[i])
+            out_shapes_y.append(tuple([1] * len(shapes_x[i])))
+        elif fallback[i]:
+            input_x = {"shape": shapes_x[i], "ori_shape": ori_shapes_x[i], "format": formats_x[i]}
+            input_y = {"shape": shapes_y[i], "ori_shape": ori_shapes_y[i], "format": formats_y[i]}
+            scalar_x, scalar_y, _, _ = static_reshape(input_x, input_y)
+            out_shapes_x.append(list(scalar_x))
+            out_shapes_y.append(list(scalar_y))
+        else:
+            out_shapes_x.append(rows_x[i][out_begin[i]:out_end[i]])
+            out_shapes_y.append(rows_y[i][out_begin[i]:out_end[i]])
+
+    return {"shape_x": out_shapes_x, "shape_y": out_shapes_y, "format_pattern": format_pattern,
+            "broadcast_flag": rows, "is_scene_1d": is_scene_1d}
+
+
 def calc_input_tensor(input_x, input_y):
     """compute with batchmatmul"""
     batchmatmul_flag = False
@@ -772,6 +1241,7 @@ def add(input_x, input_y, output_z, kernel_name="add"):
         error_manager_vector.raise_err_inputs_dtype_not_equal("add", "input_x", "input_y", str(x_dtype), str(y_dtype))
 
     # calc for static and dynamic merge
+    kernel_cache = None
     if not util_common.is_unknown([input_x, input_y]):
         shape_x, shape_y, _, _ = static_reshape(input_x, input_y)
         range_x = util_common.gen_range(shape_x)
@@ -780,6 +1250,13 @@ def add(input_x, input_y, output_z, kernel_name="add"):
         input_x["range"] = range_x
         input_y["shape"] = shape_y
         input_y["range"] = range_y
+        # only static kernels are reused, a dynamic build also registers the vars of its patterns in the op context
+        kernel_cache = KernelCache.from_env()
+
+    if kernel_cache is not None:
+        cache_key = kernel_cache.make_key(input_x, input_y)
+        if kernel_cache.materialize(cache_key, kernel_name):
+            return
 
     ins = classify([input_x, input_y], OpPatternMode.ELEWISE_WITH_BROADCAST)
     schedules, tensors = [], []
@@ -798,3 +1275,5 @@ def add(input_x, input_y, output_z, kernel_name="add"):
     config = {"print_ir": False, "name": kernel_name, "tensor_list": tensors}
 
     tbe.build(schedules, config)
+    if kernel_cache is not None:
+        kernel_cache.store(cache_key, kernel_name)
@@ -14,13 +14,88 @@
  * limitations under the License.
  */
 
+#include <algorithm>
+
 #include "inc/add_op.h"
 #include "register/op_impl_registry.h"
+#include "register/infer_axis_slice_registry.h"
+#include "register/infer_data_slice_registry.h"
+#include "utils/util.h"
+#include "context_util.h"
+#include "op_log.h"
 
 namespace ge {
+namespace {
+constexpr int64_t kUnknownDim = -1;
+constexpr int64_t kUnknownRankDim = -2;
+
+bool IsUnknownRank(const gert::Shape& shape) {
+  return (shape.GetDimNum() == 1) && (shape.GetDim(0) == kUnknownRankDim);
+}
+
+/*
+ * broadcast one pair of dims, the same rules as BroadcastShape and TwoBroadcastShape of util.cc:
+ * 1 takes the other dim, -1 takes the other dim unless it is 1, known dims have to be equal
+ */
+bool BroadcastDim(int64_t dim_x, int64_t dim_y, int64_t& dim_out) {
+  if ((dim_x == dim_y) || (dim_y == 1)) {
+    dim_out = dim_x;
+  } else if (dim_x == 1) {
+    dim_out = dim_y;
+  } else if (dim_x == kUnknownDim) {
+    dim_out = dim_y;
+  } else if (dim_y == kUnknownDim) {
+    dim_out = dim_x;
+  } else {
+    return false;
+  }
+  return true;
+}
+
+bool BroadcastShape(const gert::Shape& shape_x, const gert::Shape& shape_y, gert::Shape& shape_out) {
+  if (IsUnknownRank(shape_x) || IsUnknownRank(shape_y)) {
+    shape_out.SetDimNum(1);
+    shape_out.SetDim(0, kUnknownRankDim);
+    return true;
+  }
+  size_t rank_x = shape_x.GetDimNum();
+  size_t rank_y = shape_y.GetDimNum();
+  size_t rank_out = std::max(rank_x, rank_y);
+  shape_out.SetDimNum(rank_out);
+  // align the shapes on their last dims, missing dims are 1
+  for (size_t i = 0; i < rank_out; i++) {
+    int64_t dim_x = (i + rank_x >= rank_out) ? shape_x.GetDim(i + rank_x - rank_out) : 1;
+    int64_t dim_y = (i + rank_y >= rank_out) ? shape_y.GetDim(i + rank_y - rank_out) : 1;
+    int64_t dim_out = 0;
+    if (!BroadcastDim(dim_x, dim_y, dim_out)) {
+      return false;
+    }
+    shape_out.SetDim(i, dim_out);
+  }
+  return true;
+}
+}  // namespace
+
 ge::graphStatus InferShape4Add(gert::InferShapeContext* context) {
-  return GRAPH_FAILED;
+  const gert::Shape* shape_x = context->GetInputShape(0);
+  OPS_CHECK_NULL_WITH_CONTEXT(context, shape_x);
+  const gert::Shape* shape_y = context->GetInputShape(1);
+  OPS_CHECK_NULL_WITH_CONTEXT(context, shape_y);
+  gert::Shape* shape_out = context->GetOutputShape(0);
+  OPS_CHECK_NULL_WITH_CONTEXT(context, shape_out);
+
+  OP_CHECK(!BroadcastShape(*shape_x, *shape_y, *shape_out),
+           OP_LOGE(context->GetNodeName(), "The dimensions of x1 and x2 do not match the broadcast rule."),
+           return GRAPH_FAILED);
+  OP_LOGD(context->GetNodeName(), "Output rank is %zu.", shape_out->GetDimNum());
+  return GRAPH_SUCCESS;
+}
+
+IMPLEMT_COMMON_INFER_DATA_SLICE(AddInferDataSlice) {
+  return InferDataSlice4BroadcastOp(op, "x1", "x2", "y");
 }
 
 IMPL_OP(Add).InferShape(InferShape4Add);
+INFER_DATA_SLICE_FUNC_REG(Add, AddInferDataSlice);
+INFER_AXIS_TYPE_INFO_REG(Add, InferAxisType4BroadcastOp);
 }
@@ -0,0 +1,75 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2019-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "add_tanh.h"
+#include "utils/binary_elewise.h"
+
+namespace {
+const char *kAddTanh = "AddTanh";
+}
+
+namespace aicpu {
+/*
+ * tanh of the sum, the sum stays in registers
+ */
+template <typename T>
+struct AddTanhOp {
+  T operator()(const T &a, const T &b) const {
+    return Eigen::numext::tanh(a + b);
+  }
+
+  template <typename Packet>
+  Packet packetOp(const Packet &a, const Packet &b) const {
+    return Eigen::internal::ptanh(Eigen::internal::padd(a, b));
+  }
+};
+
+// float16 is summed and activated in float by the engine, so it is rounded once
+template <>
+struct AddTanhOp<Eigen::half> {
+  using WidenedType = float;
+  using WidenedFunctor = AddTanhOp<float>;
+
+  Eigen::half operator()(const Eigen::half &a, const Eigen::half &b) const {
+    return static_cast<Eigen::half>(Eigen::numext::tanh(static_cast<float>(a) + static_cast<float>(b)));
+  }
+
+  template <typename Packet>
+  Packet packetOp(const Packet &a, const Packet &b) const {
+    return Eigen::internal::ptanh(Eigen::internal::padd(a, b));
+  }
+};
+}  // namespace aicpu
+
+namespace Eigen {
+namespace internal {
+template <typename T>
+struct functor_traits<aicpu::AddTanhOp<T>> {
+  enum {
+    Cost = NumTraits<T>::AddCost + functor_traits<scalar_tanh_op<T>>::Cost,
+    PacketAccess = packet_traits<T>::HasAdd && packet_traits<T>::HasTanh
+  };
+};
+}  // namespace internal
+}  // namespace Eigen
+
+namespace aicpu {
+uint32_t AddTanhCpuKernel::Compute(CpuKernelContext &ctx) {
+  return BinaryElewiseKernelCompute<AddTanhOp, Eigen::half, float, double>(ctx);
+}
+
+REGISTER_CPU_KERNEL(kAddTanh, AddTanhCpuKernel);
+}  // namespace aicpu
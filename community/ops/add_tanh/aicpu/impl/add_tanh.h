@@ -0,0 +1,35 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2019-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_IMPL_ADD_TANH_H_
+#define AICPU_IMPL_ADD_TANH_H_
+
+#include "cpu_kernel.h"
+
+namespace aicpu {
+/*
+ * y = tanh(x1 + x2) with numpy broadcast, without the intermediate tensor of Add
+ */
+class AddTanhCpuKernel : public CpuKernel {
+ public:
+  AddTanhCpuKernel() = default;
+  ~AddTanhCpuKernel() override = default;
+
+ protected:
+  uint32_t Compute(CpuKernelContext &ctx) override;
+};
+}  // namespace aicpu
+#endif
@@ -0,0 +1,32 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2019-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#include "inc/add_tanh_op.h"
+#include "register/op_impl_registry.h"
+#include "utils/util.h"
+
+namespace ge {
+// the output has the broadcast shape of the inputs, as Add
+IMPLEMT_COMMON_INFERFUNC(AddTanhInferShape) {
+  bool is_dynamic_output = true;
+  if (!InferElewiseShapeAndType(op, {0, 1}, 0, is_dynamic_output)) {
+    return GRAPH_FAILED;
+  }
+  return GRAPH_SUCCESS;
+}
+
+COMMON_INFER_FUNC_REG(AddTanh, AddTanhInferShape);
+}  // namespace ge
@@ -0,0 +1,41 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2019-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef COMMUNITY_OPS_ADD_TANH_OP_PROTO_INC_ADD_TANH_OP_H
+#define COMMUNITY_OPS_ADD_TANH_OP_PROTO_INC_ADD_TANH_OP_H
+
+#include "graph/operator_reg.h"
+
+namespace ge {
+/**
+*@brief Returns tanh(x1 + x2) element-wise, the fusion of Add and Tanh. \n
+
+*@par Inputs:
+*Two inputs, including:
+* @li x1: A Tensor. Must be one of the following types: float16, float32, double.
+* @li x2: A Tensor of the same type as "x1", broadcastable with "x1". \n
+
+*@par Outputs:
+*y: A Tensor of the same type as "x1", of the broadcast shape of "x1" and "x2". \n
+*/
+REG_OP(AddTanh)
+    .INPUT(x1, TensorType({DT_FLOAT, DT_FLOAT16, DT_DOUBLE}))
+    .INPUT(x2, TensorType({DT_FLOAT, DT_FLOAT16, DT_DOUBLE}))
+    .OUTPUT(y, TensorType({DT_FLOAT, DT_FLOAT16, DT_DOUBLE}))
+    .OP_END_FACTORY_REG(AddTanh)
+} // namespace ge
+
+#endif // COMMUNITY_OPS_ADD_TANH_OP_PROTO_INC_ADD_TANH_OP_H
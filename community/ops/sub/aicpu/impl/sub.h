@@ -18,7 +18,6 @@
 #define AICPU_IMPL_SUB_H_
 
 #include "cpu_kernel.h"
-#include "utils/bcast.h"
 
 namespace aicpu {
 class SubCpuKernel : public CpuKernel {
@@ -28,22 +27,6 @@ class SubCpuKernel : public CpuKernel {
 
  protected:
   uint32_t Compute(CpuKernelContext &ctx) override;
-
- private:
-  uint32_t SubParamCheck(CpuKernelContext &ctx);
-
-  template <typename T>
-  void SpecialCompute(BcastShapeType type, int64_t start, int64_t end,
-                      const T *input1, const T *input2,  T *output);
-
-  template <typename T>
-  uint32_t NoBcastCompute(CpuKernelContext &ctx);
-
-  template <typename T>
-  uint32_t BcastCompute(CpuKernelContext &ctx, Bcast &bcast);
-
-  template <typename T>
-  uint32_t SubCompute(CpuKernelContext &ctx);
 };
 }  // namespace aicpu
 #endif
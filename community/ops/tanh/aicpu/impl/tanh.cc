@@ -19,6 +19,7 @@
 #include "cpu_kernel_utils.h"
 #include "utils/eigen_tensor.h"
 #include "utils/kernel_util.h"
+#include "utils/parallel_cost_model.h"
 #include "cmath"
 #include<complex>
 
@@ -26,7 +27,8 @@ namespace {
 const uint32_t kOutputNum = 1;
 const uint32_t kInputNum = 1;
 const char *kTanh = "Tanh";
-constexpr int64_t kParallelDataNums = 128 * 1024;
+// float16 is computed in float by blocks of this many elements, 16K bytes of float stay in L1
+constexpr int64_t kHalfBlockNum = 4 * 1024;
 
 #define Tanh_COMPUTE_CASE(DTYPE, TYPE, CTX)            \
   case (DTYPE): {                                      \
@@ -59,30 +61,64 @@ uint32_t TanhCpuKernel::Compute(CpuKernelContext &ctx) {
 }
 
 
+// real types map the range as a tensor so that Eigen evaluates tanh by packets
+template <typename T>
+void TanhCpuKernel::TanhCalculate(const T *input_x, T *output_y, int64_t start, int64_t end) {
+  Eigen::TensorMap<Eigen::Tensor<const T, 1>> input(input_x + start, end - start);
+  Eigen::TensorMap<Eigen::Tensor<T, 1>> output(output_y + start, end - start);
+  output = input.tanh();
+}
+
+// float16 has no packet tanh, blocks are widened to float, computed and narrowed back
+template <>
+void TanhCpuKernel::TanhCalculate<Eigen::half>(const Eigen::half *input_x, Eigen::half *output_y,
+                                               int64_t start, int64_t end) {
+  alignas(EIGEN_MAX_ALIGN_BYTES) float buffer[kHalfBlockNum];
+  for (int64_t block_start = start; block_start < end; block_start += kHalfBlockNum) {
+    int64_t block_num = std::min(kHalfBlockNum, end - block_start);
+    Eigen::TensorMap<Eigen::Tensor<const Eigen::half, 1>> input(input_x + block_start, block_num);
+    Eigen::TensorMap<Eigen::Tensor<Eigen::half, 1>> output(output_y + block_start, block_num);
+    Eigen::TensorMap<Eigen::Tensor<float, 1>, Eigen::Aligned> widened(buffer, block_num);
+    widened = input.template cast<float>();
+    widened = widened.tanh();
+    output = widened.template cast<Eigen::half>();
+  }
+}
+
+// complex types keep the scalar op
+template <>
+void TanhCpuKernel::TanhCalculate<std::complex<float>>(const std::complex<float> *input_x,
+                                                       std::complex<float> *output_y, int64_t start, int64_t end) {
+  Eigen::internal::scalar_tanh_op<std::complex<float>> tanh_op;
+  for (int64_t i = start; i < end; i++) {
+    *(output_y + i) = tanh_op(*(input_x + i));
+  }
+}
+
+template <>
+void TanhCpuKernel::TanhCalculate<std::complex<double>>(const std::complex<double> *input_x,
+                                                        std::complex<double> *output_y, int64_t start, int64_t end) {
+  Eigen::internal::scalar_tanh_op<std::complex<double>> tanh_op;
+  for (int64_t i = start; i < end; i++) {
+    *(output_y + i) = tanh_op(*(input_x + i));
+  }
+}
+
 template <typename T>
 uint32_t TanhCpuKernel::TanhCompute(CpuKernelContext &ctx) {
-  Eigen::internal::scalar_tanh_op<T> tanh_op;
   auto input_x = reinterpret_cast<T *>(ctx.Input(0)->GetData());
   auto output_y = reinterpret_cast<T *>(ctx.Output(0)->GetData());
-  size_t data_num = ctx.Input(0)->NumElements();
-  int64_t data_size = data_num * sizeof(T);
-  if (data_size <= kParallelDataNums) {
-    for (size_t i = 0; i < data_num; i++) {
-      auto x_idx = input_x + i;    // i-th value of input0
-      *(output_y + i) = tanh_op((*x_idx));     
-    }
+  int64_t data_num = ctx.Input(0)->NumElements();
+  PartitionPlan plan = ParallelCostModel::Instance().GetPartitionPlan(
+      ctx, ctx.Input(0)->GetDataType(), BcastShapeType::SAME_SHAPE, data_num);
+  if (!plan.IsParallel()) {
+    TanhCalculate<T>(input_x, output_y, 0, data_num);
   } else {
-    uint32_t min_core_num = 1;
-    int64_t max_core_num =
-        std::max(min_core_num, aicpu::CpuKernelUtils::GetCPUNum(ctx) - 2);
-    auto shard_Tanh = [&](size_t start, size_t end) {
-      for (size_t i = start; i < end; i++) {
-        auto x_idx = input_x + i;    // i-th value of input0        
-        *(output_y + i) = tanh_op((*x_idx));      
-      }
+    auto shard_Tanh = [&](int64_t start, int64_t end) {
+      TanhCalculate<T>(input_x, output_y, start, end);
     };
     KERNEL_HANDLE_ERROR(
-        CpuKernelUtils::ParallelFor(ctx, data_num, data_num / max_core_num,
+        CpuKernelUtils::ParallelFor(ctx, data_num, plan.shard_size,
                                     shard_Tanh),
         "Tanh Compute failed.")
   }
@@ -27,6 +27,9 @@ class TanhCpuKernel : public CpuKernel {
  private:
   template <typename T>
   uint32_t TanhCompute(CpuKernelContext &ctx);
+
+  template <typename T>
+  void TanhCalculate(const T *input_x, T *output_y, int64_t start, int64_t end);
 };
 }  // namespace aicpu
 #endif
@@ -1,18 +1,27 @@
 #include "inc/tanh_op.h"
 #include "register/op_impl_registry.h"
+#include "register/infer_axis_slice_registry.h"
+#include "register/infer_data_slice_registry.h"
 #include "utils/util.h"
 namespace ge {
 
 IMPLEMT_COMMON_INFERFUNC(OneInOneOutCommonInferShape) {
   static const int64_t input_x_idx = 0;
   static const int64_t output_y_idx = 0;
-  if (OneInOneOutDynamicInfer(op, input_x_idx, {output_y_idx})) {
+  bool is_dynamic_output = false;
+  if (InferElewiseShapeAndType(op, {input_x_idx}, output_y_idx, is_dynamic_output)) {
     return GRAPH_SUCCESS;
   }
   return GRAPH_FAILED;
 }
 
+IMPLEMT_COMMON_INFER_DATA_SLICE(TanhInferDataSlice) {
+  return InferDataSlice4ElementwiseOp(op, "x", "y");
+}
+
 COMMON_INFER_FUNC_REG(Tanh, OneInOneOutCommonInferShape);
+INFER_DATA_SLICE_FUNC_REG(Tanh, TanhInferDataSlice);
+INFER_AXIS_TYPE_INFO_REG(Tanh, InferAxisType4ElementwiseOp);
 
 
 }
\ No newline at end of file
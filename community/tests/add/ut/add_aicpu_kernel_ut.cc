@@ -0,0 +1,243 @@
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "unsupported/Eigen/CXX11/Tensor"
+#include "cpu_kernel.h"
+#include "host_runtime.h"
+#include "parallel_cost_model.h"
+#include "status.h"
+
+using namespace aicpu;
+
+namespace {
+int64_t NumElements(const std::vector<int64_t> &dims) {
+  int64_t num = 1;
+  for (auto dim : dims) {
+    num *= dim;
+  }
+  return num;
+}
+
+// index into an input of dims broadcast to out_dims, dims aligned to the right
+int64_t BroadcastIndex(const std::vector<int64_t> &dims, const std::vector<int64_t> &out_dims, int64_t out_index) {
+  int64_t index = 0;
+  int64_t stride = 1;
+  size_t offset = out_dims.size() - dims.size();
+  for (size_t i = out_dims.size(); i > 0; i--) {
+    int64_t pos = out_index % out_dims[i - 1];
+    out_index /= out_dims[i - 1];
+    if (i - 1 < offset) {
+      continue;
+    }
+    int64_t dim = dims[i - 1 - offset];
+    index += (dim == 1 ? 0 : pos) * stride;
+    stride *= dim;
+  }
+  return index;
+}
+
+template <typename T>
+T RandomValue(std::mt19937 &gen);
+
+template <>
+Eigen::half RandomValue<Eigen::half>(std::mt19937 &gen) {
+  return Eigen::half(std::uniform_real_distribution<float>(-8.0f, 8.0f)(gen));
+}
+
+template <>
+float RandomValue<float>(std::mt19937 &gen) {
+  return std::uniform_real_distribution<float>(-8.0f, 8.0f)(gen);
+}
+
+template <>
+int32_t RandomValue<int32_t>(std::mt19937 &gen) {
+  return std::uniform_int_distribution<int32_t>(-1000000, 1000000)(gen);
+}
+
+template <>
+std::complex<float> RandomValue<std::complex<float>>(std::mt19937 &gen) {
+  std::uniform_real_distribution<float> dist(-8.0f, 8.0f);
+  float real = dist(gen);
+  return std::complex<float>(real, dist(gen));
+}
+
+template <typename T>
+std::vector<T> RandomValues(int64_t num, uint32_t seed) {
+  std::mt19937 gen(seed);
+  std::vector<T> values(num);
+  for (auto &value : values) {
+    value = RandomValue<T>(gen);
+  }
+  return values;
+}
+
+// the scalar sum the kernel must match exactly, half is added in float and rounded once
+template <typename T>
+T ReferenceAdd(T x, T y) {
+  return x + y;
+}
+
+template <>
+Eigen::half ReferenceAdd<Eigen::half>(Eigen::half x, Eigen::half y) {
+  return Eigen::half(static_cast<float>(x) + static_cast<float>(y));
+}
+
+template <typename T>
+std::vector<T> ReferenceAdd(const std::vector<T> &x, const std::vector<int64_t> &x_dims, const std::vector<T> &y,
+                            const std::vector<int64_t> &y_dims, const std::vector<int64_t> &out_dims) {
+  std::vector<T> out(NumElements(out_dims));
+  for (int64_t i = 0; i < static_cast<int64_t>(out.size()); i++) {
+    out[i] = ReferenceAdd(x[BroadcastIndex(x_dims, out_dims, i)], y[BroadcastIndex(y_dims, out_dims, i)]);
+  }
+  return out;
+}
+
+template <typename T>
+uint32_t RunAdd(DataType dtype, const std::vector<int64_t> &x_dims, T *x, const std::vector<int64_t> &y_dims, T *y,
+                const std::vector<int64_t> &out_dims, T *out) {
+  CpuKernelContext ctx("Add");
+  ctx.AddInput(dtype, x_dims, x);
+  ctx.AddInput(dtype, y_dims, y);
+  ctx.AddOutput(dtype, out_dims, out);
+  auto kernel = KernelRegister::Instance().CreateCpuKernel("Add");
+  if (kernel == nullptr) {
+    return KERNEL_STATUS_INNER_ERROR;
+  }
+  return kernel->Compute(ctx);
+}
+
+template <typename T>
+void CheckAdd(DataType dtype, const std::vector<int64_t> &x_dims, const std::vector<int64_t> &y_dims,
+              const std::vector<int64_t> &out_dims) {
+  std::vector<T> x = RandomValues<T>(NumElements(x_dims), 1);
+  std::vector<T> y = RandomValues<T>(NumElements(y_dims), 2);
+  std::vector<T> expect = ReferenceAdd(x, x_dims, y, y_dims, out_dims);
+  std::vector<T> out(expect.size());
+  ASSERT_EQ(RunAdd(dtype, x_dims, x.data(), y_dims, y.data(), out_dims, out.data()), KERNEL_STATUS_OK);
+  for (size_t i = 0; i < out.size(); i++) {
+    ASSERT_TRUE(out[i] == expect[i]) << "element " << i;
+  }
+}
+
+// the output shares the buffer of the input of the output shape
+template <typename T>
+void CheckAddInplace(DataType dtype, const std::vector<int64_t> &x_dims, const std::vector<int64_t> &y_dims,
+                     bool into_x) {
+  const std::vector<int64_t> &out_dims = into_x ? x_dims : y_dims;
+  std::vector<T> x = RandomValues<T>(NumElements(x_dims), 3);
+  std::vector<T> y = RandomValues<T>(NumElements(y_dims), 4);
+  std::vector<T> expect = ReferenceAdd(x, x_dims, y, y_dims, out_dims);
+  T *out = into_x ? x.data() : y.data();
+  ASSERT_EQ(RunAdd(dtype, x_dims, x.data(), y_dims, y.data(), out_dims, out), KERNEL_STATUS_OK);
+  for (size_t i = 0; i < expect.size(); i++) {
+    ASSERT_TRUE(out[i] == expect[i]) << "element " << i;
+  }
+}
+
+template <typename T>
+void CheckAddAllShapes(DataType dtype) {
+  // SAME_SHAPE
+  CheckAdd<T>(dtype, {2, 3, 17}, {2, 3, 17}, {2, 3, 17});
+  CheckAdd<T>(dtype, {1}, {1}, {1});
+  // X_ONE_ELEMENT and Y_ONE_ELEMENT, of rank 0 to the rank of the other input
+  CheckAdd<T>(dtype, {1}, {5, 33}, {5, 33});
+  CheckAdd<T>(dtype, {}, {5, 33}, {5, 33});
+  CheckAdd<T>(dtype, {1, 1}, {5, 33}, {5, 33});
+  CheckAdd<T>(dtype, {5, 33}, {1}, {5, 33});
+  CheckAdd<T>(dtype, {5, 33}, {}, {5, 33});
+  // DIFF_SHAPE, rows, columns, both inputs and rank padding
+  CheckAdd<T>(dtype, {4, 35}, {1, 35}, {4, 35});
+  CheckAdd<T>(dtype, {4, 35}, {4, 1}, {4, 35});
+  CheckAdd<T>(dtype, {4, 1}, {1, 35}, {4, 35});
+  CheckAdd<T>(dtype, {2, 3, 4, 5}, {3, 1, 5}, {2, 3, 4, 5});
+  CheckAdd<T>(dtype, {5}, {2, 3, 1}, {2, 3, 5});
+}
+}  // namespace
+
+class add_aicpu_kernel_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "add_aicpu_kernel_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "add_aicpu_kernel_test TearDown" << std::endl;
+  }
+
+  void SetUp() override {
+    bench::SetCpuNum(1);
+  }
+
+  void TearDown() override {
+    bench::SetCpuNum(1);
+  }
+};
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_float16) {
+  CheckAddAllShapes<Eigen::half>(DT_FLOAT16);
+}
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_float) {
+  CheckAddAllShapes<float>(DT_FLOAT);
+}
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_int32) {
+  CheckAddAllShapes<int32_t>(DT_INT32);
+}
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_complex64) {
+  CheckAddAllShapes<std::complex<float>>(DT_COMPLEX64);
+}
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_inplace) {
+  CheckAddInplace<float>(DT_FLOAT, {3, 37}, {3, 37}, true);
+  CheckAddInplace<float>(DT_FLOAT, {3, 37}, {3, 37}, false);
+  CheckAddInplace<float>(DT_FLOAT, {3, 37}, {1}, true);
+  CheckAddInplace<float>(DT_FLOAT, {1}, {3, 37}, false);
+  CheckAddInplace<Eigen::half>(DT_FLOAT16, {3, 37}, {1, 37}, true);
+  CheckAddInplace<int32_t>(DT_INT32, {3, 1}, {3, 37}, false);
+  CheckAddInplace<std::complex<float>>(DT_COMPLEX64, {3, 37}, {3, 37}, true);
+}
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_inplace_partial_overlap) {
+  // the output may only be the whole buffer of an input of its shape
+  std::vector<float> x = RandomValues<float>(64, 5);
+  std::vector<float> y = RandomValues<float>(32, 6);
+  EXPECT_EQ(RunAdd(DT_FLOAT, {32}, x.data(), {32}, y.data(), {32}, x.data() + 1), KERNEL_STATUS_PARAM_INVALID);
+  EXPECT_EQ(RunAdd(DT_FLOAT, {1}, x.data(), {32}, y.data(), {32}, x.data()), KERNEL_STATUS_PARAM_INVALID);
+}
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_multi_shard) {
+  bench::SetCpuNum(6);
+  const std::vector<int64_t> dims = {1031, 67};
+  const std::vector<int64_t> row_dims = {1, 67};
+  // sizes above the thresholds of the cost model, so that the kernel really runs in shards
+  auto &model = ParallelCostModel::Instance();
+  EXPECT_TRUE(model.GetPartitionPlan("Add", DT_FLOAT, BcastShapeType::SAME_SHAPE, NumElements(dims), 6).IsParallel());
+  EXPECT_TRUE(model.GetPartitionPlan("Add", DT_FLOAT16, BcastShapeType::Y_ONE_ELEMENT, NumElements(dims), 6)
+                  .IsParallel());
+  EXPECT_TRUE(model.GetPartitionPlan("Add", DT_INT32, BcastShapeType::DIFF_SHAPE, NumElements(dims), 6).IsParallel());
+  CheckAdd<float>(DT_FLOAT, dims, dims, dims);
+  CheckAdd<float>(DT_FLOAT, {1}, dims, dims);
+  CheckAdd<Eigen::half>(DT_FLOAT16, dims, {1}, dims);
+  CheckAdd<int32_t>(DT_INT32, dims, row_dims, dims);
+  CheckAdd<std::complex<float>>(DT_COMPLEX64, {1031, 1}, row_dims, dims);
+  CheckAddInplace<float>(DT_FLOAT, dims, row_dims, true);
+}
+
+TEST_F(add_aicpu_kernel_test, add_aicpu_kernel_test_invalid) {
+  std::vector<float> x = RandomValues<float>(12, 7);
+  std::vector<float> y = RandomValues<float>(12, 8);
+  std::vector<float> out(12);
+  // shapes that do not broadcast, and an output of the wrong size
+  EXPECT_NE(RunAdd(DT_FLOAT, {3, 4}, x.data(), {4, 3}, y.data(), {3, 4}, out.data()), KERNEL_STATUS_OK);
+  EXPECT_EQ(RunAdd(DT_FLOAT, {3, 4}, x.data(), {3, 4}, y.data(), {2, 4}, out.data()), KERNEL_STATUS_PARAM_INVALID);
+  // an empty input leaves the output alone
+  out[0] = 1.0f;
+  EXPECT_EQ(RunAdd(DT_FLOAT, {0, 4}, x.data(), {3, 4}, y.data(), {0, 4}, out.data()), KERNEL_STATUS_OK);
+  EXPECT_EQ(out[0], 1.0f);
+}
@@ -0,0 +1,672 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright 2022 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+host tests and timings of the graph compile helpers of cust_impl/add.py
+
+impl.util.platform_adapter and the other impl.util modules add.py imports are replaced by the
+local fakes below, so format selection and shape normalization run on a plain linux box without
+the tbe packages. Run with `python -m pytest add_impl_ut.py` or `python add_impl_ut.py`.
+
+The per call latency of every timed function and the import time of add.py are compared with
+add_impl_perf_budget.json when ADD_IMPL_PERF=1 is set, wall clock budgets do not hold on shared
+hosts so the timings are skipped by default. ADD_IMPL_PERF_SCALE multiplies the budgets on slow hosts.
+"""
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import unittest
+from unittest import mock
+
+ADD_IMPL_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "ops", "add",
+                             "ai_core", "cust_impl", "add.py")
+PERF_BUDGET_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "add_impl_perf_budget.json")
+PERF_SCALE_ENV = "ADD_IMPL_PERF_SCALE"
+PERF_ENABLE_ENV = "ADD_IMPL_PERF"
+# calls of one timing, the least of the rounds is compared with the budget
+PERF_CALLS = 200
+PERF_ROUNDS = 5
+
+SOC_SPEC = {"SHORT_SOC_VERSION": "Ascend910", "CORE_NUM": 32, "UB_SIZE": 262144}
+BUILD_CONFIG = {"kernel_meta_parent_dir": None}
+FAKE_MODULES = ("impl", "impl.util", "impl.util.platform_adapter", "impl.util.util_common",
+                "impl.util.util_select_op_base", "impl.util.util_compute")
+# add.py loads these only to build kernels, importing it, format selection and reshape run without them
+LAZY_MODULES = ("impl.util.util_compute",)
+# the op entries the registration decorators of add.py must see at import
+REGISTERED_ENTRIES = [("register_operator_compute", "Add", "add_compute"), ("register_operator", "Add", "add")]
+IMPORT_PROBE_ARG = "--import-probe"
+IMPORT_PROBE_RUNS = 3
+
+
+class FakeShapeError(RuntimeError):
+    """
+    raised by the fakes where the tbe helpers raise
+    """
+
+
+class _FakeAny:
+    """
+    stands for the tbe objects only the kernel build touches
+    """
+
+    def __getattr__(self, name):
+        return _FakeAny()
+
+    def __call__(self, *args, **kwargs):
+        return _FakeAny()
+
+
+def _fake_decorator_factory(*args, **kwargs):
+    return lambda func: func
+
+
+def _fake_register_factory(kind, registered):
+    """
+    a fake of register_operator or register_operator_compute, it records the entries it decorates
+    """
+
+    def factory(op_type, *args, **kwargs):
+        def decorator(func):
+            registered.append((kind, op_type, func.__name__))
+            return func
+
+        return decorator
+
+    return factory
+
+
+def _raise_shape_error(*args, **kwargs):
+    raise FakeShapeError(str(args))
+
+
+def _scalar2tensor_one(shape):
+    if isinstance(shape, (list, tuple)) and not shape:
+        return [1]
+    return shape
+
+
+def _broadcast_shapes(shape1, shape2, op_name="", param_name_input1="", param_name_input2=""):
+    shape1 = list(shape1)
+    shape2 = list(shape2)
+    rank = max(len(shape1), len(shape2))
+    shape1 = [1] * (rank - len(shape1)) + shape1
+    shape2 = [1] * (rank - len(shape2)) + shape2
+    shape_max = []
+    for dim1, dim2 in zip(shape1, shape2):
+        if dim1 != dim2 and dim1 != 1 and dim2 != 1:
+            _raise_shape_error(param_name_input1, shape1, param_name_input2, shape2)
+        shape_max.append(dim2 if dim1 == 1 else dim1)
+    return shape1, shape2, shape_max
+
+
+def _is_scalar(shape):
+    return len(shape) == 1 and shape[0] == 1
+
+
+def _check_shape(shape, param_name=""):
+    if not shape or len(shape) > 8 or any(dim <= 0 for dim in shape):
+        _raise_shape_error(param_name, shape)
+
+
+def _gen_param(classify, name, datatype, format, unknownshape_format=None):
+    param = {"classify": classify, "name": name, "dtype": datatype, "format": format}
+    if unknownshape_format is not None:
+        param["unknownshape_format"] = unknownshape_format
+    return param
+
+
+def _get_dynamic_param_in_json(param_desc_list):
+    param_dynamic = {}
+    for param in param_desc_list:
+        param_dynamic[param.get("classify")] = {key: value for key, value in param.items() if key != "classify"}
+    return json.dumps(param_dynamic, indent=4)
+
+
+def _is_same_group(inputs):
+    return len({input_dict.get("sub_format", 0) for input_dict in inputs}) == 1
+
+
+def _new_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def _build_fake_modules():
+    tbe_platform = types.SimpleNamespace(get_soc_spec=SOC_SPEC.get, get_current_build_config=BUILD_CONFIG.get)
+    shape_util = types.SimpleNamespace(scalar2tensor_one=_scalar2tensor_one, broadcast_shapes=_broadcast_shapes,
+                                       shape_to_list=list)
+    para_check = types.SimpleNamespace(is_scalar=_is_scalar, check_shape=_check_shape,
+                                       check_dtype=lambda *args, **kwargs: None,
+                                       check_op_params=_fake_decorator_factory, REQUIRED_INPUT="required_input",
+                                       REQUIRED_OUTPUT="required_output", KERNEL_NAME="kernel_name")
+    error_manager_vector = types.SimpleNamespace(raise_err_input_value_invalid=_raise_shape_error,
+                                                 raise_err_inputs_dtype_not_equal=_raise_shape_error,
+                                                 raise_err_specific_reson=_raise_shape_error)
+    registered = []
+    platform_adapter = _new_module(
+        "impl.util.platform_adapter", tbe=_FakeAny(), tbe_platform=tbe_platform,
+        tbe_context=types.SimpleNamespace(get_context=lambda: None), para_check=para_check, shape_util=shape_util,
+        tvm=_FakeAny(), register_operator=_fake_register_factory("register_operator", registered),
+        register_operator_compute=_fake_register_factory("register_operator_compute", registered),
+        classify=_FakeAny(), OpPatternMode=_FakeAny(), error_manager_vector=error_manager_vector,
+        registered=registered)
+    util_common = _new_module("impl.util.util_common", is_support_fractal_z_inputs=lambda inputs: True,
+                              is_same_group=_is_same_group, is_unknown=lambda inputs: False,
+                              gen_range=lambda shape: [(dim, dim) for dim in shape])
+    util_select_op_base = _new_module("impl.util.util_select_op_base", gen_param=_gen_param,
+                                      get_dynamic_param_in_json=_get_dynamic_param_in_json)
+    util_compute = _new_module("impl.util.util_compute", check_fc_fuse=lambda tensor: False,
+                               batchmatmul_elem_nd2nz=None, batchmatmul_elem_reshape=None,
+                               check_batchmatmul_fuse=lambda tensor: False, fetch_batchmatmul_fuse_tensor=None)
+    util = _new_module("impl.util", platform_adapter=platform_adapter, util_common=util_common,
+                       util_select_op_base=util_select_op_base, util_compute=util_compute)
+    util.__path__ = []
+    impl = _new_module("impl", util=util)
+    impl.__path__ = []
+    return {"impl": impl, "impl.util": util, "impl.util.platform_adapter": platform_adapter,
+            "impl.util.util_common": util_common, "impl.util.util_select_op_base": util_select_op_base,
+            "impl.util.util_compute": util_compute}
+
+
+_SAVED_MODULES = {}
+add_impl = None
+
+
+def setUpModule():
+    """
+    load add.py on the fakes, the real impl modules are put back by tearDownModule
+    """
+    global add_impl
+    for name, module in _build_fake_modules().items():
+        _SAVED_MODULES[name] = sys.modules.get(name)
+        sys.modules[name] = module
+    add_impl = _load_add_impl()
+
+
+def tearDownModule():
+    for name in FAKE_MODULES:
+        if _SAVED_MODULES.get(name) is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = _SAVED_MODULES.get(name)
+
+
+def _load_add_impl():
+    spec = importlib.util.spec_from_file_location("add_impl_under_test", ADD_IMPL_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _tensor(shape, tensor_format="ND", ori_shape=None, ori_format=None, dtype="float16"):
+    return {"shape": list(shape), "ori_shape": list(shape if ori_shape is None else ori_shape),
+            "format": tensor_format, "ori_format": tensor_format if ori_format is None else ori_format,
+            "dtype": dtype}
+
+
+def _param_lists(param_json, classify):
+    param = json.loads(param_json).get(classify)
+    return param.get("dtype").split(","), param.get("format").split(",")
+
+
+DTYPES_910 = ["float32", "float16", "int32", "int8", "uint8"]
+DTYPES_HI3796 = ["float16", "int32", "int8", "uint8"]
+SELECT_FORMATS = {"ND", "NCHW", "NHWC", "FRACTAL_NZ", "NC1HWC0", "FRACTAL_Z", "C1HWNCoC0", "NDC1HWC0",
+                  "FRACTAL_Z_3D"}
+
+# (ori shape x, ori format x, ori shape y, ori format y)
+SELECT_FORMAT_CORPUS = [
+    ([2], "ND", [2], "ND"),
+    ([16, 16], "ND", [16, 16], "ND"),
+    ([4, 4], "ND", [1], "ND"),
+    ([1], "ND", [4, 4], "ND"),
+    ([32, 48], "ND", [48], "ND"),
+    ([48], "ND", [32, 48], "ND"),
+    ([32, 32], "ND", [3, 5], "ND"),
+    ([8, 32, 7, 7], "NCHW", [8, 32, 7, 7], "NCHW"),
+    ([8, 7, 7, 32], "NHWC", [8, 7, 7, 32], "NHWC"),
+    ([16, 32, 7, 7], "NCHW", [1], "ND"),
+    ([8, 32, 7, 7], "NCHW", [32, 1, 1], "NCHW"),
+    ([8, 7, 7, 32], "NHWC", [32], "NHWC"),
+    ([3, 3, 16, 16], "HWCN", [3, 3, 16, 16], "HWCN"),
+    ([2, 16, 4, 4, 4], "NCDHW", [2, 16, 4, 4, 4], "NCDHW"),
+    ([2, 4, 4, 4, 16], "NDHWC", [1, 1, 1, 1, 16], "NDHWC"),
+    ([-1, 16], "ND", [-1, 16], "ND"),
+    ([-1, 32, 7, 7], "NCHW", [-1, 32, 7, 7], "NCHW"),
+    ([], "ND", [], "ND"),
+]
+
+# (x, y, expected shape x, expected shape y, broadcast_flag, is_scene_1d)
+STATIC_RESHAPE_CORPUS = [
+    (_tensor([2, 3, 4]), _tensor([1]), [2, 3, 4], [1, 1, 1], False, True),
+    (_tensor([2, 3, 4]), _tensor([3, 1]), [2, 3, 4], [1, 3, 1], True, False),
+    (_tensor([5, 1]), _tensor([1, 1]), [5], [1], True, False),
+    (_tensor([]), _tensor([]), [1], [1], False, True),
+    (_tensor([4, 1, 6]), _tensor([3, 1]), [4, 1, 6], [1, 3, 1], True, False),
+    (_tensor([2, 3, 16, 16], "FRACTAL_NZ", [48, 32], "ND"), _tensor([32]), [2, 3, 16, 16], [2, 1, 1, 16], True,
+     False),
+    (_tensor([2, 3, 16, 16], "FRACTAL_NZ", [48, 32], "ND"), _tensor([48, 1]), [2, 3, 16, 16], [1, 3, 16, 1], True,
+     False),
+    (_tensor([32]), _tensor([2, 3, 16, 16], "FRACTAL_NZ", [48, 32], "ND"), [2, 1, 1, 16], [2, 3, 16, 16], True,
+     False),
+    (_tensor([2, 3, 16, 16], "FRACTAL_NZ", [48, 32], "ND"), _tensor([2, 3, 16, 16], "FRACTAL_NZ", [48, 32], "ND"),
+     [2, 3, 16, 16], [2, 3, 16, 16], True, False),
+]
+
+STATIC_RESHAPE_ERRORS = [
+    (_tensor([2, 3]), _tensor([4, 3])),
+    (_tensor([2, 0]), _tensor([2, 1])),
+    (_tensor([1] * 9), _tensor([2, 1])),
+]
+
+
+class TestAddSelectFormat(unittest.TestCase):
+    """
+    op_select_format and op_sub_select_format on the format corpus
+    """
+
+    def setUp(self):
+        add_impl.select_format_cache_clear()
+        SOC_SPEC["SHORT_SOC_VERSION"] = "Ascend910"
+
+    def test_nd_vector(self):
+        param_json = add_impl.op_select_format(_tensor([2]), _tensor([2]), _tensor([2]))
+        for classify in ("input0", "input1", "output0"):
+            dtypes, formats = _param_lists(param_json, classify)
+            self.assertEqual(dtypes, DTYPES_910)
+            self.assertEqual(formats, ["ND"] * len(DTYPES_910))
+        self.assertNotIn("unknownshape_format", json.loads(param_json).get("input0"))
+
+    def test_nz_when_last_two_dims_match(self):
+        param_json = add_impl.op_select_format(_tensor([16, 16]), _tensor([16, 16]), _tensor([16, 16]))
+        dtypes, formats = _param_lists(param_json, "input0")
+        self.assertEqual(dtypes, [dtype for dtype in DTYPES_910 for _ in range(2)])
+        self.assertEqual(formats, ["FRACTAL_NZ", "ND"] * len(DTYPES_910))
+        self.assertEqual(_param_lists(param_json, "input1"), (dtypes, formats))
+
+    def test_scalar_second_input(self):
+        param_json = add_impl.op_select_format(_tensor([4, 4]), _tensor([1]), _tensor([4, 4]))
+        self.assertEqual(param_json, add_impl.op_sub_select_format(_tensor([4, 4]), _tensor([1]), _tensor([4, 4])))
+        dtypes, formats = _param_lists(param_json, "input0")
+        self.assertEqual(len(dtypes), 7 * len(DTYPES_910))
+        self.assertEqual(formats[:7], ["ND", "NCHW", "NHWC", "FRACTAL_NZ", "NC1HWC0", "FRACTAL_Z", "C1HWNCoC0"])
+        self.assertEqual(set(_param_lists(param_json, "input1")[1]), {"ND"})
+
+    def test_sub_select_format_needs_scalar(self):
+        self.assertEqual(add_impl.op_sub_select_format(_tensor([4, 4]), _tensor([4, 4]), _tensor([4, 4])), "None")
+
+    def test_soc_dtype_list(self):
+        SOC_SPEC["SHORT_SOC_VERSION"] = "Hi3796CV300ES"
+        dtypes, _ = _param_lists(add_impl.op_select_format(_tensor([2]), _tensor([2]), _tensor([2])), "input0")
+        self.assertEqual(dtypes, DTYPES_HI3796)
+
+    def test_5hd_for_matching_4d(self):
+        x = _tensor([8, 32, 7, 7], "NCHW")
+        _, formats = _param_lists(add_impl.op_select_format(x, x, x), "input0")
+        self.assertIn("NC1HWC0", formats)
+
+    def test_corpus_consistency(self):
+        for shape_x, format_x, shape_y, format_y in SELECT_FORMAT_CORPUS:
+            x = _tensor(shape_x, format_x)
+            y = _tensor(shape_y, format_y)
+            with self.subTest(x=shape_x, y=shape_y):
+                params = json.loads(add_impl.op_select_format(x, y, x))
+                dtypes, formats = _param_lists(json.dumps(params), "output0")
+                self.assertEqual(len(dtypes), len(formats))
+                self.assertTrue(set(dtypes) <= set(DTYPES_910))
+                self.assertTrue(set(formats) <= SELECT_FORMATS)
+                for classify in ("input0", "input1"):
+                    self.assertEqual(_param_lists(json.dumps(params), classify)[0], dtypes)
+                    self.assertEqual(len(_param_lists(json.dumps(params), classify)[1]), len(formats))
+                dynamic = -1 in shape_x or -1 in shape_y
+                self.assertEqual("unknownshape_format" in params.get("input0"), dynamic)
+
+    def test_cache_hits(self):
+        for shape_x, format_x, shape_y, format_y in SELECT_FORMAT_CORPUS:
+            add_impl.op_select_format(_tensor(shape_x, format_x), _tensor(shape_y, format_y), None)
+        misses = add_impl.select_format_cache_info().get("misses")
+        for shape_x, format_x, shape_y, format_y in SELECT_FORMAT_CORPUS:
+            uncached = add_impl._op_select_format(_tensor(shape_x, format_x), _tensor(shape_y, format_y), None, "add",
+                                                  "Ascend910")
+            cached = add_impl.op_select_format(_tensor(shape_x, format_x), _tensor(shape_y, format_y), None)
+            self.assertEqual(cached, uncached)
+        info = add_impl.select_format_cache_info()
+        self.assertEqual(info.get("misses"), misses)
+        self.assertGreaterEqual(info.get("hits"), len(SELECT_FORMAT_CORPUS))
+
+
+class TestAddStaticReshape(unittest.TestCase):
+    """
+    static_reshape, _infer_shape and static_reshape_batch on the shape corpus
+    """
+
+    def test_corpus(self):
+        for x, y, shape_x, shape_y, broadcast_flag, is_scene_1d in STATIC_RESHAPE_CORPUS:
+            with self.subTest(x=x.get("shape"), y=y.get("shape")):
+                result = add_impl.static_reshape(dict(x), dict(y))
+                self.assertEqual([list(result[0]), list(result[1])], [shape_x, shape_y])
+                self.assertEqual(result[2:], (broadcast_flag, is_scene_1d))
+
+    def test_errors(self):
+        for x, y in STATIC_RESHAPE_ERRORS:
+            with self.subTest(x=x.get("shape"), y=y.get("shape")):
+                with self.assertRaises(FakeShapeError):
+                    add_impl.static_reshape(x, y)
+
+    def test_infer_shape_keeps_nd(self):
+        shape_x, shape_y = add_impl._infer_shape(0, _tensor([4, 5]), _tensor([5]))
+        self.assertEqual((list(shape_x), list(shape_y)), ([4, 5], [5]))
+
+    def test_batch_matches_scalar(self):
+        pairs = [(x, y) for x, y, *_ in STATIC_RESHAPE_CORPUS]
+        result = add_impl.static_reshape_batch([x.get("shape") for x, _ in pairs], [y.get("shape") for _, y in pairs],
+                                               [x.get("format") for x, _ in pairs],
+                                               [y.get("format") for _, y in pairs],
+                                               [x.get("ori_shape") for x, _ in pairs],
+                                               [y.get("ori_shape") for _, y in pairs])
+        for i, (x, y) in enumerate(pairs):
+            shape_x, shape_y, broadcast_flag, is_scene_1d = add_impl.static_reshape(dict(x), dict(y))
+            self.assertEqual(list(result.get("shape_x")[i]), list(shape_x))
+            self.assertEqual(list(result.get("shape_y")[i]), list(shape_y))
+            self.assertEqual(bool(result.get("broadcast_flag")[i]), broadcast_flag)
+            self.assertEqual(bool(result.get("is_scene_1d")[i]), is_scene_1d)
+
+    def test_gen_para(self):
+        params = add_impl._gen_para(["float16"], ["ND"], ["ND"], ["ND"], ["ND"], [-1, 2], [2])
+        self.assertEqual([param.get("unknownshape_format") for param in params], ["ND"] * 3)
+        params = add_impl._gen_para(["float16"], ["ND"], ["ND"], ["ND"], ["ND"], [4, 2], [2])
+        self.assertTrue(all("unknownshape_format" not in param for param in params))
+
+
+class _FakeOpContext:
+    """
+    the compile info part of the tbe op context
+    """
+
+    def __init__(self):
+        self.compile_info = {}
+
+    def add_compile_info(self, key, value):
+        self.compile_info[key] = value
+
+    def get_all_compile_info(self):
+        return self.compile_info
+
+
+class TestAddKernelCache(unittest.TestCase):
+    """
+    KernelCache round trips and its use by add()
+    """
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.work_dir, "cache")
+        BUILD_CONFIG["kernel_meta_parent_dir"] = os.path.join(self.work_dir, "build")
+        self.kernel_meta_dir = os.path.join(BUILD_CONFIG.get("kernel_meta_parent_dir"), "kernel_meta")
+        self.context = _FakeOpContext()
+        self.opp_dir = os.path.join(self.work_dir, "opp")
+        self._write_opp_version("Version=6.0.RC1")
+        patchers = [mock.patch.object(add_impl, "tbe_context", types.SimpleNamespace(get_context=lambda: self.context)),
+                    mock.patch.dict(os.environ, {"ADD_KERNEL_CACHE_DIR": self.cache_dir,
+                                                 "ASCEND_OPP_PATH": self.opp_dir})]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        BUILD_CONFIG["kernel_meta_parent_dir"] = None
+        BUILD_CONFIG.pop("op_debug_level", None)
+        add_impl.KernelCache._toolkit_version = None
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _write_opp_version(self, version):
+        os.makedirs(self.opp_dir, exist_ok=True)
+        with open(os.path.join(self.opp_dir, "version.info"), "w") as version_file:
+            version_file.write(version + "\n")
+        add_impl.KernelCache._toolkit_version = None
+
+    def _build_kernel(self, kernel_name):
+        os.makedirs(self.kernel_meta_dir, exist_ok=True)
+        with open(os.path.join(self.kernel_meta_dir, kernel_name + ".o"), "wb") as kernel_file:
+            kernel_file.write(b"\x7fELF" + kernel_name.encode())
+        with open(os.path.join(self.kernel_meta_dir, kernel_name + ".json"), "w") as json_file:
+            json.dump({"binFileName": kernel_name, "kernelName": kernel_name + "__kernel0"}, json_file)
+        self.context.add_compile_info("block_dim", 32)
+        self.context.add_compile_info("ub_size", 262144)
+
+    def test_kernel_meta_dir_from_build_config(self):
+        self.assertEqual(add_impl.KernelCache.from_env().kernel_meta_dir, os.path.realpath(self.kernel_meta_dir))
+
+    def test_store_and_materialize(self):
+        cache = add_impl.KernelCache.from_env()
+        key = cache.make_key(_tensor([4, 4]), _tensor([4, 4]))
+        self.assertFalse(cache.materialize(key, "add_b"))
+        self._build_kernel("add_a")
+        cache.store(key, "add_a")
+
+        self.context = _FakeOpContext()
+        self.assertTrue(cache.materialize(key, "add_b"))
+        with open(os.path.join(self.kernel_meta_dir, "add_b.o"), "rb") as kernel_file:
+            self.assertEqual(kernel_file.read(), b"\x7fELFadd_a")
+        with open(os.path.join(self.kernel_meta_dir, "add_b.json"), "r") as json_file:
+            kernel_json = json.load(json_file)
+        self.assertEqual(kernel_json.get("binFileName"), "add_b")
+        self.assertEqual(kernel_json.get("kernelName"), "add_a__kernel0")
+        self.assertEqual(self.context.compile_info, {"block_dim": 32, "ub_size": 262144})
+
+    def test_key_depends_on_inputs(self):
+        cache = add_impl.KernelCache.from_env()
+        self.assertEqual(cache.make_key(_tensor([4, 4]), _tensor([4, 4])),
+                         cache.make_key(_tensor([4, 4]), _tensor([4, 4])))
+        self.assertNotEqual(cache.make_key(_tensor([4, 4]), _tensor([4, 4])),
+                            cache.make_key(_tensor([4, 4]), _tensor([4, 1])))
+        self.assertNotEqual(cache.make_key(_tensor([4, 4]), _tensor([4, 4])),
+                            cache.make_key(_tensor([4, 4], dtype="float32"), _tensor([4, 4], dtype="float32")))
+
+    def test_key_depends_on_toolkit_and_build_config(self):
+        cache = add_impl.KernelCache.from_env()
+        key = cache.make_key(_tensor([4, 4]), _tensor([4, 4]))
+        self._write_opp_version("Version=6.3.RC1")
+        upgraded_key = cache.make_key(_tensor([4, 4]), _tensor([4, 4]))
+        self.assertNotEqual(key, upgraded_key)
+        BUILD_CONFIG["op_debug_level"] = 2
+        self.assertNotEqual(upgraded_key, cache.make_key(_tensor([4, 4]), _tensor([4, 4])))
+
+    def test_no_cache_without_toolkit_version(self):
+        with mock.patch.dict(os.environ, {"ASCEND_OPP_PATH": os.path.join(self.work_dir, "no_opp")}):
+            add_impl.KernelCache._toolkit_version = None
+            self.assertIsNone(add_impl.KernelCache.from_env())
+
+    def test_no_store_without_compile_info(self):
+        cache = add_impl.KernelCache.from_env()
+        key = cache.make_key(_tensor([4, 4]), _tensor([4, 4]))
+        self._build_kernel("add_a")
+        self.context = types.SimpleNamespace(add_compile_info=lambda key, value: None)
+        cache.store(key, "add_a")
+        self.assertFalse(cache.materialize(key, "add_b"))
+
+    def test_add_hit_replays_compile_info(self):
+        x, y = _tensor([4, 4]), _tensor([4, 1])
+        cache = add_impl.KernelCache.from_env()
+        # the key add() computes, on the inputs after static_reshape
+        shape_x, shape_y, _, _ = add_impl.static_reshape(dict(x), dict(y))
+        x_static = dict(x, shape=shape_x, range=[(dim, dim) for dim in shape_x])
+        y_static = dict(y, shape=shape_y, range=[(dim, dim) for dim in shape_y])
+        self._build_kernel("add_a")
+        cache.store(cache.make_key(x_static, y_static), "add_a")
+
+        self.context = _FakeOpContext()
+        with mock.patch.object(add_impl, "classify", side_effect=AssertionError("kernel rebuilt")):
+            add_impl.add(x, y, dict(x), kernel_name="add_b")
+        self.assertTrue(os.path.isfile(os.path.join(self.kernel_meta_dir, "add_b.o")))
+        self.assertEqual(self.context.compile_info, {"block_dim": 32, "ub_size": 262144})
+
+    def test_add_dynamic_skips_cache(self):
+        x, y = _tensor([-1, 4]), _tensor([-1, 4])
+        with mock.patch.object(add_impl.util_common, "is_unknown", return_value=True), \
+                mock.patch.object(add_impl.KernelCache, "from_env") as from_env, \
+                mock.patch.object(add_impl, "classify", return_value=[]):
+            add_impl.add(x, y, dict(x), kernel_name="add_dynamic")
+        from_env.assert_not_called()
+        self.assertEqual(self.context.compile_info, {})
+
+
+def _import_probe():
+    """
+    run in a fresh interpreter by _run_import_probe, print the import time of add.py in ms.
+    Where the tbe packages are installed add.py is imported on them and the lazily loaded modules
+    it loaded are listed. Elsewhere it is imported on the fakes with the lazily loaded modules
+    unavailable, the entries registered at import are listed, then the corpus is run through
+    format selection and reshape.
+    """
+    if importlib.util.find_spec("impl") is not None:
+        loaded_before = set(sys.modules)
+        start = time.perf_counter()
+        _load_add_impl()
+        import_ms = (time.perf_counter() - start) * 1e3
+        loaded = sorted(name for name in LAZY_MODULES if name in sys.modules and name not in loaded_before)
+        print(json.dumps({"import_ms": import_ms, "package": "installed", "loaded": loaded}))
+        return
+
+    modules = _build_fake_modules()
+    sys.modules.update({name: module for name, module in modules.items() if name not in LAZY_MODULES})
+    util = modules.get("impl.util")
+    for name in LAZY_MODULES:
+        util.__dict__.pop(name.rsplit(".", 1)[-1])
+        # a None entry makes the import raise ImportError
+        sys.modules[name] = None
+    start = time.perf_counter()
+    module = _load_add_impl()
+    import_ms = (time.perf_counter() - start) * 1e3
+    registered = list(modules.get("impl.util.platform_adapter").registered)
+
+    for shape_x, format_x, shape_y, format_y in SELECT_FORMAT_CORPUS:
+        module.op_select_format(_tensor(shape_x, format_x), _tensor(shape_y, format_y), None)
+    for x, y, *_ in STATIC_RESHAPE_CORPUS:
+        module.static_reshape(dict(x), dict(y))
+    print(json.dumps({"import_ms": import_ms, "package": "fake", "loaded": [], "registered": registered}))
+
+
+def _run_import_probe():
+    result = subprocess.run([sys.executable, os.path.realpath(__file__), IMPORT_PROBE_ARG], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True, check=False)
+    if result.returncode != 0:
+        raise AssertionError("import probe failed:\n%s" % result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestAddImplImport(unittest.TestCase):
+    """
+    importing add.py registers its op entries and loads none of the compute only modules, which format
+    selection and reshape do not need either
+    """
+
+    def test_import_loads_no_compute_module(self):
+        result = _run_import_probe()
+        self.assertGreater(result.get("import_ms"), 0)
+        self.assertEqual(result.get("loaded"), [])
+
+    @unittest.skipIf(importlib.util.find_spec("impl") is not None, "the tbe packages are installed")
+    def test_op_entries_registered_at_import_without_compute_modules(self):
+        result = _run_import_probe()
+        self.assertEqual([tuple(entry) for entry in result.get("registered")], REGISTERED_ENTRIES)
+
+    def test_op_entries_registered_at_import(self):
+        self.assertEqual(sys.modules.get("impl.util.platform_adapter").registered, REGISTERED_ENTRIES)
+        # the module attributes are the decorated entries, no proxy stands in front of them
+        self.assertEqual(add_impl.add.__code__.co_name, "add")
+        self.assertEqual(add_impl.add_compute.__code__.co_name, "add_compute")
+
+
+def _per_call_us(func):
+    best = None
+    for _ in range(PERF_ROUNDS):
+        start = time.perf_counter()
+        for _ in range(PERF_CALLS):
+            func()
+        cost = (time.perf_counter() - start) / PERF_CALLS * 1e6
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+@unittest.skipUnless(os.environ.get(PERF_ENABLE_ENV) == "1", "timings run with %s=1" % PERF_ENABLE_ENV)
+class TestAddImplPerf(unittest.TestCase):
+    """
+    per call latency of the graph compile helpers against add_impl_perf_budget.json
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with open(PERF_BUDGET_FILE, "r") as budget_file:
+            cls.budget = json.load(budget_file)
+        cls.scale = float(os.environ.get(PERF_SCALE_ENV, "1"))
+        corpus = [(_tensor(shape_x, format_x), _tensor(shape_y, format_y))
+                  for shape_x, format_x, shape_y, format_y in SELECT_FORMAT_CORPUS]
+        reshape_pairs = [(x, y) for x, y, *_ in STATIC_RESHAPE_CORPUS]
+        batch_pairs = reshape_pairs * 64
+        cls.timed = {
+            "op_select_format_uncached": (
+                lambda: [add_impl._op_select_format(x, y, x, "add", "Ascend910") for x, y in corpus], len(corpus)),
+            "op_select_format_cached": (
+                lambda: [add_impl.op_select_format(x, y, x) for x, y in corpus], len(corpus)),
+            "op_sub_select_format": (
+                lambda: [add_impl._op_sub_select_format(x, y, x, "add", "Ascend910") for x, y in corpus],
+                len(corpus)),
+            "static_reshape": (
+                lambda: [add_impl.static_reshape(dict(x), dict(y)) for x, y in reshape_pairs], len(reshape_pairs)),
+            "static_reshape_batch": (
+                lambda: add_impl.static_reshape_batch([x.get("shape") for x, _ in batch_pairs],
+                                                      [y.get("shape") for _, y in batch_pairs],
+                                                      [x.get("format") for x, _ in batch_pairs],
+                                                      [y.get("format") for _, y in batch_pairs],
+                                                      [x.get("ori_shape") for x, _ in batch_pairs],
+                                                      [y.get("ori_shape") for _, y in batch_pairs]),
+                len(batch_pairs)),
+        }
+
+    def test_latency_budget(self):
+        timings = {}
+        for name, (func, item_num) in self.timed.items():
+            timings[name] = _per_call_us(func) / item_num
+        sys.stderr.write("add impl per call us: %s\n" % json.dumps({k: round(v, 2) for k, v in timings.items()}))
+        for name, per_call_us in timings.items():
+            with self.subTest(name=name):
+                self.assertIn(name, self.budget)
+                self.assertLessEqual(per_call_us, self.budget.get(name) * self.scale,
+                                     "%s takes %.2f us per call, budget %.2f us" %
+                                     (name, per_call_us, self.budget.get(name) * self.scale))
+
+    def test_import_budget(self):
+        import_ms = min(_run_import_probe().get("import_ms") for _ in range(IMPORT_PROBE_RUNS))
+        sys.stderr.write("add impl import ms: %.2f\n" % import_ms)
+        budget_ms = self.budget.get("import_add_ms") * self.scale
+        self.assertLessEqual(import_ms, budget_ms, "import of add.py takes %.2f ms, budget %.2f ms" %
+                             (import_ms, budget_ms))
+
+
+if __name__ == "__main__":
+    if IMPORT_PROBE_ARG in sys.argv:
+        _import_probe()
+    else:
+        unittest.main()
@@ -1,4 +1,62 @@
+#include <iostream>
+#include <vector>
+
 #include "gtest/gtest.h"
+#include "kernel_run_context_facker.h"
+#include "register/op_impl_registry.h"
+#include "add/op_proto/inc/add_op.h"
+
+namespace {
+gert::Shape ToShape(const std::vector<int64_t> &dims) {
+  gert::Shape shape;
+  for (auto dim : dims) {
+    shape.AppendDim(dim);
+  }
+  return shape;
+}
+
+gert::StorageShape ToStorageShape(const std::vector<int64_t> &dims) {
+  gert::StorageShape shape;
+  shape.MutableOriginShape() = ToShape(dims);
+  shape.MutableStorageShape() = ToShape(dims);
+  return shape;
+}
+
+std::vector<int64_t> ToDims(const gert::Shape &shape) {
+  std::vector<int64_t> dims;
+  for (size_t i = 0; i < shape.GetDimNum(); i++) {
+    dims.push_back(shape.GetDim(i));
+  }
+  return dims;
+}
+
+/*
+ * run the infer shape function registered for Add, out_dims is the output shape before and after it,
+ * so that a stale output shape is seen to be overwritten
+ */
+ge::graphStatus InferAdd(const std::vector<int64_t> &x_dims, const std::vector<int64_t> &y_dims,
+                         std::vector<int64_t> &out_dims) {
+  gert::StorageShape x_shape = ToStorageShape(x_dims);
+  gert::StorageShape y_shape = ToStorageShape(y_dims);
+  gert::StorageShape out_shape = ToStorageShape(out_dims);
+  auto holder = gert::InferShapeContextFaker()
+                    .NodeIoNum(2, 1)
+                    .IrInstanceNum({1, 1})
+                    .InputShapes({&x_shape, &y_shape})
+                    .OutputShapes({&out_shape})
+                    .Build();
+  auto infer_shape_func = gert::OpImplRegistry::GetInstance().GetOpImpl("Add")->infer_shape;
+  ge::graphStatus ret = infer_shape_func(holder.GetContext<gert::InferShapeContext>());
+  out_dims = ToDims(*holder.GetContext<gert::InferShapeContext>()->GetOutputShape(0));
+  return ret;
+}
+
+std::vector<int64_t> InferAdd(const std::vector<int64_t> &x_dims, const std::vector<int64_t> &y_dims) {
+  std::vector<int64_t> out_dims;
+  EXPECT_EQ(InferAdd(x_dims, y_dims, out_dims), ge::GRAPH_SUCCESS);
+  return out_dims;
+}
+}  // namespace
 
 class add_test : public testing::Test {
 protected:
@@ -11,7 +69,47 @@ protected:
   }
 };
 
-TEST_F(add_test, add_test_001) {
-  int ret = 1;
-  EXPECT_EQ(ret, 1);
-}
\ No newline at end of file
+TEST_F(add_test, add_test_static_broadcast) {
+  EXPECT_EQ(InferAdd({2, 3, 4}, {2, 3, 4}), std::vector<int64_t>({2, 3, 4}));
+  EXPECT_EQ(InferAdd({2, 1, 4}, {1, 3, 1}), std::vector<int64_t>({2, 3, 4}));
+  EXPECT_EQ(InferAdd({5}, {1}), std::vector<int64_t>({5}));
+  EXPECT_EQ(InferAdd({}, {}), std::vector<int64_t>({}));
+  // an output shape of another rank is replaced
+  std::vector<int64_t> out_dims = {9, 9, 9, 9, 9};
+  EXPECT_EQ(InferAdd({2, 1, 4}, {3, 1}, out_dims), ge::GRAPH_SUCCESS);
+  EXPECT_EQ(out_dims, std::vector<int64_t>({2, 3, 4}));
+}
+
+TEST_F(add_test, add_test_rank_padding) {
+  EXPECT_EQ(InferAdd({4}, {2, 3, 4}), std::vector<int64_t>({2, 3, 4}));
+  EXPECT_EQ(InferAdd({2, 3, 1}, {5}), std::vector<int64_t>({2, 3, 5}));
+  EXPECT_EQ(InferAdd({}, {2, 3}), std::vector<int64_t>({2, 3}));
+  EXPECT_EQ(InferAdd({7, 1}, {}), std::vector<int64_t>({7, 1}));
+}
+
+TEST_F(add_test, add_test_unknown_dim) {
+  // -1 takes the other dim unless it is 1, a known dim other than 1 wins over -1
+  EXPECT_EQ(InferAdd({-1, 4}, {1, 4}), std::vector<int64_t>({-1, 4}));
+  EXPECT_EQ(InferAdd({1, 4}, {-1, 4}), std::vector<int64_t>({-1, 4}));
+  EXPECT_EQ(InferAdd({-1, 4}, {3, 4}), std::vector<int64_t>({3, 4}));
+  EXPECT_EQ(InferAdd({3, 4}, {-1, 4}), std::vector<int64_t>({3, 4}));
+  EXPECT_EQ(InferAdd({-1, 4}, {0, 4}), std::vector<int64_t>({0, 4}));
+  EXPECT_EQ(InferAdd({0, 4}, {-1, 4}), std::vector<int64_t>({0, 4}));
+  EXPECT_EQ(InferAdd({-1, -1}, {-1, 1}), std::vector<int64_t>({-1, -1}));
+  EXPECT_EQ(InferAdd({-1}, {2, 3}), std::vector<int64_t>({2, 3}));
+}
+
+TEST_F(add_test, add_test_unknown_rank) {
+  EXPECT_EQ(InferAdd({-2}, {2, 3}), std::vector<int64_t>({-2}));
+  EXPECT_EQ(InferAdd({2, 3}, {-2}), std::vector<int64_t>({-2}));
+  EXPECT_EQ(InferAdd({-2}, {-2}), std::vector<int64_t>({-2}));
+  // a scalar broadcasts with a shape of any rank
+  EXPECT_EQ(InferAdd({-2}, {}), std::vector<int64_t>({-2}));
+}
+
+TEST_F(add_test, add_test_mismatch) {
+  std::vector<int64_t> out_dims;
+  EXPECT_EQ(InferAdd({2, 3}, {4}, out_dims), ge::GRAPH_FAILED);
+  EXPECT_EQ(InferAdd({2, 3}, {3, 3}, out_dims), ge::GRAPH_FAILED);
+  EXPECT_EQ(InferAdd({0, 3}, {2, 3}, out_dims), ge::GRAPH_FAILED);
+}
@@ -0,0 +1,171 @@
+#include <cmath>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "unsupported/Eigen/CXX11/Tensor"
+#include "cpu_kernel.h"
+#include "host_runtime.h"
+#include "parallel_cost_model.h"
+#include "status.h"
+
+using namespace aicpu;
+
+namespace {
+// float16 is summed and activated in float and rounded once, which is within an ulp of 1 of the reference
+const double kFloat16Tolerance = 1e-3;
+const double kFloatTolerance = 1e-6;
+const double kDoubleTolerance = 1e-12;
+
+int64_t NumElements(const std::vector<int64_t> &dims) {
+  int64_t num = 1;
+  for (auto dim : dims) {
+    num *= dim;
+  }
+  return num;
+}
+
+// index into an input of dims broadcast to out_dims, dims aligned to the right
+int64_t BroadcastIndex(const std::vector<int64_t> &dims, const std::vector<int64_t> &out_dims, int64_t out_index) {
+  int64_t index = 0;
+  int64_t stride = 1;
+  size_t offset = out_dims.size() - dims.size();
+  for (size_t i = out_dims.size(); i > 0; i--) {
+    int64_t pos = out_index % out_dims[i - 1];
+    out_index /= out_dims[i - 1];
+    if (i - 1 < offset) {
+      continue;
+    }
+    int64_t dim = dims[i - 1 - offset];
+    index += (dim == 1 ? 0 : pos) * stride;
+    stride *= dim;
+  }
+  return index;
+}
+
+// values in [-3, 3], both the linear part and the saturation of tanh are covered
+template <typename T>
+std::vector<T> RandomValues(int64_t num, uint32_t seed) {
+  std::mt19937 gen(seed);
+  std::uniform_real_distribution<float> dist(-3.0f, 3.0f);
+  std::vector<T> values(num);
+  for (auto &value : values) {
+    value = static_cast<T>(dist(gen));
+  }
+  return values;
+}
+
+template <typename T>
+uint32_t RunAddTanh(DataType dtype, const std::vector<int64_t> &x_dims, T *x, const std::vector<int64_t> &y_dims, T *y,
+                    const std::vector<int64_t> &out_dims, T *out) {
+  CpuKernelContext ctx("AddTanh");
+  ctx.AddInput(dtype, x_dims, x);
+  ctx.AddInput(dtype, y_dims, y);
+  ctx.AddOutput(dtype, out_dims, out);
+  auto kernel = KernelRegister::Instance().CreateCpuKernel("AddTanh");
+  if (kernel == nullptr) {
+    return KERNEL_STATUS_INNER_ERROR;
+  }
+  return kernel->Compute(ctx);
+}
+
+// out, which may be the buffer of the input of the output shape, against std::tanh(x + y) in double
+template <typename T>
+void CheckAddTanh(DataType dtype, double tolerance, const std::vector<int64_t> &x_dims,
+                  const std::vector<int64_t> &y_dims, const std::vector<int64_t> &out_dims,
+                  int32_t inplace_input = -1) {
+  std::vector<T> x = RandomValues<T>(NumElements(x_dims), 1);
+  std::vector<T> y = RandomValues<T>(NumElements(y_dims), 2);
+  std::vector<double> expect(NumElements(out_dims));
+  for (int64_t i = 0; i < static_cast<int64_t>(expect.size()); i++) {
+    expect[i] = std::tanh(static_cast<double>(x[BroadcastIndex(x_dims, out_dims, i)]) +
+                          static_cast<double>(y[BroadcastIndex(y_dims, out_dims, i)]));
+  }
+  std::vector<T> out_buffer(expect.size());
+  T *out = out_buffer.data();
+  if (inplace_input == 0) {
+    out = x.data();
+  } else if (inplace_input == 1) {
+    out = y.data();
+  }
+  ASSERT_EQ(RunAddTanh(dtype, x_dims, x.data(), y_dims, y.data(), out_dims, out), KERNEL_STATUS_OK);
+  for (size_t i = 0; i < expect.size(); i++) {
+    ASSERT_NEAR(static_cast<double>(out[i]), expect[i], tolerance) << "element " << i;
+  }
+}
+
+template <typename T>
+void CheckAddTanhAllShapes(DataType dtype, double tolerance) {
+  // SAME_SHAPE, X_ONE_ELEMENT, Y_ONE_ELEMENT
+  CheckAddTanh<T>(dtype, tolerance, {2, 3, 17}, {2, 3, 17}, {2, 3, 17});
+  CheckAddTanh<T>(dtype, tolerance, {1}, {5, 33}, {5, 33});
+  CheckAddTanh<T>(dtype, tolerance, {5, 33}, {}, {5, 33});
+  // DIFF_SHAPE, rows, columns, both inputs and rank padding
+  CheckAddTanh<T>(dtype, tolerance, {4, 35}, {1, 35}, {4, 35});
+  CheckAddTanh<T>(dtype, tolerance, {4, 1}, {1, 35}, {4, 35});
+  CheckAddTanh<T>(dtype, tolerance, {5}, {2, 3, 1}, {2, 3, 5});
+  // the output in the buffer of an input
+  CheckAddTanh<T>(dtype, tolerance, {3, 37}, {3, 37}, {3, 37}, 1);
+  CheckAddTanh<T>(dtype, tolerance, {3, 37}, {1, 37}, {3, 37}, 0);
+}
+}  // namespace
+
+class add_tanh_aicpu_kernel_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "add_tanh_aicpu_kernel_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "add_tanh_aicpu_kernel_test TearDown" << std::endl;
+  }
+
+  void SetUp() override {
+    bench::SetCpuNum(1);
+  }
+
+  void TearDown() override {
+    bench::SetCpuNum(1);
+  }
+};
+
+TEST_F(add_tanh_aicpu_kernel_test, add_tanh_aicpu_kernel_test_float16) {
+  CheckAddTanhAllShapes<Eigen::half>(DT_FLOAT16, kFloat16Tolerance);
+}
+
+TEST_F(add_tanh_aicpu_kernel_test, add_tanh_aicpu_kernel_test_float) {
+  CheckAddTanhAllShapes<float>(DT_FLOAT, kFloatTolerance);
+}
+
+TEST_F(add_tanh_aicpu_kernel_test, add_tanh_aicpu_kernel_test_double) {
+  CheckAddTanhAllShapes<double>(DT_DOUBLE, kDoubleTolerance);
+}
+
+TEST_F(add_tanh_aicpu_kernel_test, add_tanh_aicpu_kernel_test_multi_shard) {
+  bench::SetCpuNum(6);
+  const std::vector<int64_t> dims = {1031, 67};
+  // sizes above the thresholds of the cost model, so that the kernel really runs in shards
+  auto &model = ParallelCostModel::Instance();
+  EXPECT_TRUE(
+      model.GetPartitionPlan("AddTanh", DT_FLOAT16, BcastShapeType::SAME_SHAPE, NumElements(dims), 6).IsParallel());
+  EXPECT_TRUE(
+      model.GetPartitionPlan("AddTanh", DT_FLOAT, BcastShapeType::DIFF_SHAPE, NumElements(dims), 6).IsParallel());
+  CheckAddTanh<Eigen::half>(DT_FLOAT16, kFloat16Tolerance, dims, dims, dims);
+  CheckAddTanh<Eigen::half>(DT_FLOAT16, kFloat16Tolerance, {1}, dims, dims);
+  CheckAddTanh<float>(DT_FLOAT, kFloatTolerance, dims, {1, 67}, dims);
+  CheckAddTanh<float>(DT_FLOAT, kFloatTolerance, dims, dims, dims, 0);
+}
+
+TEST_F(add_tanh_aicpu_kernel_test, add_tanh_aicpu_kernel_test_invalid) {
+  std::vector<float> x = RandomValues<float>(12, 3);
+  std::vector<float> y = RandomValues<float>(12, 4);
+  std::vector<int32_t> ix(12);
+  std::vector<int32_t> iy(12);
+  std::vector<int32_t> iout(12);
+  std::vector<float> out(12);
+  EXPECT_NE(RunAddTanh(DT_FLOAT, {3, 4}, x.data(), {4, 3}, y.data(), {3, 4}, out.data()), KERNEL_STATUS_OK);
+  EXPECT_EQ(RunAddTanh(DT_INT32, {3, 4}, ix.data(), {3, 4}, iy.data(), {3, 4}, iout.data()),
+            KERNEL_STATUS_PARAM_INVALID);
+}
@@ -0,0 +1,70 @@
+#include <iostream>
+#include <utility>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "add_tanh/op_proto/inc/add_tanh_op.h"
+
+namespace {
+ge::TensorDesc CreateDesc(const std::vector<int64_t> &dims, ge::DataType dtype,
+                          const std::vector<std::pair<int64_t, int64_t>> &range = {}) {
+  ge::TensorDesc desc(ge::Shape(dims), ge::FORMAT_ND, dtype);
+  desc.SetOriginShape(ge::Shape(dims));
+  desc.SetOriginFormat(ge::FORMAT_ND);
+  if (!range.empty()) {
+    desc.SetShapeRange(range);
+  }
+  return desc;
+}
+}  // namespace
+
+class add_tanh_proto_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "add_tanh_proto_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "add_tanh_proto_test TearDown" << std::endl;
+  }
+};
+
+TEST_F(add_tanh_proto_test, add_tanh_proto_test_static_broadcast) {
+  ge::op::AddTanh op;
+  op.UpdateInputDesc("x1", CreateDesc({2, 1, 4}, ge::DT_FLOAT16));
+  op.UpdateInputDesc("x2", CreateDesc({3, 1}, ge::DT_FLOAT16));
+  EXPECT_EQ(op.InferShapeAndType(), ge::GRAPH_SUCCESS);
+  auto output_desc = op.GetOutputDescByName("y");
+  EXPECT_EQ(output_desc.GetDataType(), ge::DT_FLOAT16);
+  EXPECT_EQ(output_desc.GetShape().GetDims(), std::vector<int64_t>({2, 3, 4}));
+}
+
+TEST_F(add_tanh_proto_test, add_tanh_proto_test_dynamic) {
+  ge::op::AddTanh op;
+  op.UpdateInputDesc("x1", CreateDesc({-1, 4}, ge::DT_FLOAT, {{2, 10}, {4, 4}}));
+  op.UpdateInputDesc("x2", CreateDesc({1, 4}, ge::DT_FLOAT));
+  EXPECT_EQ(op.InferShapeAndType(), ge::GRAPH_SUCCESS);
+  auto output_desc = op.GetOutputDescByName("y");
+  EXPECT_EQ(output_desc.GetDataType(), ge::DT_FLOAT);
+  EXPECT_EQ(output_desc.GetShape().GetDims(), std::vector<int64_t>({-1, 4}));
+  std::vector<std::pair<int64_t, int64_t>> output_range;
+  EXPECT_EQ(output_desc.GetShapeRange(output_range), ge::GRAPH_SUCCESS);
+  std::vector<std::pair<int64_t, int64_t>> expect_range = {{2, 10}, {4, 4}};
+  EXPECT_EQ(output_range, expect_range);
+}
+
+TEST_F(add_tanh_proto_test, add_tanh_proto_test_unknown_rank) {
+  ge::op::AddTanh op;
+  op.UpdateInputDesc("x1", CreateDesc({-2}, ge::DT_DOUBLE));
+  op.UpdateInputDesc("x2", CreateDesc({3, 4}, ge::DT_DOUBLE));
+  EXPECT_EQ(op.InferShapeAndType(), ge::GRAPH_SUCCESS);
+  auto output_desc = op.GetOutputDescByName("y");
+  EXPECT_EQ(output_desc.GetShape().GetDims(), std::vector<int64_t>({-2}));
+}
+
+TEST_F(add_tanh_proto_test, add_tanh_proto_test_mismatch) {
+  ge::op::AddTanh op;
+  op.UpdateInputDesc("x1", CreateDesc({2, 3}, ge::DT_FLOAT));
+  op.UpdateInputDesc("x2", CreateDesc({4}, ge::DT_FLOAT));
+  EXPECT_EQ(op.InferShapeAndType(), ge::GRAPH_FAILED);
+}
@@ -0,0 +1,515 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+/*!
+ * \file aicpu_kernel_benchmark.cc
+ * \brief throughput of the Add, Sub, Tanh and AddTanh aicpu kernels on the host, run through the stand-in
+ *        CpuKernelContext and ParallelFor of tests/benchmark/stub
+ *
+ * usage: aicpu_kernel_benchmark [-o result.json] [-t 1,2,4] [-r repeat] [-f filter]
+ *                               [-b baseline.json] [-x tolerance]
+ *
+ * Every case is an (op, dtype, shape pattern, thread number) and is named op/dtype/pattern/tN.
+ * The result is written as JSON, one case per line. Given a baseline, which is a result of
+ * an earlier run, cases whose elements/s fell by more than the tolerance are reported as
+ * regressions and the exit code is 2.
+ *
+ * Before it is timed, every case is run once and its output compared against a scalar reference computed
+ * in double. Cases whose output does not match are reported as mismatches, are not timed, and the exit code
+ * is 3, whatever the regressions.
+ */
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <map>
+#include <memory>
+#include <sstream>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "unsupported/Eigen/CXX11/Tensor"
+#include "bench_util.h"
+#include "cpu_kernel.h"
+#include "host_runtime.h"
+#include "status.h"
+
+namespace {
+using aicpu::CpuKernelContext;
+using aicpu::DataType;
+
+const int64_t kLargeDim = 1024;
+const int64_t kSmallDim = 64;
+const size_t kBufferAlignBytes = 64;
+const double kDefaultTolerance = 0.1;
+const int32_t kRegressionExitCode = 2;
+const int32_t kMismatchExitCode = 3;
+// relative tolerances of the outputs against the reference in double, integers must match exactly
+const double kFloat16Tolerance = 1e-3;
+const double kFloatTolerance = 1e-6;
+const double kDoubleTolerance = 1e-12;
+
+struct ShapePattern {
+  const char *name;
+  std::vector<std::vector<int64_t>> input_dims;
+  std::vector<int64_t> output_dims;
+  // index of the input whose buffer the output reuses, -1 for a buffer of its own
+  int32_t inplace_input = -1;
+};
+
+const std::vector<ShapePattern> kBinaryPatterns = {
+    {"same_shape", {{kLargeDim, kLargeDim}, {kLargeDim, kLargeDim}}, {kLargeDim, kLargeDim}},
+    {"x_one_element", {{1}, {kLargeDim, kLargeDim}}, {kLargeDim, kLargeDim}},
+    {"y_one_element", {{kLargeDim, kLargeDim}, {1}}, {kLargeDim, kLargeDim}},
+    {"row_bcast", {{kLargeDim, kLargeDim}, {1, kLargeDim}}, {kLargeDim, kLargeDim}},
+    {"col_bcast", {{kLargeDim, kLargeDim}, {kLargeDim, 1}}, {kLargeDim, kLargeDim}},
+    {"both_bcast", {{kLargeDim, 1}, {1, kLargeDim}}, {kLargeDim, kLargeDim}},
+    {"inner_bcast_4d", {{8, 16, 64, 128}, {8, 1, 64, 1}}, {8, 16, 64, 128}},
+    {"small_same_shape", {{kSmallDim, kSmallDim}, {kSmallDim, kSmallDim}}, {kSmallDim, kSmallDim}},
+    {"same_shape_inplace", {{kLargeDim, kLargeDim}, {kLargeDim, kLargeDim}}, {kLargeDim, kLargeDim}, 0},
+    {"row_bcast_inplace", {{kLargeDim, kLargeDim}, {1, kLargeDim}}, {kLargeDim, kLargeDim}, 0},
+};
+
+const std::vector<ShapePattern> kUnaryPatterns = {
+    {"same_shape", {{kLargeDim, kLargeDim}}, {kLargeDim, kLargeDim}},
+    {"small_same_shape", {{kSmallDim, kSmallDim}}, {kSmallDim, kSmallDim}},
+};
+
+struct OpCases {
+  const char *op_type;
+  std::vector<DataType> dtypes;
+  const std::vector<ShapePattern> *patterns;
+};
+
+const std::vector<OpCases> kOpCases = {
+    {"Add",
+     {aicpu::DT_FLOAT, aicpu::DT_FLOAT16, aicpu::DT_DOUBLE, aicpu::DT_INT8, aicpu::DT_INT32, aicpu::DT_INT64},
+     &kBinaryPatterns},
+    {"Sub", {aicpu::DT_FLOAT, aicpu::DT_FLOAT16, aicpu::DT_DOUBLE, aicpu::DT_INT32, aicpu::DT_INT64},
+     &kBinaryPatterns},
+    {"Tanh", {aicpu::DT_FLOAT, aicpu::DT_FLOAT16, aicpu::DT_DOUBLE}, &kUnaryPatterns},
+    {"AddTanh", {aicpu::DT_FLOAT, aicpu::DT_FLOAT16, aicpu::DT_DOUBLE}, &kBinaryPatterns},
+};
+
+const std::map<DataType, const char *> kDataTypeNames = {
+    {aicpu::DT_FLOAT, "DT_FLOAT"}, {aicpu::DT_FLOAT16, "DT_FLOAT16"}, {aicpu::DT_DOUBLE, "DT_DOUBLE"},
+    {aicpu::DT_INT8, "DT_INT8"},   {aicpu::DT_INT32, "DT_INT32"},     {aicpu::DT_INT64, "DT_INT64"},
+};
+
+struct Options {
+  std::string output;
+  std::string baseline;
+  std::string filter;
+  std::vector<uint32_t> thread_nums;
+  int32_t repeat = 20;
+  double tolerance = kDefaultTolerance;
+};
+
+struct CaseResult {
+  std::string name;
+  std::string op_type;
+  std::string dtype;
+  std::string pattern;
+  uint32_t thread_num = 1;
+  int64_t elements = 0;
+  int64_t bytes = 0;
+  double ns = 0;
+  double gb_per_s = 0;
+  double elements_per_s = 0;
+  double baseline_elements_per_s = 0;
+  bool regression = false;
+};
+
+struct AlignedFree {
+  void operator()(void *data) const { free(data); }
+};
+using Buffer = std::unique_ptr<void, AlignedFree>;
+
+Buffer AllocBuffer(int64_t bytes) {
+  size_t size = (static_cast<size_t>(bytes) + kBufferAlignBytes - 1) / kBufferAlignBytes * kBufferAlignBytes;
+  return Buffer(aligned_alloc(kBufferAlignBytes, size));
+}
+
+int64_t NumElements(const std::vector<int64_t> &dims) {
+  int64_t num = 1;
+  for (auto dim : dims) {
+    num *= dim;
+  }
+  return num;
+}
+
+// values in [-3, 3], which keeps integers from overflowing and tanh away from saturation
+template <typename T>
+void FillBuffer(void *data, int64_t num) {
+  T *values = static_cast<T *>(data);
+  for (int64_t i = 0; i < num; i++) {
+    values[i] = static_cast<T>(static_cast<float>(i % 7) - 3.0f);
+  }
+}
+
+void FillBuffer(DataType dtype, void *data, int64_t num) {
+  switch (dtype) {
+    case aicpu::DT_FLOAT16:
+      FillBuffer<Eigen::half>(data, num);
+      break;
+    case aicpu::DT_FLOAT:
+      FillBuffer<float>(data, num);
+      break;
+    case aicpu::DT_DOUBLE:
+      FillBuffer<double>(data, num);
+      break;
+    case aicpu::DT_INT8:
+      FillBuffer<int8_t>(data, num);
+      break;
+    case aicpu::DT_INT32:
+      FillBuffer<int32_t>(data, num);
+      break;
+    case aicpu::DT_INT64:
+      FillBuffer<int64_t>(data, num);
+      break;
+    default:
+      break;
+  }
+}
+
+template <typename T>
+double LoadValue(const void *data, int64_t index) {
+  return static_cast<double>(static_cast<const T *>(data)[index]);
+}
+
+double LoadValue(DataType dtype, const void *data, int64_t index) {
+  switch (dtype) {
+    case aicpu::DT_FLOAT16:
+      return LoadValue<Eigen::half>(data, index);
+    case aicpu::DT_FLOAT:
+      return LoadValue<float>(data, index);
+    case aicpu::DT_DOUBLE:
+      return LoadValue<double>(data, index);
+    case aicpu::DT_INT8:
+      return LoadValue<int8_t>(data, index);
+    case aicpu::DT_INT32:
+      return LoadValue<int32_t>(data, index);
+    case aicpu::DT_INT64:
+      return LoadValue<int64_t>(data, index);
+    default:
+      return 0;
+  }
+}
+
+double Tolerance(DataType dtype) {
+  switch (dtype) {
+    case aicpu::DT_FLOAT16:
+      return kFloat16Tolerance;
+    case aicpu::DT_FLOAT:
+      return kFloatTolerance;
+    case aicpu::DT_DOUBLE:
+      return kDoubleTolerance;
+    default:
+      return 0;
+  }
+}
+
+// index into an input of dims broadcast to out_dims, dims aligned to the right
+int64_t BroadcastIndex(const std::vector<int64_t> &dims, const std::vector<int64_t> &out_dims, int64_t out_index) {
+  int64_t index = 0;
+  int64_t stride = 1;
+  size_t offset = out_dims.size() - dims.size();
+  for (size_t i = out_dims.size(); i > 0; i--) {
+    int64_t pos = out_index % out_dims[i - 1];
+    out_index /= out_dims[i - 1];
+    if (i - 1 < offset) {
+      continue;
+    }
+    int64_t dim = dims[i - 1 - offset];
+    index += (dim == 1 ? 0 : pos) * stride;
+    stride *= dim;
+  }
+  return index;
+}
+
+// the output of op_type expected from the inputs, element by element in double
+std::vector<double> ReferenceOutput(const std::string &op_type, DataType dtype, const ShapePattern &pattern,
+                                    const std::vector<Buffer> &buffers) {
+  std::vector<double> expect(NumElements(pattern.output_dims));
+  for (int64_t i = 0; i < static_cast<int64_t>(expect.size()); i++) {
+    double x = LoadValue(dtype, buffers[0].get(), BroadcastIndex(pattern.input_dims[0], pattern.output_dims, i));
+    if (op_type == "Tanh") {
+      expect[i] = std::tanh(x);
+      continue;
+    }
+    double y = LoadValue(dtype, buffers[1].get(), BroadcastIndex(pattern.input_dims[1], pattern.output_dims, i));
+    if (op_type == "Add") {
+      expect[i] = x + y;
+    } else if (op_type == "Sub") {
+      expect[i] = x - y;
+    } else {
+      expect[i] = std::tanh(x + y);
+    }
+  }
+  return expect;
+}
+
+// index of the first element of the output away from the reference, -1 if all match
+int64_t FindMismatch(DataType dtype, const void *output, const std::vector<double> &expect) {
+  double tolerance = Tolerance(dtype);
+  for (int64_t i = 0; i < static_cast<int64_t>(expect.size()); i++) {
+    double value = LoadValue(dtype, output, i);
+    if (!(std::fabs(value - expect[i]) <= tolerance * std::max(std::fabs(expect[i]), 1.0))) {
+      return i;
+    }
+  }
+  return -1;
+}
+
+std::vector<uint32_t> ParseThreadNums(const char *str) {
+  std::vector<uint32_t> thread_nums;
+  std::istringstream fields(str);
+  std::string field;
+  while (std::getline(fields, field, ',')) {
+    int32_t num = atoi(field.c_str());
+    if (num > 0) {
+      thread_nums.push_back(static_cast<uint32_t>(num));
+    }
+  }
+  return thread_nums;
+}
+
+// a field of one case line written by WriteResults
+bool FindField(const std::string &line, const std::string &key, std::string &value) {
+  std::string pattern = "\"" + key + "\": ";
+  size_t pos = line.find(pattern);
+  if (pos == std::string::npos) {
+    return false;
+  }
+  pos += pattern.size();
+  if (line[pos] == '"') {
+    size_t end = line.find('"', pos + 1);
+    value = line.substr(pos + 1, end - pos - 1);
+  } else {
+    size_t end = line.find_first_of(",}", pos);
+    value = line.substr(pos, end - pos);
+  }
+  return true;
+}
+
+bool LoadBaseline(const std::string &path, std::map<std::string, double> &baseline) {
+  std::ifstream file(path);
+  if (!file.is_open()) {
+    fprintf(stderr, "open baseline %s failed\n", path.c_str());
+    return false;
+  }
+  std::string line;
+  while (std::getline(file, line)) {
+    std::string name;
+    std::string elements_per_s;
+    if (FindField(line, "name", name) && FindField(line, "elements_per_s", elements_per_s)) {
+      baseline[name] = atof(elements_per_s.c_str());
+    }
+  }
+  return true;
+}
+
+class KernelBenchmark {
+ public:
+  explicit KernelBenchmark(const Options &options) : options_(options) {}
+
+  void Run() {
+    for (const auto &op_cases : kOpCases) {
+      for (auto dtype : op_cases.dtypes) {
+        for (const auto &pattern : *op_cases.patterns) {
+          RunPattern(op_cases.op_type, dtype, pattern);
+        }
+      }
+    }
+  }
+
+  void Compare(const std::map<std::string, double> &baseline) {
+    for (auto &result : results_) {
+      auto iter = baseline.find(result.name);
+      if ((iter == baseline.end()) || (iter->second <= 0)) {
+        continue;
+      }
+      result.baseline_elements_per_s = iter->second;
+      if (result.elements_per_s < iter->second * (1.0 - options_.tolerance)) {
+        result.regression = true;
+        regression_num_++;
+        fprintf(stderr, "regression %s: %.3g -> %.3g elements/s\n", result.name.c_str(), iter->second,
+                result.elements_per_s);
+      }
+    }
+  }
+
+  int32_t WriteResults() const {
+    FILE *file = options_.output.empty() ? stdout : fopen(options_.output.c_str(), "w");
+    if (file == nullptr) {
+      fprintf(stderr, "open %s failed\n", options_.output.c_str());
+      return 1;
+    }
+    fprintf(file,
+            "{\n\"host_cpu_num\": %u, \"repeat\": %d, \"tolerance\": %g, \"regressions\": %d, \"mismatches\": %d,\n",
+            std::thread::hardware_concurrency(), options_.repeat, options_.tolerance, regression_num_, mismatch_num_);
+    fprintf(file, "\"results\": [\n");
+    for (size_t i = 0; i < results_.size(); i++) {
+      const auto &result = results_[i];
+      fprintf(file,
+              "{\"name\": \"%s\", \"op\": \"%s\", \"dtype\": \"%s\", \"pattern\": \"%s\", \"threads\": %u, "
+              "\"elements\": %lld, \"bytes\": %lld, \"ns\": %.0f, \"gb_per_s\": %.3f, \"elements_per_s\": %.6g",
+              result.name.c_str(), result.op_type.c_str(), result.dtype.c_str(), result.pattern.c_str(),
+              result.thread_num, static_cast<long long>(result.elements), static_cast<long long>(result.bytes),
+              result.ns, result.gb_per_s, result.elements_per_s);
+      if (result.baseline_elements_per_s > 0) {
+        fprintf(file, ", \"baseline_elements_per_s\": %.6g, \"speedup\": %.3f, \"regression\": %s",
+                result.baseline_elements_per_s, result.elements_per_s / result.baseline_elements_per_s,
+                result.regression ? "true" : "false");
+      }
+      fprintf(file, "}%s\n", i + 1 < results_.size() ? "," : "");
+    }
+    fprintf(file, "]\n}\n");
+    if (file != stdout) {
+      fclose(file);
+    }
+    if (mismatch_num_ > 0) {
+      return kMismatchExitCode;
+    }
+    return regression_num_ > 0 ? kRegressionExitCode : 0;
+  }
+
+ private:
+  void RunPattern(const char *op_type, DataType dtype, const ShapePattern &pattern) {
+    const char *dtype_name = kDataTypeNames.at(dtype);
+    std::string prefix = std::string(op_type) + "/" + dtype_name + "/" + pattern.name + "/t";
+    int64_t type_size = aicpu::GetSizeByDataType(dtype);
+    CpuKernelContext ctx(op_type);
+    std::vector<Buffer> buffers;
+    int64_t bytes = 0;
+    for (const auto &dims : pattern.input_dims) {
+      int64_t num = NumElements(dims);
+      buffers.push_back(AllocBuffer(num * type_size));
+      ctx.AddInput(dtype, dims, buffers.back().get());
+      bytes += num * type_size;
+    }
+    int64_t elements = NumElements(pattern.output_dims);
+    void *output = nullptr;
+    if (pattern.inplace_input >= 0) {
+      output = buffers[pattern.inplace_input].get();
+      ctx.AddOutput(dtype, pattern.output_dims, output);
+    } else {
+      buffers.push_back(AllocBuffer(elements * type_size));
+      output = buffers.back().get();
+      ctx.AddOutput(dtype, pattern.output_dims, output);
+    }
+    bytes += elements * type_size;
+
+    auto kernel = aicpu::KernelRegister::Instance().CreateCpuKernel(op_type);
+    if (kernel == nullptr) {
+      fprintf(stderr, "no kernel of %s\n", op_type);
+      return;
+    }
+    for (auto thread_num : options_.thread_nums) {
+      std::string name = prefix + std::to_string(thread_num);
+      if (!options_.filter.empty() && (name.find(options_.filter) == std::string::npos)) {
+        continue;
+      }
+      aicpu::bench::SetCpuNum(thread_num);
+      // the inputs are filled again, the timed runs of an inplace case overwrite one of them
+      for (size_t i = 0; i < pattern.input_dims.size(); i++) {
+        FillBuffer(dtype, buffers[i].get(), NumElements(pattern.input_dims[i]));
+      }
+      std::vector<double> expect = ReferenceOutput(op_type, dtype, pattern, buffers);
+      uint32_t status = kernel->Compute(ctx);
+      if (status != aicpu::KERNEL_STATUS_OK) {
+        fprintf(stderr, "%s failed, status %u\n", name.c_str(), status);
+        continue;
+      }
+      int64_t mismatch = FindMismatch(dtype, output, expect);
+      if (mismatch >= 0) {
+        mismatch_num_++;
+        fprintf(stderr, "mismatch %s: element %lld is %.9g, expected %.9g\n", name.c_str(),
+                static_cast<long long>(mismatch), LoadValue(dtype, output, mismatch), expect[mismatch]);
+        continue;
+      }
+      CaseResult result;
+      result.name = name;
+      result.op_type = op_type;
+      result.dtype = dtype_name;
+      result.pattern = pattern.name;
+      result.thread_num = thread_num;
+      result.elements = elements;
+      result.bytes = bytes;
+      result.ns = aicpu::bench::MeasureNs(options_.repeat, [&kernel, &ctx]() { (void)kernel->Compute(ctx); });
+      result.gb_per_s = static_cast<double>(bytes) / result.ns;
+      result.elements_per_s = static_cast<double>(elements) * 1e9 / result.ns;
+      fprintf(stderr, "%s: %.3f GB/s, %.3g elements/s\n", name.c_str(), result.gb_per_s, result.elements_per_s);
+      results_.push_back(result);
+    }
+  }
+
+  Options options_;
+  std::vector<CaseResult> results_;
+  int32_t regression_num_ = 0;
+  int32_t mismatch_num_ = 0;
+};
+
+bool ParseOptions(int argc, char *argv[], Options &options) {
+  for (int i = 1; i < argc; i++) {
+    if ((i + 1 < argc) && (strcmp(argv[i], "-o") == 0)) {
+      options.output = argv[++i];
+    } else if ((i + 1 < argc) && (strcmp(argv[i], "-t") == 0)) {
+      options.thread_nums = ParseThreadNums(argv[++i]);
+      if (options.thread_nums.empty()) {
+        return false;
+      }
+    } else if ((i + 1 < argc) && (strcmp(argv[i], "-r") == 0)) {
+      options.repeat = std::max(atoi(argv[++i]), 1);
+    } else if ((i + 1 < argc) && (strcmp(argv[i], "-f") == 0)) {
+      options.filter = argv[++i];
+    } else if ((i + 1 < argc) && (strcmp(argv[i], "-b") == 0)) {
+      options.baseline = argv[++i];
+    } else if ((i + 1 < argc) && (strcmp(argv[i], "-x") == 0)) {
+      options.tolerance = atof(argv[++i]);
+    } else {
+      return false;
+    }
+  }
+  if (options.thread_nums.empty()) {
+    options.thread_nums = {1, std::max(std::thread::hardware_concurrency(), 1U)};
+    if (options.thread_nums[1] == 1) {
+      options.thread_nums.pop_back();
+    }
+  }
+  return true;
+}
+}  // namespace
+
+int main(int argc, char *argv[]) {
+  Options options;
+  if (!ParseOptions(argc, argv, options)) {
+    fprintf(stderr, "usage: %s [-o result.json] [-t 1,2,4] [-r repeat] [-f filter] [-b baseline.json] [-x tolerance]\n",
+            argv[0]);
+    return 1;
+  }
+  std::map<std::string, double> baseline;
+  if (!options.baseline.empty() && !LoadBaseline(options.baseline, baseline)) {
+    return 1;
+  }
+  KernelBenchmark benchmark(options);
+  benchmark.Run();
+  benchmark.Compare(baseline);
+  return benchmark.WriteResults();
+}
@@ -0,0 +1,127 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*!
+ * \file bench_util.h
+ * \brief timing and sharding helpers shared by the host benchmarks
+ */
+#ifndef AICPU_BENCH_BENCH_UTIL_H
+#define AICPU_BENCH_BENCH_UTIL_H
+
+#include <algorithm>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace aicpu {
+namespace bench {
+// a pool of persistent workers, like the sharder behind CpuKernelUtils::ParallelFor
+class ShardPool {
+ public:
+  explicit ShardPool(uint32_t worker_num) {
+    for (uint32_t i = 0; i < worker_num; i++) {
+      workers_.emplace_back([this]() { Run(); });
+    }
+  }
+
+  ~ShardPool() {
+    {
+      std::lock_guard<std::mutex> lock(mutex_);
+      stop_ = true;
+    }
+    cond_.notify_all();
+    for (auto &worker : workers_) {
+      worker.join();
+    }
+  }
+
+  void ParallelFor(int64_t total, int64_t per_unit_size, const std::function<void(int64_t, int64_t)> &work) {
+    if (total <= 0) {
+      return;
+    }
+    per_unit_size = per_unit_size > 0 ? per_unit_size : total;
+    std::vector<std::function<void()>> tasks;
+    for (int64_t start = per_unit_size; start < total; start += per_unit_size) {
+      int64_t end = std::min(total, start + per_unit_size);
+      tasks.emplace_back([&work, start, end]() { work(start, end); });
+    }
+    {
+      std::lock_guard<std::mutex> lock(mutex_);
+      pending_ += static_cast<int64_t>(tasks.size());
+      for (auto &task : tasks) {
+        tasks_.push_back(std::move(task));
+      }
+    }
+    cond_.notify_all();
+    // the calling thread takes the first shard, as the aicpu sharder does
+    work(0, std::min(total, per_unit_size));
+    std::unique_lock<std::mutex> lock(mutex_);
+    done_.wait(lock, [this]() { return pending_ == 0; });
+  }
+
+ private:
+  void Run() {
+    while (true) {
+      std::function<void()> task;
+      {
+        std::unique_lock<std::mutex> lock(mutex_);
+        cond_.wait(lock, [this]() { return stop_ || !tasks_.empty(); });
+        if (stop_ && tasks_.empty()) {
+          return;
+        }
+        task = std::move(tasks_.back());
+        tasks_.pop_back();
+      }
+      task();
+      std::lock_guard<std::mutex> lock(mutex_);
+      if (--pending_ == 0) {
+        done_.notify_all();
+      }
+    }
+  }
+
+  std::vector<std::thread> workers_;
+  std::vector<std::function<void()>> tasks_;
+  std::mutex mutex_;
+  std::condition_variable cond_;
+  std::condition_variable done_;
+  int64_t pending_ = 0;
+  bool stop_ = false;
+};
+
+inline double NowNs() {
+  return std::chrono::duration<double, std::nano>(std::chrono::steady_clock::now().time_since_epoch()).count();
+}
+
+// least time of repeat runs, in ns
+inline double MeasureNs(int32_t repeat, const std::function<void()> &run) {
+  run();
+  double best = -1;
+  for (int32_t i = 0; i < repeat; i++) {
+    double start = NowNs();
+    run();
+    double cost = NowNs() - start;
+    best = (best < 0 || cost < best) ? cost : best;
+  }
+  return best;
+}
+}  // namespace bench
+}  // namespace aicpu
+#endif  // AICPU_BENCH_BENCH_UTIL_H
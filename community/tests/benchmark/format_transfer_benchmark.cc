@@ -0,0 +1,379 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+/*!
+ * \file format_transfer_benchmark.cc
+ * \brief cost of the shape transfer between formats through the tables of common/utils/format_transfer_plan.h,
+ *        against the axis value path that ShapeTransferAccordingToFormat took before them
+ *
+ * usage: format_transfer_benchmark [-r repeat] [-n shape_num]
+ *
+ * The axis value path below follows AxisUtil and the Get*ShapeByAxisValue getters without the graph
+ * headers: function maps built for every transfer, axis values and new dims in vectors. Before timing,
+ * both paths transfer every shape of rank 0 to kTransferMaxRank of a few dims between all formats,
+ * a difference is reported and the exit code is 1.
+ */
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <functional>
+#include <map>
+#include <memory>
+#include <vector>
+
+#include "bench_util.h"
+#include "format_transfer_plan.h"
+
+namespace {
+using aicpu::bench::MeasureNs;
+using namespace ge;
+
+const int32_t kDefaultRepeat = 20;
+const int64_t kDefaultShapeNum = 10000;
+const int32_t kMismatchExitCode = 1;
+const int64_t kSplitSize = 16;
+const std::vector<int64_t> kCheckDims = {-1, 1, 3, 16, 33};
+const std::vector<int64_t> kC0s = {16, 32};
+
+const char *const kSrcNames[kTransferSrcNum] = {"NCHW", "NHWC", "NC1HWC0", "HWCN", "ND", "C1HWNCoC0"};
+const char *const kDstNames[kTransferDstNum] = {"NCHW", "NHWC", "NC1HWC0", "FRACTAL_Z",
+                                                "HWCN", "C1HWNCoC0", "FRACTAL_NZ"};
+
+enum AxisValueType { AXIS_N = 0, AXIS_C, AXIS_H, AXIS_W, AXIS_C1, AXIS_C0, AXIS_Co, AXIS_D, AXIS_BOTTOM };
+
+using GetAxisValueFunc =
+    std::function<bool(const std::vector<int64_t> &, const uint32_t &, std::vector<int64_t> &, std::vector<int64_t> &)>;
+using GetNewShapeFunc =
+    std::function<bool(std::vector<int64_t> &, bool, const std::vector<int64_t> &, const std::vector<int64_t> &)>;
+
+bool CheckParams(const std::vector<int64_t> &dims, std::vector<int64_t> &nd_value) {
+  nd_value = dims;
+  return dims.size() >= 4;
+}
+
+bool SetNchwLikeAxisValue(const std::vector<int64_t> &dims, const uint32_t &c0, const int32_t (&nchw)[4],
+                          std::vector<int64_t> &axis, std::vector<int64_t> &nd_value) {
+  if (dims.empty()) {
+    return true;
+  }
+  axis[AXIS_C0] = c0;
+  if (!CheckParams(dims, nd_value)) {
+    return false;
+  }
+  axis[AXIS_N] = dims[nchw[0]];
+  axis[AXIS_C] = dims[nchw[1]];
+  axis[AXIS_H] = dims[nchw[2]];
+  axis[AXIS_W] = dims[nchw[3]];
+  axis[AXIS_C1] = TransferDivisionCeiling(dims[nchw[1]], c0);
+  axis[AXIS_Co] = c0;
+  return true;
+}
+
+bool GetAxisValueByNCHW(const std::vector<int64_t> &dims, const uint32_t &c0, std::vector<int64_t> &axis,
+                        std::vector<int64_t> &nd_value) {
+  return SetNchwLikeAxisValue(dims, c0, {0, 1, 2, 3}, axis, nd_value);
+}
+
+bool GetAxisValueByNHWC(const std::vector<int64_t> &dims, const uint32_t &c0, std::vector<int64_t> &axis,
+                        std::vector<int64_t> &nd_value) {
+  return SetNchwLikeAxisValue(dims, c0, {0, 3, 1, 2}, axis, nd_value);
+}
+
+bool GetAxisValueByHWCN(const std::vector<int64_t> &dims, const uint32_t &c0, std::vector<int64_t> &axis,
+                        std::vector<int64_t> &nd_value) {
+  return SetNchwLikeAxisValue(dims, c0, {3, 2, 0, 1}, axis, nd_value);
+}
+
+bool GetAxisValueByND(const std::vector<int64_t> &dims, const uint32_t &c0, std::vector<int64_t> &axis,
+                      std::vector<int64_t> &nd_value) {
+  if (dims.empty()) {
+    return true;
+  }
+  nd_value = dims;
+  axis[AXIS_C0] = c0;
+  if (dims.size() == 4) {
+    (void)SetNchwLikeAxisValue(dims, c0, {0, 1, 2, 3}, axis, nd_value);
+  }
+  return true;
+}
+
+bool GetAxisValueByNC1HWC0(const std::vector<int64_t> &dims, const uint32_t &c0, std::vector<int64_t> &axis,
+                           std::vector<int64_t> &nd_value) {
+  if (dims.empty()) {
+    return true;
+  }
+  if (!CheckParams(dims, nd_value)) {
+    return false;
+  }
+  if (dims.size() == 5) {
+    axis[AXIS_C1] = dims[1];
+    axis[AXIS_C0] = dims[4];
+    axis[AXIS_C] = axis[AXIS_C1] * axis[AXIS_C0];
+  } else {
+    axis[AXIS_C1] = TransferDivisionCeiling(dims[1], c0);
+    axis[AXIS_C0] = c0;
+    axis[AXIS_C] = dims[1];
+  }
+  axis[AXIS_N] = dims[0];
+  axis[AXIS_H] = dims[2];
+  axis[AXIS_W] = dims[3];
+  return true;
+}
+
+bool GetAxisValueByC1HWNCoC0(const std::vector<int64_t> &dims, const uint32_t &c0, std::vector<int64_t> &axis,
+                             std::vector<int64_t> &nd_value) {
+  if (dims.empty()) {
+    return true;
+  }
+  axis[AXIS_C0] = c0;
+  // AxisUtil reads the fifth dim of a shape of four dims, the plans do not take such shapes
+  if (!CheckParams(dims, nd_value) || dims.size() < 5) {
+    return false;
+  }
+  axis[AXIS_N] = dims[3];
+  axis[AXIS_C] = dims[0] * c0;
+  axis[AXIS_H] = dims[1];
+  axis[AXIS_W] = dims[2];
+  axis[AXIS_C1] = dims[0];
+  axis[AXIS_Co] = dims[4];
+  return true;
+}
+
+bool GetPermutedShape(std::vector<int64_t> &new_dims, const std::vector<int64_t> &axis,
+                      const std::vector<int32_t> &order) {
+  new_dims.clear();
+  for (int32_t index : order) {
+    new_dims.push_back(axis[index]);
+  }
+  return true;
+}
+
+bool GetFzShape(std::vector<int64_t> &new_dims, bool is_tbe, const std::vector<int64_t> &axis,
+                const std::vector<int64_t> &nd_value) {
+  if (nd_value.size() == 2) {
+    new_dims = nd_value;
+    new_dims[1] = TransferDivisionCeiling(nd_value[1], kSplitSize);
+    new_dims[0] = TransferDivisionCeiling(nd_value[0], axis[AXIS_C0]);
+    new_dims.push_back(kSplitSize);
+    new_dims.push_back(axis[AXIS_C0]);
+  } else if (is_tbe) {
+    new_dims = {axis[AXIS_C1] * axis[AXIS_H] * axis[AXIS_W], TransferDivisionCeiling(axis[AXIS_N], kSplitSize),
+                kSplitSize, axis[AXIS_C0]};
+  } else {
+    return GetPermutedShape(new_dims, axis, {AXIS_N, AXIS_C, AXIS_H, AXIS_W});
+  }
+  return true;
+}
+
+bool GetNzShape(std::vector<int64_t> &new_dims, bool is_tbe, const std::vector<int64_t> &axis,
+                const std::vector<int64_t> &nd_value) {
+  size_t rank = nd_value.size();
+  if (rank < 2) {
+    return true;
+  }
+  new_dims = nd_value;
+  new_dims[rank - 1] = TransferDivisionCeiling(nd_value[rank - 2], kSplitSize);
+  new_dims[rank - 2] = TransferDivisionCeiling(nd_value[rank - 1], axis[AXIS_C0]);
+  new_dims.push_back(kSplitSize);
+  new_dims.push_back(axis[AXIS_C0]);
+  return true;
+}
+
+// the transfer of one shape through the axis values, the function maps are built every time as before
+bool TransferByAxisValue(int32_t src, int32_t dst, uint32_t c0, bool is_tbe, const std::vector<int64_t> &dims,
+                         std::vector<int64_t> &new_dims, int64_t &c) {
+  std::map<int32_t, std::shared_ptr<GetAxisValueFunc>> axis_funcs = {
+      {kTransferSrcNCHW, std::make_shared<GetAxisValueFunc>(GetAxisValueByNCHW)},
+      {kTransferSrcNHWC, std::make_shared<GetAxisValueFunc>(GetAxisValueByNHWC)},
+      {kTransferSrcNC1HWC0, std::make_shared<GetAxisValueFunc>(GetAxisValueByNC1HWC0)},
+      {kTransferSrcHWCN, std::make_shared<GetAxisValueFunc>(GetAxisValueByHWCN)},
+      {kTransferSrcND, std::make_shared<GetAxisValueFunc>(GetAxisValueByND)},
+      {kTransferSrcC1HWNCoC0, std::make_shared<GetAxisValueFunc>(GetAxisValueByC1HWNCoC0)}};
+  auto permute = [](const std::vector<int32_t> &order) {
+    return std::make_shared<GetNewShapeFunc>(
+        [order](std::vector<int64_t> &new_dims, bool, const std::vector<int64_t> &axis,
+                const std::vector<int64_t> &) { return GetPermutedShape(new_dims, axis, order); });
+  };
+  std::map<int32_t, std::shared_ptr<GetNewShapeFunc>> shape_funcs = {
+      {kTransferDstNCHW, permute({AXIS_N, AXIS_C, AXIS_H, AXIS_W})},
+      {kTransferDstNHWC, permute({AXIS_N, AXIS_H, AXIS_W, AXIS_C})},
+      {kTransferDstNC1HWC0,
+       std::make_shared<GetNewShapeFunc>([](std::vector<int64_t> &new_dims, bool is_tbe,
+                                            const std::vector<int64_t> &axis, const std::vector<int64_t> &) {
+         return is_tbe ? GetPermutedShape(new_dims, axis, {AXIS_N, AXIS_C1, AXIS_H, AXIS_W, AXIS_C0})
+                       : GetPermutedShape(new_dims, axis, {AXIS_N, AXIS_C, AXIS_H, AXIS_W});
+       })},
+      {kTransferDstFractalZ, std::make_shared<GetNewShapeFunc>(GetFzShape)},
+      {kTransferDstHWCN, permute({AXIS_H, AXIS_W, AXIS_C, AXIS_N})},
+      {kTransferDstC1HWNCoC0, permute({AXIS_C1, AXIS_H, AXIS_W, AXIS_N, AXIS_Co, AXIS_C0})},
+      {kTransferDstFractalNz, std::make_shared<GetNewShapeFunc>(GetNzShape)}};
+
+  new_dims = dims;
+  std::vector<int64_t> axis;
+  for (int32_t i = 0; i < AXIS_BOTTOM; i++) {
+    axis.push_back(1);
+  }
+  std::vector<int64_t> nd_value;
+  bool status = (*axis_funcs[src])(dims, c0, axis, nd_value);
+  if (!status && dst != kTransferDstFractalNz) {
+    return false;
+  }
+  (void)(*shape_funcs[dst])(new_dims, is_tbe, axis, nd_value);
+  c = axis[AXIS_C];
+  return true;
+}
+
+// the transfer of one shape through the plan, dims as they are taken out of a GeShape
+bool TransferByPlan(const FormatTransferPlan &plan, const std::vector<int64_t> &dims, std::vector<int64_t> &new_dims,
+                    int64_t &c) {
+  int64_t plan_dims[kTransferMaxNewRank];
+  size_t new_rank = 0;
+  bool is_transferred = ApplyFormatTransferPlan(plan, dims.data(), dims.size(), plan_dims, new_rank, &c);
+  if (is_transferred) {
+    new_dims.assign(plan_dims, plan_dims + new_rank);
+  } else {
+    new_dims = dims;
+  }
+  return true;
+}
+
+void AddShapes(size_t rank, std::vector<int64_t> &dims, std::vector<std::vector<int64_t>> &shapes) {
+  if (dims.size() == rank) {
+    shapes.push_back(dims);
+    return;
+  }
+  // every dim value in the first three dims, one value in each of the others to keep the number of shapes small
+  std::vector<int64_t> values = kCheckDims;
+  if (dims.size() >= 3) {
+    values = {kCheckDims[dims.size() % kCheckDims.size()]};
+  }
+  for (int64_t value : values) {
+    dims.push_back(value);
+    AddShapes(rank, dims, shapes);
+    dims.pop_back();
+  }
+}
+
+int32_t CheckPlans() {
+  std::vector<std::vector<int64_t>> shapes;
+  for (size_t rank = 0; rank <= kTransferMaxRank; rank++) {
+    std::vector<int64_t> dims;
+    AddShapes(rank, dims, shapes);
+  }
+  int64_t case_num = 0;
+  int64_t mismatch_num = 0;
+  for (int32_t src = 0; src < kTransferSrcNum; src++) {
+    for (int32_t dst = 0; dst < kTransferDstNum; dst++) {
+      for (int64_t c0 : kC0s) {
+        for (bool is_tbe : {false, true}) {
+          FormatTransferPlan plan = GetFormatTransferPlan(static_cast<TransferSrcLayout>(src),
+                                                          static_cast<TransferDstLayout>(dst), c0, is_tbe);
+          for (const auto &dims : shapes) {
+            std::vector<int64_t> expect_dims;
+            std::vector<int64_t> plan_dims;
+            int64_t expect_c = 0;
+            int64_t plan_c = 0;
+            (void)TransferByAxisValue(src, dst, static_cast<uint32_t>(c0), is_tbe, dims, expect_dims, expect_c);
+            (void)TransferByPlan(plan, dims, plan_dims, plan_c);
+            case_num++;
+            if (expect_dims != plan_dims || expect_c != plan_c) {
+              if (mismatch_num < 10) {
+                printf("mismatch %s -> %s c0 %ld tbe %d rank %zu\n", kSrcNames[src], kDstNames[dst],
+                       static_cast<long>(c0), is_tbe, dims.size());
+              }
+              mismatch_num++;
+            }
+          }
+        }
+      }
+    }
+  }
+  printf("checked %ld transfers, %ld mismatches\n", static_cast<long>(case_num), static_cast<long>(mismatch_num));
+  return (mismatch_num == 0) ? 0 : kMismatchExitCode;
+}
+
+struct TransferCase {
+  const char *name;
+  TransferSrcLayout src;
+  TransferDstLayout dst;
+  std::vector<int64_t> dims;
+};
+
+const std::vector<TransferCase> kTransferCases = {
+    {"NCHW->NC1HWC0", kTransferSrcNCHW, kTransferDstNC1HWC0, {32, 64, 56, 56}},
+    {"NHWC->NC1HWC0", kTransferSrcNHWC, kTransferDstNC1HWC0, {32, 56, 56, 64}},
+    {"NCHW->FRACTAL_Z", kTransferSrcNCHW, kTransferDstFractalZ, {256, 64, 3, 3}},
+    {"HWCN->FRACTAL_Z", kTransferSrcHWCN, kTransferDstFractalZ, {3, 3, 64, 256}},
+    {"ND->FRACTAL_NZ", kTransferSrcND, kTransferDstFractalNz, {8, 128, 1024}},
+    {"ND->FRACTAL_Z", kTransferSrcND, kTransferDstFractalZ, {1024, 4096}},
+};
+
+void RunBenchmark(int32_t repeat, int64_t shape_num) {
+  const int64_t kC0 = 16;
+  printf("%-18s %16s %16s %16s\n", "case", "axis value ns", "plan ns", "batch plan ns");
+  for (const auto &transfer_case : kTransferCases) {
+    std::vector<std::vector<int64_t>> shapes(shape_num, transfer_case.dims);
+    std::vector<std::vector<int64_t>> new_shapes(shape_num);
+    int64_t c = 0;
+    double axis_value_ns = MeasureNs(repeat, [&]() {
+      for (int64_t i = 0; i < shape_num; i++) {
+        (void)TransferByAxisValue(transfer_case.src, transfer_case.dst, kC0, true, shapes[i], new_shapes[i], c);
+      }
+    });
+    // a plan per shape, as GetShapeAccordingToFormat looks it up
+    double plan_ns = MeasureNs(repeat, [&]() {
+      for (int64_t i = 0; i < shape_num; i++) {
+        FormatTransferPlan plan = GetFormatTransferPlan(transfer_case.src, transfer_case.dst, kC0, true);
+        (void)TransferByPlan(plan, shapes[i], new_shapes[i], c);
+      }
+    });
+    // one plan for all shapes, as GetShapesAccordingToFormat
+    double batch_plan_ns = MeasureNs(repeat, [&]() {
+      FormatTransferPlan plan = GetFormatTransferPlan(transfer_case.src, transfer_case.dst, kC0, true);
+      for (int64_t i = 0; i < shape_num; i++) {
+        (void)TransferByPlan(plan, shapes[i], new_shapes[i], c);
+      }
+    });
+    printf("%-18s %16.1f %16.1f %16.1f\n", transfer_case.name, axis_value_ns / shape_num, plan_ns / shape_num,
+           batch_plan_ns / shape_num);
+  }
+}
+}  // namespace
+
+int main(int argc, char *argv[]) {
+  int32_t repeat = kDefaultRepeat;
+  int64_t shape_num = kDefaultShapeNum;
+  for (int32_t i = 1; i + 1 < argc; i += 2) {
+    if (strcmp(argv[i], "-r") == 0) {
+      repeat = atoi(argv[i + 1]);
+    } else if (strcmp(argv[i], "-n") == 0) {
+      shape_num = atoll(argv[i + 1]);
+    } else {
+      fprintf(stderr, "usage: %s [-r repeat] [-n shape_num]\n", argv[0]);
+      return 1;
+    }
+  }
+  if (repeat <= 0 || shape_num <= 0) {
+    fprintf(stderr, "usage: %s [-r repeat] [-n shape_num]\n", argv[0]);
+    return 1;
+  }
+  int32_t ret = CheckPlans();
+  if (ret != 0) {
+    return ret;
+  }
+  RunBenchmark(repeat, shape_num);
+  return 0;
+}
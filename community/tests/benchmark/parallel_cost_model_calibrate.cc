@@ -0,0 +1,212 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*!
+ * \file parallel_cost_model_calibrate.cc
+ * \brief measure the elementwise kernels' per element cost and the cost of dispatching shards on this host,
+ *        and write the profile read by ParallelCostModel (common/utils/parallel_cost_model.h)
+ *
+ * usage: parallel_cost_model_calibrate [-o profile] [-t cpu_num] [-r repeat]
+ */
+#include <algorithm>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <functional>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "unsupported/Eigen/CXX11/Tensor"
+#include "bench_util.h"
+
+namespace {
+using aicpu::bench::MeasureNs;
+using aicpu::bench::ShardPool;
+
+const int64_t kMeasureDataNum = 1024 * 1024;
+const int64_t kBcastInnerNum = 1024;
+const int64_t kHalfBlockNum = 4 * 1024;
+const uint32_t kReservedCoreNum = 2;
+// below mid_data_num the speedup flattens after a few cores
+const int64_t kMidDataNumFactor = 4;
+const uint32_t kMidCoreNum = 4;
+const std::vector<const char *> kNoBcastTypes = {"same_shape", "x_one_element", "y_one_element"};
+
+template <typename T>
+struct Buffers {
+  std::vector<T> x = std::vector<T>(kMeasureDataNum, T(1));
+  std::vector<T> y = std::vector<T>(kMeasureDataNum, T(2));
+  std::vector<T> out = std::vector<T>(kMeasureDataNum);
+  // broadcast [n / inner, 1] with [1, inner] through index tables, like Bcast
+  std::vector<int64_t> x_index;
+  std::vector<int64_t> y_index;
+  Buffers() {
+    for (int64_t i = 0; i < kMeasureDataNum; i++) {
+      x_index.push_back(i / kBcastInnerNum);
+      y_index.push_back(i % kBcastInnerNum);
+    }
+  }
+};
+
+template <typename T, typename Op>
+void SameShapeRange(Buffers<T> &buffers, int64_t start, int64_t end) {
+  Eigen::TensorMap<Eigen::Tensor<const T, 1>> x(buffers.x.data() + start, end - start);
+  Eigen::TensorMap<Eigen::Tensor<const T, 1>> y(buffers.y.data() + start, end - start);
+  Eigen::TensorMap<Eigen::Tensor<T, 1>> out(buffers.out.data() + start, end - start);
+  out = x.binaryExpr(y, Op());
+}
+
+template <typename T, typename Op>
+void DiffShapeRange(Buffers<T> &buffers, int64_t start, int64_t end) {
+  Op op;
+  for (int64_t i = start; i < end; i++) {
+    buffers.out[i] = op(buffers.x[buffers.x_index[i]], buffers.y[buffers.y_index[i]]);
+  }
+}
+
+template <typename T>
+void TanhRange(Buffers<T> &buffers, int64_t start, int64_t end) {
+  Eigen::TensorMap<Eigen::Tensor<const T, 1>> x(buffers.x.data() + start, end - start);
+  Eigen::TensorMap<Eigen::Tensor<T, 1>> out(buffers.out.data() + start, end - start);
+  out = x.tanh();
+}
+
+template <>
+void TanhRange<Eigen::half>(Buffers<Eigen::half> &buffers, int64_t start, int64_t end) {
+  alignas(EIGEN_MAX_ALIGN_BYTES) float buffer[kHalfBlockNum];
+  for (int64_t block_start = start; block_start < end; block_start += kHalfBlockNum) {
+    int64_t block_num = std::min(kHalfBlockNum, end - block_start);
+    Eigen::TensorMap<Eigen::Tensor<const Eigen::half, 1>> x(buffers.x.data() + block_start, block_num);
+    Eigen::TensorMap<Eigen::Tensor<Eigen::half, 1>> out(buffers.out.data() + block_start, block_num);
+    Eigen::TensorMap<Eigen::Tensor<float, 1>, Eigen::Aligned> widened(buffer, block_num);
+    widened = x.template cast<float>();
+    widened = widened.tanh();
+    out = widened.template cast<Eigen::half>();
+  }
+}
+
+struct Options {
+  std::string output;
+  uint32_t cpu_num = std::max(std::thread::hardware_concurrency(), 1U);
+  int32_t repeat = 20;
+};
+
+class Calibrator {
+ public:
+  explicit Calibrator(const Options &options)
+      : options_(options),
+        core_num_(options.cpu_num > kReservedCoreNum ? options.cpu_num - kReservedCoreNum : 1),
+        pool_(core_num_ > 1 ? core_num_ - 1 : 0) {
+    // dispatch cost: one empty shard per core
+    dispatch_ns_ = MeasureNs(options_.repeat * 10, [this]() {
+      pool_.ParallelFor(core_num_, 1, [](int64_t, int64_t) {});
+    });
+    fprintf(stderr, "cores %u, dispatch %.0f ns\n", core_num_, dispatch_ns_);
+  }
+
+  // one line per broadcast type, the one element types cost as much as same_shape
+  template <typename T>
+  void Measure(const char *op_type, const char *dtype, const std::vector<const char *> &bcast_types,
+               const std::function<void(Buffers<T> &, int64_t, int64_t)> &range) {
+    Buffers<T> buffers;
+    double element_ns = MeasureNs(options_.repeat, [&]() { range(buffers, 0, kMeasureDataNum); }) / kMeasureDataNum;
+    // serial n * c against parallel dispatch + n * c / cores
+    int64_t parallel_data_num = INT64_MAX / 2;
+    if (core_num_ > 1) {
+      parallel_data_num = static_cast<int64_t>(dispatch_ns_ * core_num_ / ((core_num_ - 1) * element_ns)) + 1;
+    }
+    int64_t min_shard_data_num = std::max(static_cast<int64_t>(dispatch_ns_ / element_ns), int64_t{1});
+    int64_t mid_data_num = core_num_ > kMidCoreNum ? parallel_data_num * kMidDataNumFactor : 0;
+    for (const char *bcast_type : bcast_types) {
+      char line[256];
+      snprintf(line, sizeof(line), "%s %s %s %lld %lld %u %lld %u", op_type, dtype, bcast_type,
+               static_cast<long long>(parallel_data_num), static_cast<long long>(mid_data_num),
+               mid_data_num > 0 ? kMidCoreNum : 0, static_cast<long long>(min_shard_data_num), kReservedCoreNum);
+      lines_.push_back(line);
+    }
+    fprintf(stderr, "%s %s %s: %.3f ns/element\n", op_type, dtype, bcast_types[0], element_ns);
+  }
+
+  template <typename T>
+  void MeasureBinary(const char *dtype) {
+    Measure<T>("Add", dtype, kNoBcastTypes, SameShapeRange<T, Eigen::internal::scalar_sum_op<T>>);
+    Measure<T>("Add", dtype, {"diff_shape"}, DiffShapeRange<T, Eigen::internal::scalar_sum_op<T>>);
+    Measure<T>("Sub", dtype, kNoBcastTypes, SameShapeRange<T, Eigen::internal::scalar_difference_op<T>>);
+    Measure<T>("Sub", dtype, {"diff_shape"}, DiffShapeRange<T, Eigen::internal::scalar_difference_op<T>>);
+  }
+
+  int32_t Write() const {
+    FILE *file = options_.output.empty() ? stdout : fopen(options_.output.c_str(), "w");
+    if (file == nullptr) {
+      fprintf(stderr, "open %s failed\n", options_.output.c_str());
+      return 1;
+    }
+    fprintf(file, "# generated by parallel_cost_model_calibrate on %u cpus, dispatch %.0f ns\n",
+            options_.cpu_num, dispatch_ns_);
+    fprintf(file, "# op dtype bcast_type parallel_data_num mid_data_num mid_core_num "
+                  "min_shard_data_num reserved_core_num\n");
+    for (const auto &line : lines_) {
+      fprintf(file, "%s\n", line.c_str());
+    }
+    if (file != stdout) {
+      fclose(file);
+    }
+    return 0;
+  }
+
+ private:
+  Options options_;
+  uint32_t core_num_;
+  ShardPool pool_;
+  double dispatch_ns_ = 0;
+  std::vector<std::string> lines_;
+};
+
+bool ParseOptions(int argc, char *argv[], Options &options) {
+  for (int i = 1; i < argc; i++) {
+    if ((i + 1 < argc) && (strcmp(argv[i], "-o") == 0)) {
+      options.output = argv[++i];
+    } else if ((i + 1 < argc) && (strcmp(argv[i], "-t") == 0)) {
+      options.cpu_num = static_cast<uint32_t>(std::max(atoi(argv[++i]), 1));
+    } else if ((i + 1 < argc) && (strcmp(argv[i], "-r") == 0)) {
+      options.repeat = std::max(atoi(argv[++i]), 1);
+    } else {
+      return false;
+    }
+  }
+  return true;
+}
+}  // namespace
+
+int main(int argc, char *argv[]) {
+  Options options;
+  if (!ParseOptions(argc, argv, options)) {
+    fprintf(stderr, "usage: %s [-o profile] [-t cpu_num] [-r repeat]\n", argv[0]);
+    return 1;
+  }
+  Calibrator calibrator(options);
+  calibrator.MeasureBinary<float>("DT_FLOAT");
+  calibrator.MeasureBinary<Eigen::half>("DT_FLOAT16");
+  calibrator.MeasureBinary<double>("DT_DOUBLE");
+  calibrator.MeasureBinary<int32_t>("DT_INT32");
+  calibrator.MeasureBinary<int64_t>("DT_INT64");
+  calibrator.Measure<float>("Tanh", "DT_FLOAT", {"same_shape"}, TanhRange<float>);
+  calibrator.Measure<Eigen::half>("Tanh", "DT_FLOAT16", {"same_shape"}, TanhRange<Eigen::half>);
+  calibrator.Measure<double>("Tanh", "DT_DOUBLE", {"same_shape"}, TanhRange<double>);
+  return calibrator.Write();
+}
@@ -0,0 +1,53 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_BENCH_STUB_CPU_ATTR_VALUE_H
+#define AICPU_BENCH_STUB_CPU_ATTR_VALUE_H
+
+#include <string>
+#include <vector>
+
+#include "cpu_tensor.h"
+
+namespace aicpu {
+class TensorShapeImpl;
+class AttrValueImpl;
+
+class AttrValue {
+ public:
+  int64_t GetInt() const { return int_; }
+  void SetInt(int64_t value) { int_ = value; }
+  bool GetBool() const { return bool_; }
+  void SetBool(bool value) { bool_ = value; }
+  float GetFloat() const { return float_; }
+  void SetFloat(float value) { float_ = value; }
+  std::string GetString() const { return string_; }
+  void SetString(const std::string &value) { string_ = value; }
+  DataType GetDataType() const { return data_type_; }
+  void SetDataType(DataType value) { data_type_ = value; }
+  std::vector<int64_t> GetListInt() const { return list_int_; }
+  void SetListInt(const std::vector<int64_t> &value) { list_int_ = value; }
+
+ private:
+  int64_t int_ = 0;
+  bool bool_ = false;
+  float float_ = 0;
+  std::string string_;
+  DataType data_type_ = DT_FLOAT;
+  std::vector<int64_t> list_int_;
+};
+}  // namespace aicpu
+#endif  // AICPU_BENCH_STUB_CPU_ATTR_VALUE_H
@@ -0,0 +1,80 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_BENCH_STUB_CPU_CONTEXT_H
+#define AICPU_BENCH_STUB_CPU_CONTEXT_H
+
+#include <map>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "cpu_attr_value.h"
+
+namespace aicpu {
+/*
+ * kernel context built directly by the benchmark instead of from a node def
+ */
+class CpuKernelContext {
+ public:
+  explicit CpuKernelContext(const std::string &op_type) : op_type_(op_type) {}
+  ~CpuKernelContext() = default;
+
+  std::string GetOpType() const { return op_type_; }
+  Tensor *Input(uint32_t index) const { return index < inputs_.size() ? inputs_[index].get() : nullptr; }
+  Tensor *Output(uint32_t index) const { return index < outputs_.size() ? outputs_[index].get() : nullptr; }
+  uint32_t GetInputsSize() const { return static_cast<uint32_t>(inputs_.size()); }
+  uint32_t GetOutputsSize() const { return static_cast<uint32_t>(outputs_.size()); }
+  AttrValue *GetAttr(const std::string &attr_name) const {
+    auto iter = attrs_.find(attr_name);
+    return iter == attrs_.end() ? nullptr : iter->second.get();
+  }
+
+  /*
+   * add a tensor of dims and data_type on data, which must outlive the context
+   */
+  Tensor *AddInput(DataType data_type, const std::vector<int64_t> &dims, void *data) {
+    inputs_.push_back(MakeTensor(data_type, dims, data));
+    return inputs_.back().get();
+  }
+  Tensor *AddOutput(DataType data_type, const std::vector<int64_t> &dims, void *data) {
+    outputs_.push_back(MakeTensor(data_type, dims, data));
+    return outputs_.back().get();
+  }
+  AttrValue *AddAttr(const std::string &attr_name) {
+    auto &attr = attrs_[attr_name];
+    attr = std::make_shared<AttrValue>();
+    return attr.get();
+  }
+
+ private:
+  static std::shared_ptr<Tensor> MakeTensor(DataType data_type, const std::vector<int64_t> &dims, void *data) {
+    auto tensor = std::make_shared<Tensor>();
+    TensorShape shape(dims);
+    tensor->SetTensorShape(&shape);
+    tensor->SetDataType(data_type);
+    tensor->SetData(data);
+    tensor->SetDataSize(static_cast<uint64_t>(tensor->CalcDataSizeByShape()));
+    return tensor;
+  }
+
+  std::string op_type_;
+  std::vector<std::shared_ptr<Tensor>> inputs_;
+  std::vector<std::shared_ptr<Tensor>> outputs_;
+  std::map<std::string, std::shared_ptr<AttrValue>> attrs_;
+};
+}  // namespace aicpu
+#endif  // AICPU_BENCH_STUB_CPU_CONTEXT_H
@@ -0,0 +1,59 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_BENCH_STUB_CPU_KERNEL_H
+#define AICPU_BENCH_STUB_CPU_KERNEL_H
+
+#include <functional>
+#include <map>
+#include <memory>
+#include <string>
+
+#include "cpu_context.h"
+
+namespace aicpu {
+class CpuKernel {
+ public:
+  virtual uint32_t Compute(CpuKernelContext &ctx) = 0;
+  virtual ~CpuKernel() = default;
+};
+
+using KernelCreatorFunc = std::function<std::shared_ptr<CpuKernel>(void)>;
+
+/*
+ * kernels of the linked sources by op type
+ */
+class KernelRegister {
+ public:
+  static KernelRegister &Instance();
+  bool Register(const std::string &op_type, const KernelCreatorFunc &func);
+  std::shared_ptr<CpuKernel> CreateCpuKernel(const std::string &op_type) const;
+
+ private:
+  std::map<std::string, KernelCreatorFunc> creators_;
+};
+
+struct KernelRegistrar {
+  KernelRegistrar(const std::string &op_type, const KernelCreatorFunc &func) {
+    (void)KernelRegister::Instance().Register(op_type, func);
+  }
+};
+}  // namespace aicpu
+
+#define REGISTER_CPU_KERNEL(type, clazz)                                                  \
+  static ::aicpu::KernelRegistrar g_##clazz##_registrar(                                  \
+      type, []() -> std::shared_ptr<::aicpu::CpuKernel> { return std::make_shared<clazz>(); })
+#endif  // AICPU_BENCH_STUB_CPU_KERNEL_H
@@ -0,0 +1,59 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_BENCH_STUB_CPU_TENSOR_H
+#define AICPU_BENCH_STUB_CPU_TENSOR_H
+
+#include <memory>
+
+#include "cpu_tensor_shape.h"
+
+namespace aicpu {
+class TensorImpl;
+
+/*
+ * tensor on host memory owned by the caller
+ */
+class Tensor {
+ public:
+  Tensor() = default;
+  ~Tensor() = default;
+
+  std::shared_ptr<TensorShape> GetTensorShape() const { return shape_; }
+  bool SetTensorShape(const TensorShape *shape) {
+    if (shape == nullptr) {
+      return false;
+    }
+    *shape_ = *shape;
+    return true;
+  }
+  void *GetData() const { return data_; }
+  void SetData(void *data) { data_ = data; }
+  DataType GetDataType() const { return data_type_; }
+  void SetDataType(DataType data_type) { data_type_ = data_type; }
+  uint64_t GetDataSize() const { return data_size_; }
+  void SetDataSize(uint64_t data_size) { data_size_ = data_size; }
+  int64_t NumElements() const { return shape_->NumElements(); }
+  int64_t CalcDataSizeByShape() const { return NumElements() * GetSizeByDataType(data_type_); }
+
+ private:
+  std::shared_ptr<TensorShape> shape_ = std::make_shared<TensorShape>();
+  void *data_ = nullptr;
+  DataType data_type_ = DT_FLOAT;
+  uint64_t data_size_ = 0;
+};
+}  // namespace aicpu
+#endif  // AICPU_BENCH_STUB_CPU_TENSOR_H
@@ -0,0 +1,53 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+#ifndef AICPU_BENCH_STUB_CPU_TENSOR_SHAPE_H
+#define AICPU_BENCH_STUB_CPU_TENSOR_SHAPE_H
+
+#include <cstdint>
+#include <vector>
+
+#include "cpu_types.h"
+
+namespace aicpu {
+class TensorShape {
+ public:
+  TensorShape() = default;
+  explicit TensorShape(const std::vector<int64_t> &dims) : dims_(dims) {}
+  ~TensorShape() = default;
+
+  Format GetFormat() const { return format_; }
+  void SetFormat(Format format) { format_ = format; }
+  bool GetUnknownRank() const { return false; }
+  void SetUnknownRank(bool) {}
+  std::vector<int64_t> GetDimSizes() const { return dims_; }
+  void SetDimSizes(const std::vector<int64_t> &dims) { dims_ = dims; }
+  int64_t GetDimSize(int32_t index) const { return dims_[index]; }
+  int32_t GetDims() const { return static_cast<int32_t>(dims_.size()); }
+  int64_t NumElements() const {
+    int64_t num = 1;
+    for (auto dim : dims_) {
+      num *= dim;
+    }
+    return num;
+  }
+
+ private:
+  std::vector<int64_t> dims_;
+  Format format_ = FORMAT_ND;
+};
+}  // namespace aicpu
+#endif  // AICPU_BENCH_STUB_CPU_TENSOR_SHAPE_H
@@ -0,0 +1,107 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+/*!
+ * \file cpu_types.h
+ * \brief host stand-in of the aicpu sdk types, only for the kernel benchmark
+ */
+#ifndef AICPU_BENCH_STUB_CPU_TYPES_H
+#define AICPU_BENCH_STUB_CPU_TYPES_H
+
+#include <cstdint>
+
+#define AICPU_VISIBILITY
+
+namespace aicpu {
+enum DataType {
+  DT_FLOAT = 0,
+  DT_FLOAT16 = 1,
+  DT_INT8 = 2,
+  DT_INT32 = 3,
+  DT_UINT8 = 4,
+  DT_INT16 = 6,
+  DT_UINT16 = 7,
+  DT_UINT32 = 8,
+  DT_INT64 = 9,
+  DT_UINT64 = 10,
+  DT_DOUBLE = 11,
+  DT_BOOL = 12,
+  DT_STRING = 13,
+  DT_DUAL_SUB_INT8 = 14,
+  DT_DUAL_SUB_UINT8 = 15,
+  DT_COMPLEX64 = 16,
+  DT_COMPLEX128 = 17,
+  DT_QINT8 = 18,
+  DT_QINT16 = 19,
+  DT_QINT32 = 20,
+  DT_QUINT8 = 21,
+  DT_QUINT16 = 22,
+  DT_RESOURCE = 23,
+  DT_STRING_REF = 24,
+  DT_DUAL = 25,
+  DT_UNDEFINED = 26
+};
+
+enum Format {
+  FORMAT_ALL = 0,
+  FORMAT_BN_WEIGHT = 1,
+  FORMAT_C1HWNC0 = 2,
+  FORMAT_C1HWNCoC0 = 3,
+  FORMAT_CHWN = 4,
+  FORMAT_CN = 5,
+  FORMAT_DHWCN = 6,
+  FORMAT_DHWNC = 7,
+  FORMAT_FILTER_HWCK = 8,
+  FORMAT_FRACTAL_DECONV = 9,
+  FORMAT_FRACTAL_DECONV_SP_STRIDE8_TRANS = 10,
+  FORMAT_FRACTAL_DECONV_SP_STRIDE_TRANS = 11,
+  FORMAT_FRACTAL_DECONV_TRANSPOSE = 12,
+  FORMAT_FRACTAL_NZ = 13,
+  FORMAT_FRACTAL_Z = 14,
+  FORMAT_FRACTAL_ZN_LSTM = 15,
+  FORMAT_FRACTAL_Z_3D = 16,
+  FORMAT_FRACTAL_Z_3D_TRANSPOSE = 17,
+  FORMAT_FRACTAL_Z_C04 = 18,
+  FORMAT_FRACTAL_Z_G = 19,
+  FORMAT_FSR_NCHW = 20,
+  FORMAT_HASHTABLE_LOOKUP_HITS = 21,
+  FORMAT_HASHTABLE_LOOKUP_KEYS = 22,
+  FORMAT_HASHTABLE_LOOKUP_LOOKUPS = 23,
+  FORMAT_HASHTABLE_LOOKUP_OUTPUT = 24,
+  FORMAT_HASHTABLE_LOOKUP_VALUE = 25,
+  FORMAT_HWCN = 26,
+  FORMAT_MD = 27,
+  FORMAT_NC = 28,
+  FORMAT_NC1C0HWPAD = 29,
+  FORMAT_NC1HWC0 = 30,
+  FORMAT_NC1HWC0_C04 = 31,
+  FORMAT_NC1KHKWHWC0 = 32,
+  FORMAT_NCDHW = 33,
+  FORMAT_NCHW = 34,
+  FORMAT_ND = 35,
+  FORMAT_NDC1HWC0 = 36,
+  FORMAT_NDHWC = 37,
+  FORMAT_NHWC = 38,
+  FORMAT_NHWC1C0 = 39,
+  FORMAT_NULL = 40,
+  FORMAT_RESERVED = 200,
+};
+
+enum DeviceType { HOST, DEVICE };
+
+int32_t GetSizeByDataType(DataType data_type);
+}  // namespace aicpu
+#endif  // AICPU_BENCH_STUB_CPU_TYPES_H
@@ -0,0 +1,120 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#include "host_runtime.h"
+
+#include <algorithm>
+#include <memory>
+#include <mutex>
+
+#include "bench_util.h"
+#include "cpu_kernel.h"
+#include "cpu_kernel_utils.h"
+
+namespace aicpu {
+namespace {
+std::mutex g_pool_mutex;
+uint32_t g_cpu_num = 1;
+bool g_even_shards = false;
+std::unique_ptr<bench::ShardPool> g_pool;
+}  // namespace
+
+namespace bench {
+void SetCpuNum(uint32_t cpu_num) {
+  std::lock_guard<std::mutex> lock(g_pool_mutex);
+  g_cpu_num = cpu_num > 0 ? cpu_num : 1;
+  g_pool.reset(g_cpu_num > 1 ? new ShardPool(g_cpu_num - 1) : nullptr);
+}
+
+uint32_t GetCpuNum() {
+  std::lock_guard<std::mutex> lock(g_pool_mutex);
+  return g_cpu_num;
+}
+
+void SetEvenShards(bool even) {
+  std::lock_guard<std::mutex> lock(g_pool_mutex);
+  g_even_shards = even;
+}
+}  // namespace bench
+
+int32_t GetSizeByDataType(DataType data_type) {
+  switch (data_type) {
+    case DT_INT8:
+    case DT_UINT8:
+    case DT_BOOL:
+    case DT_QINT8:
+    case DT_QUINT8:
+      return 1;
+    case DT_FLOAT16:
+    case DT_INT16:
+    case DT_UINT16:
+    case DT_QINT16:
+    case DT_QUINT16:
+      return 2;
+    case DT_FLOAT:
+    case DT_INT32:
+    case DT_UINT32:
+    case DT_QINT32:
+      return 4;
+    case DT_INT64:
+    case DT_UINT64:
+    case DT_DOUBLE:
+    case DT_COMPLEX64:
+      return 8;
+    case DT_COMPLEX128:
+      return 16;
+    default:
+      return -1;
+  }
+}
+
+KernelRegister &KernelRegister::Instance() {
+  static KernelRegister instance;
+  return instance;
+}
+
+bool KernelRegister::Register(const std::string &op_type, const KernelCreatorFunc &func) {
+  return creators_.emplace(op_type, func).second;
+}
+
+std::shared_ptr<CpuKernel> KernelRegister::CreateCpuKernel(const std::string &op_type) const {
+  auto iter = creators_.find(op_type);
+  return iter == creators_.end() ? nullptr : iter->second();
+}
+
+uint32_t CpuKernelUtils::GetCPUNum(const CpuKernelContext &ctx) {
+  (void)ctx;
+  return bench::GetCpuNum();
+}
+
+uint32_t CpuKernelUtils::ParallelFor(const CpuKernelContext &ctx, int64_t total, int64_t perUnitSize,
+                                     const std::function<void(int64_t, int64_t)> &work) {
+  (void)ctx;
+  int64_t unit_size = perUnitSize > 0 ? perUnitSize : total;
+  if (g_even_shards && (total > 0)) {
+    int64_t shard_num = (total + unit_size - 1) / unit_size;
+    unit_size = (total + shard_num - 1) / shard_num;
+  }
+  bench::ShardPool *pool = g_pool.get();
+  if (pool != nullptr) {
+    pool->ParallelFor(total, unit_size, work);
+    return 0;
+  }
+  for (int64_t start = 0; start < total; start += unit_size) {
+    work(start, std::min(total, start + unit_size));
+  }
+  return 0;
+}
+}  // namespace aicpu
@@ -0,0 +1,42 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+/*!
+ * \file host_runtime.h
+ * \brief controls of the host stand-in of the aicpu runtime
+ */
+#ifndef AICPU_BENCH_STUB_HOST_RUNTIME_H
+#define AICPU_BENCH_STUB_HOST_RUNTIME_H
+
+#include <cstdint>
+
+namespace aicpu {
+namespace bench {
+/*
+ * set the cpu number seen by CpuKernelUtils::GetCPUNum, ParallelFor runs its shards
+ * on that many threads, the calling one included
+ */
+void SetCpuNum(uint32_t cpu_num);
+uint32_t GetCpuNum();
+
+/*
+ * split ParallelFor as the aicpu sharder does: the ceil(total / per_unit_size) shards get
+ * ceil(total / shard_num) elements each, so that a shard need not start at a multiple of
+ * per_unit_size. By default the shards start at the multiples of per_unit_size
+ */
+void SetEvenShards(bool even);
+}  // namespace bench
+}  // namespace aicpu
+#endif  // AICPU_BENCH_STUB_HOST_RUNTIME_H
@@ -0,0 +1,29 @@
+/**
+ * Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#ifndef AICPU_BENCH_STUB_SLOG_H
+#define AICPU_BENCH_STUB_SLOG_H
+
+#include <cstdio>
+
+// errors go to stderr, the rest is dropped so that logging does not take part in the timings
+#define AICPU 0
+#define RUN_LOG_MASK 0
+#define dlog_debug(module_id, fmt, ...) ((void)0)
+#define dlog_info(module_id, fmt, ...) ((void)0)
+#define dlog_warn(module_id, fmt, ...) ((void)0)
+#define dlog_event(module_id, fmt, ...) ((void)0)
+#define dlog_error(module_id, fmt, ...) fprintf(stderr, "[ERROR] " fmt "\n", ##__VA_ARGS__)
+#endif  // AICPU_BENCH_STUB_SLOG_H
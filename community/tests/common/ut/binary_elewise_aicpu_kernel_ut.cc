@@ -0,0 +1,209 @@
+#include <cstdint>
+#include <cstring>
+#include <iostream>
+#include <random>
+#include <string>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "unsupported/Eigen/CXX11/Tensor"
+#include "cpu_kernel.h"
+#include "host_runtime.h"
+#include "kernel_util.h"
+#include "parallel_cost_model.h"
+#include "status.h"
+
+using namespace aicpu;
+
+namespace {
+const int32_t kInplaceCaseNum = 2000;
+const int64_t kMaxRank = 4;
+const int64_t kMaxDim = 9;
+
+struct BinaryCase {
+  std::string op_type;
+  DataType dtype;
+  std::vector<int64_t> x_dims;
+  std::vector<int64_t> y_dims;
+  std::vector<int64_t> out_dims;
+  // the input of the output shape whose buffer the output takes
+  int32_t inplace_input;
+};
+
+int64_t NumElements(const std::vector<int64_t> &dims) {
+  int64_t num = 1;
+  for (auto dim : dims) {
+    num *= dim;
+  }
+  return num;
+}
+
+template <typename T>
+std::vector<T> RandomValues(std::mt19937 &gen, int64_t num) {
+  std::uniform_real_distribution<float> dist(-3.0f, 3.0f);
+  std::vector<T> values(num);
+  for (auto &value : values) {
+    value = static_cast<T>(dist(gen));
+  }
+  return values;
+}
+
+uint32_t RunBinary(const BinaryCase &binary_case, void *x, void *y, void *out) {
+  CpuKernelContext ctx(binary_case.op_type);
+  ctx.AddInput(binary_case.dtype, binary_case.x_dims, x);
+  ctx.AddInput(binary_case.dtype, binary_case.y_dims, y);
+  ctx.AddOutput(binary_case.dtype, binary_case.out_dims, out);
+  auto kernel = KernelRegister::Instance().CreateCpuKernel(binary_case.op_type);
+  if (kernel == nullptr) {
+    return KERNEL_STATUS_INNER_ERROR;
+  }
+  return kernel->Compute(ctx);
+}
+
+// the output written over an input must be the output computed into a buffer of its own
+template <typename T>
+void CheckInplace(std::mt19937 &gen, const BinaryCase &binary_case) {
+  std::vector<T> x = RandomValues<T>(gen, NumElements(binary_case.x_dims));
+  std::vector<T> y = RandomValues<T>(gen, NumElements(binary_case.y_dims));
+  std::vector<T> expect(NumElements(binary_case.out_dims));
+  ASSERT_EQ(RunBinary(binary_case, x.data(), y.data(), expect.data()), KERNEL_STATUS_OK);
+  T *out = binary_case.inplace_input == 0 ? x.data() : y.data();
+  ASSERT_EQ(RunBinary(binary_case, x.data(), y.data(), out), KERNEL_STATUS_OK);
+  ASSERT_EQ(memcmp(out, expect.data(), expect.size() * sizeof(T)), 0);
+}
+
+// the output of a split as the aicpu sharder does it must be the output computed on one cpu
+template <typename T>
+void CheckEvenShards(std::mt19937 &gen, const BinaryCase &binary_case) {
+  std::vector<T> x = RandomValues<T>(gen, NumElements(binary_case.x_dims));
+  std::vector<T> y = RandomValues<T>(gen, NumElements(binary_case.y_dims));
+  std::vector<T> expect(NumElements(binary_case.out_dims));
+  bench::SetCpuNum(1);
+  ASSERT_EQ(RunBinary(binary_case, x.data(), y.data(), expect.data()), KERNEL_STATUS_OK);
+  std::vector<T> out(expect.size());
+  bench::SetCpuNum(6);
+  bench::SetEvenShards(true);
+  uint32_t ret = RunBinary(binary_case, x.data(), y.data(), out.data());
+  bench::SetEvenShards(false);
+  ASSERT_EQ(ret, KERNEL_STATUS_OK);
+  ASSERT_EQ(memcmp(out.data(), expect.data(), expect.size() * sizeof(T)), 0);
+}
+
+// an output shape, the input on the inplace side has it, the other one broadcasts to it
+BinaryCase RandomCase(std::mt19937 &gen) {
+  static const std::vector<std::pair<std::string, std::vector<DataType>>> kOpTypes = {
+      {"Add", {DT_FLOAT16, DT_FLOAT, DT_DOUBLE, DT_INT32}},
+      {"Sub", {DT_FLOAT16, DT_FLOAT, DT_DOUBLE, DT_INT32}},
+      {"AddTanh", {DT_FLOAT16, DT_FLOAT, DT_DOUBLE}},
+  };
+  const auto &op = kOpTypes[std::uniform_int_distribution<size_t>(0, kOpTypes.size() - 1)(gen)];
+  BinaryCase binary_case;
+  binary_case.op_type = op.first;
+  binary_case.dtype = op.second[std::uniform_int_distribution<size_t>(0, op.second.size() - 1)(gen)];
+  int64_t rank = std::uniform_int_distribution<int64_t>(1, kMaxRank)(gen);
+  std::uniform_int_distribution<int64_t> dim_dist(1, kMaxDim);
+  for (int64_t i = 0; i < rank; i++) {
+    binary_case.out_dims.push_back(dim_dist(gen));
+  }
+  // the other input drops leading dims and broadcasts some of the rest, from none to all
+  int64_t other_rank = std::uniform_int_distribution<int64_t>(0, rank)(gen);
+  std::vector<int64_t> other_dims(binary_case.out_dims.end() - other_rank, binary_case.out_dims.end());
+  for (auto &dim : other_dims) {
+    if (std::bernoulli_distribution(0.4)(gen)) {
+      dim = 1;
+    }
+  }
+  binary_case.inplace_input = std::uniform_int_distribution<int32_t>(0, 1)(gen);
+  binary_case.x_dims = binary_case.inplace_input == 0 ? binary_case.out_dims : other_dims;
+  binary_case.y_dims = binary_case.inplace_input == 0 ? other_dims : binary_case.out_dims;
+  return binary_case;
+}
+}  // namespace
+
+class binary_elewise_aicpu_kernel_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "binary_elewise_aicpu_kernel_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "binary_elewise_aicpu_kernel_test TearDown" << std::endl;
+  }
+
+  void SetUp() override {
+    bench::SetCpuNum(1);
+  }
+
+  void TearDown() override {
+    bench::SetCpuNum(1);
+    bench::SetEvenShards(false);
+  }
+};
+
+TEST_F(binary_elewise_aicpu_kernel_test, binary_elewise_aicpu_kernel_test_inplace_random) {
+  std::mt19937 gen(2022);
+  for (int32_t i = 0; i < kInplaceCaseNum; i++) {
+    BinaryCase binary_case = RandomCase(gen);
+    // the larger cases are split by the cost model on more cpus
+    bench::SetCpuNum(i % 2 == 0 ? 1 : 6);
+    SCOPED_TRACE(binary_case.op_type + " case " + std::to_string(i));
+    switch (binary_case.dtype) {
+      case DT_FLOAT16:
+        CheckInplace<Eigen::half>(gen, binary_case);
+        break;
+      case DT_FLOAT:
+        CheckInplace<float>(gen, binary_case);
+        break;
+      case DT_DOUBLE:
+        CheckInplace<double>(gen, binary_case);
+        break;
+      default:
+        CheckInplace<int32_t>(gen, binary_case);
+        break;
+    }
+    if (HasFatalFailure()) {
+      return;
+    }
+  }
+}
+
+TEST_F(binary_elewise_aicpu_kernel_test, binary_elewise_aicpu_kernel_test_inplace_rejected) {
+  std::vector<float> x(64, 1.0f);
+  std::vector<float> y(64, 2.0f);
+  for (const char *op_type : {"Add", "Sub", "AddTanh"}) {
+    // the output may not take the buffer of a broadcast input, nor overlap an input partly
+    EXPECT_EQ(RunBinary({op_type, DT_FLOAT, {1, 8}, {8, 8}, {8, 8}, 0}, x.data(), y.data(), x.data()),
+              KERNEL_STATUS_PARAM_INVALID);
+    EXPECT_EQ(RunBinary({op_type, DT_FLOAT, {8, 8}, {1}, {8, 8}, 1}, x.data(), y.data(), y.data()),
+              KERNEL_STATUS_PARAM_INVALID);
+    EXPECT_EQ(RunBinary({op_type, DT_FLOAT, {32}, {32}, {32}, 0}, x.data(), y.data(), x.data() + 16),
+              KERNEL_STATUS_PARAM_INVALID);
+    EXPECT_EQ(RunBinary({op_type, DT_FLOAT, {32}, {32}, {32}, 0}, x.data() + 16, y.data(), x.data()),
+              KERNEL_STATUS_PARAM_INVALID);
+  }
+}
+
+TEST_F(binary_elewise_aicpu_kernel_test, binary_elewise_aicpu_kernel_test_even_shards) {
+  const std::vector<int64_t> dims = {1031, 67};
+  int64_t data_num = NumElements(dims);
+  // the shards of the aicpu sharder start off the aligned addresses the engine rounds its shard size to
+  PartitionPlan plan = ParallelCostModel::Instance().GetPartitionPlan("Add", DT_FLOAT, BcastShapeType::SAME_SHAPE,
+                                                                      data_num, 6);
+  ASSERT_TRUE(plan.IsParallel());
+  int64_t align_num = static_cast<int64_t>(kEigenAlignmentBytes / sizeof(float));
+  int64_t shard_size = (plan.shard_size + align_num - 1) / align_num * align_num;
+  int64_t shard_num = (data_num + shard_size - 1) / shard_size;
+  ASSERT_NE(((data_num + shard_num - 1) / shard_num) % align_num, 0);
+
+  std::mt19937 gen(2023);
+  for (const char *op_type : {"Add", "Sub", "AddTanh"}) {
+    SCOPED_TRACE(op_type);
+    CheckEvenShards<float>(gen, {op_type, DT_FLOAT, dims, dims, dims, -1});
+    CheckEvenShards<float>(gen, {op_type, DT_FLOAT, {1}, dims, dims, -1});
+    CheckEvenShards<float>(gen, {op_type, DT_FLOAT, dims, {1}, dims, -1});
+    CheckEvenShards<double>(gen, {op_type, DT_DOUBLE, dims, dims, dims, -1});
+    CheckEvenShards<float>(gen, {op_type, DT_FLOAT, dims, {1, 67}, dims, -1});
+  }
+  CheckEvenShards<int32_t>(gen, {"Add", DT_INT32, dims, dims, dims, -1});
+  CheckEvenShards<int32_t>(gen, {"Sub", DT_INT32, {1}, dims, dims, -1});
+}
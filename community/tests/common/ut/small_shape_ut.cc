@@ -0,0 +1,241 @@
+#include <algorithm>
+#include <iostream>
+#include <random>
+#include <utility>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "small_shape.h"
+
+using namespace ge;
+
+namespace {
+using Range = std::pair<int64_t, int64_t>;
+
+SmallShape MakeSmallShape(const std::vector<int64_t> &dims, const std::vector<Range> &ranges = {}) {
+  SmallShape shape;
+  shape.rank = dims.size();
+  for (size_t i = 0; i < dims.size(); i++) {
+    shape.dims[i] = dims[i];
+    // the range of an unknown dim without one is (0, -1), as MakeUpShapeRange
+    Range range = (dims[i] == -1) ? Range(0, -1) : Range(dims[i], dims[i]);
+    shape.ranges[i] = ranges.empty() ? range : ranges[i];
+  }
+  return shape;
+}
+
+std::vector<int64_t> Dims(const SmallShape &shape) {
+  return std::vector<int64_t>(shape.dims, shape.dims + shape.rank);
+}
+
+std::vector<Range> Ranges(const SmallShape &shape) {
+  return std::vector<Range>(shape.ranges, shape.ranges + shape.rank);
+}
+
+bool Broadcast(const std::vector<SmallShape> &inputs, SmallShape &output, size_t &mismatch_dim) {
+  return BroadcastSmallShapes(inputs.data(), inputs.size(), output, mismatch_dim);
+}
+
+// AddToOutputRange of util.cc as it was before it shared BroadcastDimRange
+Range ReferenceRange(const Range &range_x, const Range &range_y) {
+  int64_t first_range = (range_x.first * range_y.first == 0) ? 0 : std::max(range_x.first, range_y.first);
+  if (range_x.second * range_y.second == -1) {
+    return Range(first_range, -1);
+  } else if (range_x.first == 1 && range_y.first == 1) {
+    return Range(first_range,
+                 (range_x.second == -1 || range_y.second == -1) ? -1 : std::max(range_x.second, range_y.second));
+  } else if (range_x.first == 1 || range_y.first == 1) {
+    return Range(first_range, range_x.first == 1 ? range_y.second : range_x.second);
+  }
+  int64_t second_range = std::min(range_x.second, range_y.second);
+  second_range = (range_x.second == -1 || range_y.second == -1) ? std::max(range_x.second, range_y.second)
+                                                                : second_range;
+  return Range(first_range, second_range);
+}
+
+/*
+ * the dims of InferShapeAndTypeTwoInOneOutBroadcast and the ranges of InferShapeRangeTwoInOneOutBroadcast,
+ * written over vectors the way util.cc does
+ */
+bool ReferenceBroadcast(std::vector<int64_t> dims_x, std::vector<Range> ranges_x, std::vector<int64_t> dims_y,
+                        std::vector<Range> ranges_y, std::vector<int64_t> &dims_out, std::vector<Range> &ranges_out) {
+  if (dims_x.size() < dims_y.size()) {
+    std::swap(dims_x, dims_y);
+    std::swap(ranges_x, ranges_y);
+  }
+  while (dims_y.size() < dims_x.size()) {
+    dims_y.insert(dims_y.begin(), 1);
+    ranges_y.insert(ranges_y.begin(), Range(1, 1));
+  }
+  bool is_static = std::find(dims_x.begin(), dims_x.end(), -1) == dims_x.end() &&
+                   std::find(dims_y.begin(), dims_y.end(), -1) == dims_y.end();
+  dims_out.clear();
+  ranges_out.clear();
+  for (size_t i = 0; i < dims_x.size(); i++) {
+    int64_t x = dims_x[i];
+    int64_t y = dims_y[i];
+    if (is_static) {
+      dims_out.push_back((x == 0 || y == 0) ? 0 : std::max(x, y));
+      continue;
+    }
+    if ((x != y) && (x != 1) && (y != 1) && (x != -1) && (y != -1)) {
+      return false;
+    }
+    if ((x == -1) && (y != -1)) {
+      dims_out.push_back(y > 1 ? y : -1);
+    } else if ((x != -1) && (y == -1)) {
+      dims_out.push_back(x > 1 ? x : -1);
+    } else if ((x == -1) && (y == -1)) {
+      dims_out.push_back(-1);
+    } else {
+      dims_out.push_back((x == 0 || y == 0) ? 0 : std::max(x, y));
+    }
+  }
+  for (size_t i = 0; i < dims_out.size(); i++) {
+    ranges_out.push_back(dims_out[i] == -1 ? ReferenceRange(ranges_x[i], ranges_y[i])
+                                           : Range(dims_out[i], dims_out[i]));
+  }
+  return true;
+}
+
+void RandomShape(std::mt19937 &gen, std::vector<int64_t> &dims, std::vector<Range> &ranges) {
+  static const std::vector<int64_t> kDims = {-1, -1, 0, 1, 1, 2, 3};
+  static const std::vector<Range> kUnknownRanges = {{0, -1}, {1, -1}, {2, -1}, {1, 1}, {1, 5}, {2, 8}, {3, 3}, {0, 4}};
+  size_t rank = std::uniform_int_distribution<size_t>(0, 4)(gen);
+  dims.clear();
+  ranges.clear();
+  for (size_t i = 0; i < rank; i++) {
+    int64_t dim = kDims[std::uniform_int_distribution<size_t>(0, kDims.size() - 1)(gen)];
+    dims.push_back(dim);
+    size_t range_index = std::uniform_int_distribution<size_t>(0, kUnknownRanges.size() - 1)(gen);
+    ranges.push_back(dim == -1 ? kUnknownRanges[range_index] : Range(dim, dim));
+  }
+}
+}  // namespace
+
+class small_shape_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "small_shape_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "small_shape_test TearDown" << std::endl;
+  }
+};
+
+TEST_F(small_shape_test, small_shape_test_static) {
+  SmallShape output;
+  size_t mismatch_dim = 0;
+  ASSERT_TRUE(Broadcast({MakeSmallShape({2, 1, 4}), MakeSmallShape({2, 3, 1})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({2, 3, 4}));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{2, 2}, {3, 3}, {4, 4}}));
+  EXPECT_FALSE(output.IsUnknown());
+  // a dim of 0 wins, and static shapes are not checked, as InferBroadcastshapeForStatic
+  ASSERT_TRUE(Broadcast({MakeSmallShape({0, 3}), MakeSmallShape({5, 3})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({0, 3}));
+  ASSERT_TRUE(Broadcast({MakeSmallShape({2, 3}), MakeSmallShape({4})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({2, 4}));
+  // scalars
+  ASSERT_TRUE(Broadcast({MakeSmallShape({}), MakeSmallShape({})}, output, mismatch_dim));
+  EXPECT_EQ(output.rank, 0U);
+}
+
+TEST_F(small_shape_test, small_shape_test_rank_padding) {
+  SmallShape output;
+  size_t mismatch_dim = 0;
+  ASSERT_TRUE(Broadcast({MakeSmallShape({4}), MakeSmallShape({2, 3, 1})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({2, 3, 4}));
+  ASSERT_TRUE(Broadcast({MakeSmallShape({}), MakeSmallShape({-1, 5}, {{1, 9}, {5, 5}})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({-1, 5}));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{1, 9}, {5, 5}}));
+  // one input is broadcast as itself
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1, 1}, {{2, 6}, {1, 1}})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({-1, 1}));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{2, 6}, {1, 1}}));
+}
+
+TEST_F(small_shape_test, small_shape_test_unknown_dim) {
+  SmallShape output;
+  size_t mismatch_dim = 0;
+  // -1 against 1 stays -1 with the range of the -1
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1, 4}, {{2, 10}, {4, 4}}), MakeSmallShape({1, 4})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({-1, 4}));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{2, 10}, {4, 4}}));
+  EXPECT_TRUE(output.IsUnknown());
+  // -1 against a dim larger than 1 takes that dim
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1, 4}), MakeSmallShape({3, 4})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({3, 4}));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{3, 3}, {4, 4}}));
+  EXPECT_FALSE(output.IsUnknown());
+  // -1 against 0 stays -1, as the dynamic case of InferShapeAndTypeTwoInOneOutBroadcast, the range is the 0 one
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1}, {{1, 8}}), MakeSmallShape({0})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({-1}));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{0, 0}}));
+  // -1 against -1 intersects the ranges, an unbounded max gives way to a bounded one
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1}, {{2, 10}}), MakeSmallShape({-1}, {{3, -1}})}, output, mismatch_dim));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{3, 10}}));
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1}, {{1, -1}}), MakeSmallShape({-1}, {{1, 7}})}, output, mismatch_dim));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{1, -1}}));
+  // a known dim of the dynamic case is checked
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1, 0}), MakeSmallShape({3, 1})}, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({3, 0}));
+}
+
+TEST_F(small_shape_test, small_shape_test_mismatch) {
+  SmallShape output;
+  size_t mismatch_dim = 0;
+  EXPECT_FALSE(Broadcast({MakeSmallShape({-1, 3}), MakeSmallShape({2, 4})}, output, mismatch_dim));
+  EXPECT_EQ(mismatch_dim, 1U);
+  EXPECT_FALSE(Broadcast({MakeSmallShape({2, -1, 5}), MakeSmallShape({3, 4})}, output, mismatch_dim));
+  EXPECT_EQ(mismatch_dim, 2U);
+  // the dim is the one of the output, shorter inputs are aligned on their last dims
+  EXPECT_FALSE(Broadcast({MakeSmallShape({2, 1, 4}), MakeSmallShape({-1}), MakeSmallShape({3, 1}),
+                          MakeSmallShape({5, 1, 1})},
+                         output, mismatch_dim));
+  EXPECT_EQ(mismatch_dim, 0U);
+}
+
+TEST_F(small_shape_test, small_shape_test_n_inputs) {
+  SmallShape output;
+  size_t mismatch_dim = 0;
+  std::vector<SmallShape> inputs = {MakeSmallShape({-1, 1, 4}, {{1, 5}, {1, 1}, {4, 4}}), MakeSmallShape({3, 1}),
+                                    MakeSmallShape({2, 1, 1})};
+  ASSERT_TRUE(Broadcast(inputs, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({2, 3, 4}));
+  // the order of the inputs does not matter
+  std::reverse(inputs.begin(), inputs.end());
+  ASSERT_TRUE(Broadcast(inputs, output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({2, 3, 4}));
+  // the ranges of three unknown dims fold pair by pair by the two input rule
+  ASSERT_TRUE(Broadcast({MakeSmallShape({-1}, {{1, 6}}), MakeSmallShape({-1}, {{2, -1}}),
+                         MakeSmallShape({-1}, {{3, 4}})},
+                        output, mismatch_dim));
+  EXPECT_EQ(Dims(output), std::vector<int64_t>({-1}));
+  EXPECT_EQ(Ranges(output)[0], ReferenceRange(ReferenceRange({1, 6}, {2, -1}), {3, 4}));
+  EXPECT_EQ(Ranges(output), std::vector<Range>({{3, 4}}));
+}
+
+TEST_F(small_shape_test, small_shape_test_two_inputs_random) {
+  std::mt19937 gen(2022);
+  for (int32_t i = 0; i < 20000; i++) {
+    std::vector<int64_t> dims_x;
+    std::vector<int64_t> dims_y;
+    std::vector<Range> ranges_x;
+    std::vector<Range> ranges_y;
+    RandomShape(gen, dims_x, ranges_x);
+    RandomShape(gen, dims_y, ranges_y);
+    std::vector<int64_t> expect_dims;
+    std::vector<Range> expect_ranges;
+    bool expect_ret = ReferenceBroadcast(dims_x, ranges_x, dims_y, ranges_y, expect_dims, expect_ranges);
+
+    SmallShape output;
+    size_t mismatch_dim = 0;
+    bool ret = Broadcast({MakeSmallShape(dims_x, ranges_x), MakeSmallShape(dims_y, ranges_y)}, output, mismatch_dim);
+    ASSERT_EQ(ret, expect_ret) << "case " << i;
+    if (ret) {
+      ASSERT_EQ(Dims(output), expect_dims) << "case " << i;
+      ASSERT_EQ(Ranges(output), expect_ranges) << "case " << i;
+    }
+  }
+}
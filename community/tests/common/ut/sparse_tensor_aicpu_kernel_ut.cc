@@ -0,0 +1,137 @@
+#include <cstdint>
+#include <iostream>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "cpu_kernel.h"
+#include "host_runtime.h"
+#include "parallel_cost_model.h"
+#include "sparse_tensor.h"
+#include "status.h"
+
+using namespace aicpu;
+
+namespace {
+const char *const kOpType = "SparseToDense";
+const int64_t kRows = 50;
+const int64_t kCols = 40;
+// values of a parallel case, above the default thresholds of the cost model
+const int64_t kParallelNum = kRows * kCols;
+const int64_t kParallelRepeat = 20;
+
+/*
+ * the indices of a kRows x kCols output, every position written by
+ * repeat values, with the value being the linear position
+ */
+struct SparseCase {
+  std::vector<int64_t> indices;
+  std::vector<float> values;
+
+  explicit SparseCase(int64_t repeat) {
+    for (int64_t r = 0; r < repeat; r++) {
+      for (int64_t i = 0; i < kRows; i++) {
+        for (int64_t j = 0; j < kCols; j++) {
+          indices.push_back(i);
+          indices.push_back(j);
+          values.push_back(static_cast<float>(i * kCols + j));
+        }
+      }
+    }
+  }
+
+  int64_t Num() const {
+    return static_cast<int64_t>(values.size());
+  }
+};
+
+uint32_t ToDense(SparseCase &sparse_case, std::vector<float> &out) {
+  CpuKernelContext ctx(kOpType);
+  int64_t num = sparse_case.Num();
+  Tensor *indices = ctx.AddInput(DT_INT64, {num, 2}, sparse_case.indices.data());
+  Tensor *values = ctx.AddInput(DT_FLOAT, {num}, sparse_case.values.data());
+  out.assign(kRows * kCols, -1.0f);
+  Tensor *output = ctx.AddOutput(DT_FLOAT, {kRows, kCols}, out.data());
+  SparseTensor sparse_tensor;
+  uint32_t ret = sparse_tensor.CreateSparseTensor(indices, values, {kRows, kCols}, {0, 1});
+  if (ret != KERNEL_STATUS_OK) {
+    return ret;
+  }
+  return sparse_tensor.ToDense<int64_t, float>(ctx, output);
+}
+
+void CheckDense(const std::vector<float> &out) {
+  for (int64_t i = 0; i < kRows * kCols; i++) {
+    ASSERT_EQ(out[i], static_cast<float>(i)) << "element " << i;
+  }
+}
+
+// the index n, out of bounds at its dim d, makes ToDense fail
+void CheckInvalid(int64_t repeat, int64_t n, int64_t d, int64_t index) {
+  SparseCase sparse_case(repeat);
+  sparse_case.indices[n * 2 + d] = index;
+  std::vector<float> out;
+  EXPECT_EQ(ToDense(sparse_case, out), KERNEL_STATUS_INNER_ERROR) << "index " << index << " of value " << n;
+}
+
+void CheckBounds(int64_t repeat) {
+  SparseCase sparse_case(repeat);
+  int64_t num = sparse_case.Num();
+  std::vector<float> out;
+  // the last index of every dim is in bounds
+  ASSERT_EQ(ToDense(sparse_case, out), KERNEL_STATUS_OK);
+  CheckDense(out);
+  // the size of the dim and negative indices are out of bounds, on both dims, anywhere in the values
+  for (int64_t n : {int64_t{0}, num / 2 + 1, num - 1}) {
+    CheckInvalid(repeat, n, 0, kRows);
+    CheckInvalid(repeat, n, 1, kCols);
+    CheckInvalid(repeat, n, 0, -1);
+    CheckInvalid(repeat, n, 1, -kCols);
+  }
+}
+}  // namespace
+
+class sparse_tensor_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "sparse_tensor_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "sparse_tensor_test TearDown" << std::endl;
+  }
+
+  void SetUp() override {
+    bench::SetCpuNum(1);
+  }
+
+  void TearDown() override {
+    bench::SetCpuNum(1);
+  }
+};
+
+TEST_F(sparse_tensor_test, sparse_tensor_test_to_dense_bounds_serial) {
+  EXPECT_FALSE(ParallelCostModel::Instance()
+                   .GetPartitionPlan(kOpType, DT_FLOAT, BcastShapeType::SAME_SHAPE, kRows * kCols, 1)
+                   .IsParallel());
+  CheckBounds(1);
+}
+
+TEST_F(sparse_tensor_test, sparse_tensor_test_to_dense_bounds_parallel) {
+  bench::SetCpuNum(6);
+  EXPECT_TRUE(ParallelCostModel::Instance()
+                  .GetPartitionPlan(kOpType, DT_FLOAT, BcastShapeType::SAME_SHAPE, kParallelNum * kParallelRepeat, 6)
+                  .IsParallel());
+  CheckBounds(kParallelRepeat);
+}
+
+TEST_F(sparse_tensor_test, sparse_tensor_test_to_dense_invalid_in_every_shard) {
+  bench::SetCpuNum(6);
+  SparseCase sparse_case(kParallelRepeat);
+  int64_t num = sparse_case.Num();
+  // one invalid index every 997 values, so that every shard meets some whatever the split
+  for (int64_t n = 13; n < num; n += 997) {
+    sparse_case.indices[n * 2] = (n % 2 == 0) ? kRows : -1;
+  }
+  std::vector<float> out;
+  EXPECT_EQ(ToDense(sparse_case, out), KERNEL_STATUS_INNER_ERROR);
+}
@@ -0,0 +1,103 @@
+#include <iostream>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "utils/transfer_shape_according_to_format.h"
+
+namespace {
+const int64_t kTbeImplType = static_cast<int64_t>(ge::EN_IMPL_HW_TBE);
+const int64_t kCceImplType = static_cast<int64_t>(ge::EN_IMPL_HW_GENERAL_CCE);
+
+ge::GeShape TransferOne(ge::Format old_format, ge::Format new_format, ge::DataType dtype, int64_t impl_type,
+                        const ge::GeShape &old_shape) {
+  ge::GeShape new_shape;
+  ge::ShapeAndFormat info = {old_shape, new_shape, old_format, new_format, dtype, impl_type};
+  ge::ShapeTransferAccordingToFormat transfer;
+  EXPECT_TRUE(transfer.GetShapeAccordingToFormat(info));
+  return new_shape;
+}
+
+// the batch gives, shape by shape, what GetShapeAccordingToFormat gives
+void CheckBatch(ge::Format old_format, ge::Format new_format, ge::DataType dtype, int64_t impl_type,
+                const std::vector<ge::GeShape> &old_shapes) {
+  ge::ShapeTransferAccordingToFormat transfer;
+  std::vector<ge::GeShape> new_shapes;
+  ASSERT_TRUE(transfer.GetShapesAccordingToFormat(old_format, new_format, dtype, impl_type, old_shapes, new_shapes));
+  ASSERT_EQ(new_shapes.size(), old_shapes.size());
+  for (size_t i = 0; i < old_shapes.size(); i++) {
+    EXPECT_EQ(new_shapes[i].GetDims(), TransferOne(old_format, new_format, dtype, impl_type, old_shapes[i]).GetDims())
+        << "shape " << i << " from format " << old_format << " to " << new_format;
+  }
+}
+}  // namespace
+
+class transfer_shape_according_to_format_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "transfer_shape_according_to_format_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "transfer_shape_according_to_format_test TearDown" << std::endl;
+  }
+};
+
+TEST_F(transfer_shape_according_to_format_test, transfer_shape_test_batch_values) {
+  ge::ShapeTransferAccordingToFormat transfer;
+  std::vector<ge::GeShape> old_shapes = {ge::GeShape({8, 35, 7, 7}), ge::GeShape({1, 16, 1, 1}),
+                                         ge::GeShape({2, 17, 3, 5})};
+  std::vector<ge::GeShape> new_shapes;
+  ASSERT_TRUE(transfer.GetShapesAccordingToFormat(ge::FORMAT_NCHW, ge::FORMAT_NC1HWC0, ge::DT_FLOAT16, kTbeImplType,
+                                                  old_shapes, new_shapes));
+  ASSERT_EQ(new_shapes.size(), 3U);
+  EXPECT_EQ(new_shapes[0].GetDims(), std::vector<int64_t>({8, 3, 7, 7, 16}));
+  EXPECT_EQ(new_shapes[1].GetDims(), std::vector<int64_t>({1, 1, 1, 1, 16}));
+  EXPECT_EQ(new_shapes[2].GetDims(), std::vector<int64_t>({2, 2, 3, 5, 16}));
+
+  old_shapes = {ge::GeShape({64, 35, 3, 3}), ge::GeShape({17, 16, 1, 1})};
+  ASSERT_TRUE(transfer.GetShapesAccordingToFormat(ge::FORMAT_NCHW, ge::FORMAT_FRACTAL_Z, ge::DT_FLOAT16, kTbeImplType,
+                                                  old_shapes, new_shapes));
+  ASSERT_EQ(new_shapes.size(), 2U);
+  EXPECT_EQ(new_shapes[0].GetDims(), std::vector<int64_t>({27, 4, 16, 16}));
+  EXPECT_EQ(new_shapes[1].GetDims(), std::vector<int64_t>({1, 2, 16, 16}));
+}
+
+TEST_F(transfer_shape_according_to_format_test, transfer_shape_test_batch_matches_single) {
+  // ranks from empty to above the 8 dims of the plans, which go through the axis values
+  std::vector<ge::GeShape> old_shapes = {
+      ge::GeShape(std::vector<int64_t>()), ge::GeShape({7}), ge::GeShape({3, 33}), ge::GeShape({2, 5, 33}),
+      ge::GeShape({8, 35, 7, 7}), ge::GeShape({2, 3, 4, 5, 6}), ge::GeShape({1, 2, 3, 4, 5, 6, 7, 8, 9})};
+  const std::vector<ge::Format> formats = {ge::FORMAT_NCHW,       ge::FORMAT_NHWC,     ge::FORMAT_HWCN,
+                                           ge::FORMAT_ND,         ge::FORMAT_NC1HWC0,  ge::FORMAT_FRACTAL_Z,
+                                           ge::FORMAT_FRACTAL_NZ, ge::FORMAT_C1HWNCoC0, ge::FORMAT_NC1HWC0_C04};
+  for (auto old_format : formats) {
+    for (auto new_format : formats) {
+      for (auto dtype : {ge::DT_FLOAT16, ge::DT_FLOAT, ge::DT_INT8}) {
+        CheckBatch(old_format, new_format, dtype, kTbeImplType, old_shapes);
+        CheckBatch(old_format, new_format, dtype, kCceImplType, old_shapes);
+      }
+    }
+  }
+}
+
+TEST_F(transfer_shape_according_to_format_test, transfer_shape_test_batch_without_plan) {
+  ge::ShapeTransferAccordingToFormat transfer;
+  std::vector<ge::GeShape> old_shapes = {ge::GeShape({8, 35, 7, 7}), ge::GeShape({3, 5})};
+  std::vector<ge::GeShape> new_shapes = {ge::GeShape({1})};
+  // formats without a plan keep the shapes
+  ASSERT_TRUE(transfer.GetShapesAccordingToFormat(ge::FORMAT_NCHW, ge::FORMAT_NCDHW, ge::DT_FLOAT16, kTbeImplType,
+                                                  old_shapes, new_shapes));
+  ASSERT_EQ(new_shapes.size(), 2U);
+  EXPECT_EQ(new_shapes[0].GetDims(), old_shapes[0].GetDims());
+  EXPECT_EQ(new_shapes[1].GetDims(), old_shapes[1].GetDims());
+  // an empty batch
+  std::vector<ge::GeShape> no_shapes;
+  ASSERT_TRUE(transfer.GetShapesAccordingToFormat(ge::FORMAT_NCHW, ge::FORMAT_NC1HWC0, ge::DT_FLOAT16, kTbeImplType,
+                                                  no_shapes, new_shapes));
+  EXPECT_TRUE(new_shapes.empty());
+  // invalid formats and data types fail as GetShapeAccordingToFormat does
+  EXPECT_FALSE(transfer.GetShapesAccordingToFormat(ge::FORMAT_RESERVED, ge::FORMAT_NC1HWC0, ge::DT_FLOAT16,
+                                                   kTbeImplType, old_shapes, new_shapes));
+  EXPECT_FALSE(transfer.GetShapesAccordingToFormat(ge::FORMAT_NCHW, ge::FORMAT_NC1HWC0, ge::DT_UNDEFINED,
+                                                   kTbeImplType, old_shapes, new_shapes));
+}
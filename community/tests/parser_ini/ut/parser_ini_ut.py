@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+# Copyright 2022 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""
+host tests of scripts/parser_ini.py
+
+The one pass mode of compile_ini_files is compared byte for byte with the per file mode, then the
+IniBuildCache reuse rules, the OpInfoSchema checks and the OpInfoIndex lookups are run on ini files
+written into a temp dir. Run with `python -m pytest parser_ini_ut.py` or `python parser_ini_ut.py`.
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "..", "..", "scripts")
+sys.path.insert(0, os.path.realpath(SCRIPTS_DIR))
+import parser_ini  # noqa: E402
+
+OUT_FILE = "aicpu_kernel.json"
+# ini files main() collects, every path has "cpu" in it
+INI_DIR = os.path.join("aicpu", "op_info_cfg")
+
+
+def _op_text(op_name, compute_cost=100, engine="DNN_VM_AICPU", flag_async="False", extra=""):
+    return ("[%s]\n"
+            "opInfo.engine=%s\n"
+            "opInfo.flagPartial=False\n"
+            "opInfo.computeCost=%s\n"
+            "opInfo.flagAsync=%s\n"
+            "opInfo.opKernelLib=CUSTAICPUKernel\n"
+            "opInfo.kernelSo=libcust_aicpu_kernels.so\n"
+            "opInfo.functionName=RunCpuKernel\n"
+            "opInfo.workspaceSize=1024\n"
+            "input0.name=x\n"
+            "input0.type=DT_FLOAT,DT_DOUBLE\n"
+            "output0.name=y\n"
+            "output0.type=DT_FLOAT,DT_DOUBLE\n"
+            "%s\n" % (op_name, engine, compute_cost, flag_async, extra))
+
+
+# file name: ops in the file, several files of several ops so that the merge has inner seams
+INI_FILES = {
+    "add.ini": _op_text("Add", extra="opInfo.inplaceOutputs=output0:input0\n") + _op_text("AddN"),
+    "sub.ini": _op_text("Sub") + _op_text("SquaredDifference") + _op_text("RealDiv"),
+    "tanh.ini": _op_text("Tanh", compute_cost=200),
+}
+
+
+def _write(file_path, text):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w") as f:
+        f.write(text)
+
+
+def _read_bytes(file_path):
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class _IniDirTest(unittest.TestCase):
+    """
+    ini files written into a temp dir, which is also the working dir of main()
+    """
+
+    def setUp(self):
+        self.work_dir = os.path.realpath(tempfile.mkdtemp())
+        self.ini_paths = []
+        for file_name, text in sorted(INI_FILES.items()):
+            self.ini_paths.append(self.write_ini(file_name, text))
+        cwd = os.getcwd()
+        os.chdir(self.work_dir)
+        self.addCleanup(os.chdir, cwd)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def write_ini(self, file_name, text):
+        ini_path = os.path.join(self.work_dir, INI_DIR, file_name)
+        _write(ini_path, text)
+        return ini_path
+
+    def run_main(self, *args):
+        with mock.patch.object(sys, "argv", ["parser_ini.py"] + list(args)):
+            return _quiet(parser_ini.main)
+
+    def out_path(self, name=OUT_FILE):
+        return os.path.join(self.work_dir, name)
+
+
+class TestCompileIniFiles(_IniDirTest):
+    """
+    the one pass mode writes the same bytes as the per file mode
+    """
+
+    def test_parallel_same_as_serial(self):
+        self.assertEqual(self.run_main("-x", "serial.json"), 0)
+        expect = _read_bytes(self.out_path("serial.json"))
+        self.assertEqual(len(json.loads(expect.decode())), 6)
+        for args in (["-j", "2"], ["-j", "0"], ["-j", "1"], ["-j", "2", "-i"], ["-i"]):
+            with self.subTest(args=args):
+                self.assertEqual(self.run_main(*(args + ["-x", OUT_FILE])), 0)
+                self.assertEqual(_read_bytes(self.out_path()), expect)
+                self.assertEqual(_read_bytes(self.out_path("aicpu_kernel.idx")),
+                                 _read_bytes(self.out_path("serial.idx")))
+
+    def test_parallel_same_as_serial_on_a_failure(self):
+        self.write_ini("bad.ini", _op_text("Bad", flag_async="maybe"))
+        for args in ([], ["-j", "2"], ["-i"]):
+            with self.subTest(args=args):
+                self.assertEqual(self.run_main(*(args + ["-r", "report.json", OUT_FILE])), 1)
+                self.assertFalse(os.path.exists(self.out_path()))
+                with open(self.out_path("report.json")) as f:
+                    report = json.load(f)
+                self.assertFalse(report.get("passed"))
+                self.assertEqual(report.get("op_count"), 7)
+                self.assertEqual([error.get("op_name") for error in report.get("errors")], ["Bad"])
+
+    def test_incremental_without_jobs(self):
+        self.assertEqual(self.run_main("-i", OUT_FILE), 0)
+        cache = parser_ini.IniBuildCache(self.out_path())
+        cache.load()
+        self.assertEqual(sorted(cache.entries), sorted(os.path.join(".", INI_DIR, name) for name in INI_FILES))
+
+    def test_duplicate_op(self):
+        copy_path = self.write_ini("tanh_copy.ini", _op_text("Tanh"))
+        report = _quiet(parser_ini.compile_ini_files, self.ini_paths + [copy_path], self.out_path(), jobs=2)
+        self.assertFalse(report.passed)
+        self.assertEqual([(error.op_name, error.message) for error in report.errors],
+                         [("Tanh", "op is already defined in %s" % self.ini_paths[-1])])
+        self.assertFalse(os.path.exists(self.out_path()))
+
+
+class TestIniBuildCache(_IniDirTest):
+    """
+    an ini file is reused while it keeps its mtime and size or its content hash
+    """
+
+    def compile(self, custom=False):
+        report = _quiet(parser_ini.compile_ini_files, self.ini_paths, self.out_path(), custom=custom, jobs=1,
+                        incremental=True)
+        self.assertTrue(report.passed)
+        with open(self.out_path()) as f:
+            return json.load(f)
+
+    def lookup(self, ini_path, custom=False):
+        cache = parser_ini.IniBuildCache(self.out_path(), custom)
+        cache.load()
+        return cache.lookup(ini_path)
+
+    def set_mtime(self, ini_path, delta_ns):
+        mtime_ns = os.stat(ini_path).st_mtime_ns + delta_ns
+        os.utime(ini_path, ns=(mtime_ns, mtime_ns))
+
+    def test_hit(self):
+        op_table = self.compile()
+        for ini_path in self.ini_paths:
+            cached = self.lookup(ini_path)
+            self.assertIsNotNone(cached)
+            self.assertTrue(set(cached).issubset(op_table))
+
+    def test_mtime_change_same_content_hits_by_hash(self):
+        self.compile()
+        self.set_mtime(self.ini_paths[0], 10 ** 9)
+        cache = parser_ini.IniBuildCache(self.out_path())
+        cache.load()
+        with mock.patch.object(parser_ini, "file_sha256", wraps=parser_ini.file_sha256) as sha256:
+            self.assertIsNotNone(cache.lookup(self.ini_paths[0]))
+            self.assertIsNotNone(cache.lookup(self.ini_paths[1]))
+        # the file of the same mtime and size is not hashed again
+        sha256.assert_called_once_with(self.ini_paths[0])
+        # the hit refreshes the mtime of the entry
+        cache.save(self.ini_paths)
+        self.assertEqual(cache.entries.get(self.ini_paths[0]).get("mtime"), os.stat(self.ini_paths[0]).st_mtime_ns)
+
+    def test_size_change_misses(self):
+        self.compile()
+        _write(self.ini_paths[0], INI_FILES.get("add.ini") + _op_text("AddV2"))
+        self.assertIsNone(self.lookup(self.ini_paths[0]))
+        self.assertIn("AddV2", self.compile())
+
+    def test_same_size_content_change_misses(self):
+        self.compile()
+        text = INI_FILES.get("tanh.ini")
+        _write(self.ini_paths[-1], text.replace("computeCost=200", "computeCost=300"))
+        self.set_mtime(self.ini_paths[-1], 10 ** 9)
+        self.assertEqual(os.path.getsize(self.ini_paths[-1]), len(text))
+        self.assertIsNone(self.lookup(self.ini_paths[-1]))
+        self.assertEqual(self.compile().get("Tanh").get("opInfo").get("computeCost"), "300")
+
+    def test_custom_flag_drops_cache(self):
+        self.compile()
+        self.assertIsNone(self.lookup(self.ini_paths[0], custom=True))
+
+    def test_outdated_cache_ignored(self):
+        self.compile()
+        cache = parser_ini.IniBuildCache(self.out_path())
+        with open(cache.cache_path) as f:
+            content = json.load(f)
+        content.get("stamp")["version"] = parser_ini.INI_CACHE_VERSION + 1
+        _write(cache.cache_path, json.dumps(content))
+        self.assertIsNone(self.lookup(self.ini_paths[0]))
+        _write(cache.cache_path, "{")
+        self.assertIsNone(self.lookup(self.ini_paths[0]))
+
+    def test_failed_file_not_cached(self):
+        bad_path = self.write_ini("bad.ini", _op_text("Bad", engine="DNN_VM_GPU"))
+        report = _quiet(parser_ini.compile_ini_files, [bad_path], self.out_path(), jobs=1, incremental=True)
+        self.assertFalse(report.passed)
+        self.assertIsNone(self.lookup(bad_path))
+        # the errors are reported again by the next run
+        report = _quiet(parser_ini.compile_ini_files, [bad_path], self.out_path(), jobs=1, incremental=True)
+        self.assertEqual(len(report.errors), 1)
+
+    def test_removed_file_evicted(self):
+        self.compile()
+        cache = parser_ini.IniBuildCache(self.out_path())
+        cache.load()
+        for ini_path in self.ini_paths:
+            cache.lookup(ini_path)
+        cache.save(self.ini_paths[1:])
+        self.assertIsNone(self.lookup(self.ini_paths[0]))
+        self.assertIsNotNone(self.lookup(self.ini_paths[1]))
+
+
+class TestOpInfoSchema(unittest.TestCase):
+    """
+    every problem of an op is reported, with its section
+    """
+
+    def setUp(self):
+        self.schema = parser_ini.OpInfoSchema()
+        self.good = {
+            "opInfo": {"engine": "DNN_VM_AICPU", "flagPartial": "False", "computeCost": "100", "flagAsync": "False",
+                       "opKernelLib": "CUSTAICPUKernel", "kernelSo": "libcust_aicpu_kernels.so",
+                       "functionName": "RunCpuKernel", "workspaceSize": "1024",
+                       "inplaceOutputs": "output0:input0,output0:input1"},
+            "input0": {"name": "x1", "type": "DT_FLOAT"},
+            "input1": {"name": "x2", "type": "DT_FLOAT"},
+            "output0": {"name": "y", "type": "DT_FLOAT"},
+        }
+
+    def errors(self, **sections):
+        op_info = json.loads(json.dumps(self.good))
+        for op_sec, sec_info in sections.items():
+            if sec_info is None:
+                op_info.pop(op_sec)
+            else:
+                op_info.setdefault(op_sec, {}).update(sec_info)
+        return list(self.schema.validate(op_info))
+
+    def test_good(self):
+        self.assertEqual(self.errors(), [])
+
+    def test_reject(self):
+        cases = [
+            ({"opInfo": {"engine": "DNN_VM_GPU"}}, "opInfo", "engine should be one of"),
+            ({"opInfo": {"opKernelLib": "GPUKernel"}}, "opInfo", "opKernelLib should be one of"),
+            ({"opInfo": {"flagAsync": "maybe"}}, "opInfo", "flagAsync should be a bool value"),
+            ({"opInfo": {"custom": "sure"}}, "opInfo", "custom should be a bool value"),
+            ({"input0": {"shape": "[1]"}}, "input0", "should has format type or name as the key"),
+            ({"attr0": {"name": "axis"}}, "attr0", "only opInfo, input[0-9], output[0-9]"),
+            ({"opInfo": {"inplaceOutputs": "output0=input0"}}, "opInfo", "inplaceOutputs should be a list of"),
+            ({"opInfo": {"inplaceOutputs": "output0:input2"}}, "opInfo", "inplaceOutputs refers to undefined input2"),
+        ]
+        for sections, section, message in cases:
+            with self.subTest(sections=sections):
+                errors = self.errors(**sections)
+                self.assertEqual(len(errors), 1, errors)
+                self.assertEqual(errors[0][0], section)
+                self.assertTrue(errors[0][1].startswith(message), errors[0][1])
+
+    def test_missing_keys(self):
+        op_info = {"opInfo": {"opKernelLib": "CUSTAICPUKernel", "engine": "DNN_VM_AICPU"}}
+        self.assertEqual(list(self.schema.validate(op_info)), [
+            ("opInfo", "opInfo missing: computeCost,flagAsync,flagPartial"),
+            ("opInfo", "CUSTAICPUKernel opInfo missing: kernelSo,functionName,workspaceSize"),
+        ])
+
+    def test_all_errors_reported(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        ini_path = os.path.join(work_dir, "bad.ini")
+        _write(ini_path, _op_text("Good") + _op_text("Bad1", flag_async="maybe", extra="attr0.name=axis\n") +
+               _op_text("Bad2", engine="DNN_VM_GPU"))
+        out_path = os.path.join(work_dir, OUT_FILE)
+        ini_parser = parser_ini.IniParser()
+        report = _quiet(ini_parser.parse, [ini_path], out_path)
+        self.assertEqual(report.op_count, 3)
+        self.assertEqual([(error.op_name, error.section) for error in report.errors],
+                         [("Bad1", "opInfo"), ("Bad1", "attr0"), ("Bad2", "opInfo")])
+        self.assertFalse(os.path.exists(out_path))
+
+    def test_bad_ini_format(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        ini_path = os.path.join(work_dir, "bad.ini")
+        _write(ini_path, "opInfo.engine=DNN_VM_AICPU\n")
+        report = _quiet(parser_ini.compile_ini_files, [ini_path], os.path.join(work_dir, OUT_FILE), jobs=1)
+        self.assertEqual([(error.ini_file, error.op_name) for error in report.errors], [(ini_path, "")])
+        self.assertTrue(report.errors[0].message.startswith("bad ini format"))
+
+
+class TestOpInfoIndex(unittest.TestCase):
+    """
+    lookups of the memory mapped op index give the ops of the json
+    """
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.op_table = {}
+        for text in INI_FILES.values():
+            ini_path = os.path.join(self.work_dir, "op.ini")
+            _write(ini_path, text)
+            self.op_table.update(parser_ini.IniParser.parse_ini_to_obj(ini_path))
+        self.op_table["Relué"] = {"opInfo": {"engine": "DNN_VM_AICPU"}, "dynamic_input0": {"name": "x"},
+                                       "dynamic_output0": {"name": "y"}}
+        self.index_path = os.path.join(self.work_dir, "aicpu_kernel.idx")
+        with open(self.index_path, "wb") as f:
+            f.write(parser_ini.pack_op_index(self.op_table))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_lookup(self):
+        with parser_ini.OpInfoIndex(self.index_path) as index:
+            self.assertEqual(len(index), len(self.op_table))
+            self.assertEqual(index.names(), sorted(self.op_table, key=lambda name: name.encode("utf-8")))
+            for op_name, op_info in self.op_table.items():
+                self.assertIn(op_name, index)
+                self.assertEqual(index.get(op_name), op_info)
+
+    def test_missing(self):
+        with parser_ini.OpInfoIndex(self.index_path) as index:
+            for op_name in ("", "A", "Ad", "AddV2", "Zeta", "add"):
+                self.assertNotIn(op_name, index)
+                self.assertIsNone(index.get(op_name))
+                self.assertIsNone(index.get_section_group(op_name, "inputs"))
+            self.assertEqual(index.get("Zeta", {}), {})
+
+    def test_section_group(self):
+        with parser_ini.OpInfoIndex(self.index_path) as index:
+            add_info = self.op_table.get("Add")
+            self.assertEqual(index.get_section_group("Add", "opInfo"), {"opInfo": add_info.get("opInfo")})
+            self.assertEqual(index.get_section_group("Add", "inputs"), {"input0": add_info.get("input0")})
+            self.assertEqual(index.get_section_group("Add", "outputs"), {"output0": add_info.get("output0")})
+            self.assertEqual(index.get_section_group("Relué", "inputs"), {"dynamic_input0": {"name": "x"}})
+
+    def test_empty(self):
+        with open(self.index_path, "wb") as f:
+            f.write(parser_ini.pack_op_index({}))
+        with parser_ini.OpInfoIndex(self.index_path) as index:
+            self.assertEqual(len(index), 0)
+            self.assertNotIn("Add", index)
+
+    def test_not_an_index(self):
+        with open(self.index_path, "wb") as f:
+            f.write(b"{\"Add\": {}}" + b"\0" * parser_ini.OP_INDEX_HEADER.size)
+        with self.assertRaises(ValueError):
+            parser_ini.OpInfoIndex(self.index_path)
+        with open(self.index_path, "wb") as f:
+            f.write(parser_ini.OP_INDEX_MAGIC)
+        with self.assertRaises(ValueError):
+            parser_ini.OpInfoIndex(self.index_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
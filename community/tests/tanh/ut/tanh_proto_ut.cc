@@ -0,0 +1,62 @@
+#include <iostream>
+#include <utility>
+#include <vector>
+
+#include "gtest/gtest.h"
+#include "tanh/op_proto/inc/tanh_op.h"
+
+namespace {
+ge::TensorDesc CreateDesc(const std::vector<int64_t> &dims, ge::DataType dtype,
+                          const std::vector<std::pair<int64_t, int64_t>> &range = {}) {
+  ge::TensorDesc desc(ge::Shape(dims), ge::FORMAT_ND, dtype);
+  desc.SetOriginShape(ge::Shape(dims));
+  desc.SetOriginFormat(ge::FORMAT_ND);
+  if (!range.empty()) {
+    desc.SetShapeRange(range);
+  }
+  return desc;
+}
+}  // namespace
+
+class tanh_proto_test : public testing::Test {
+protected:
+  static void SetUpTestCase() {
+    std::cout << "tanh_proto_test SetUp" << std::endl;
+  }
+
+  static void TearDownTestCase() {
+    std::cout << "tanh_proto_test TearDown" << std::endl;
+  }
+};
+
+TEST_F(tanh_proto_test, tanh_proto_test_static) {
+  ge::op::Tanh op;
+  op.UpdateInputDesc("x", CreateDesc({2, 3, 4}, ge::DT_FLOAT16));
+  EXPECT_EQ(op.InferShapeAndType(), ge::GRAPH_SUCCESS);
+  auto output_desc = op.GetOutputDescByName("y");
+  EXPECT_EQ(output_desc.GetDataType(), ge::DT_FLOAT16);
+  EXPECT_EQ(output_desc.GetShape().GetDims(), std::vector<int64_t>({2, 3, 4}));
+}
+
+TEST_F(tanh_proto_test, tanh_proto_test_dynamic) {
+  ge::op::Tanh op;
+  op.UpdateInputDesc("x", CreateDesc({-1, 4}, ge::DT_FLOAT, {{2, 10}, {4, 4}}));
+  EXPECT_EQ(op.InferShapeAndType(), ge::GRAPH_SUCCESS);
+  auto output_desc = op.GetOutputDescByName("y");
+  EXPECT_EQ(output_desc.GetShape().GetDims(), std::vector<int64_t>({-1, 4}));
+  // the origin shape follows the shape of an unknown output
+  EXPECT_EQ(output_desc.GetOriginShape().GetDims(), std::vector<int64_t>({-1, 4}));
+  std::vector<std::pair<int64_t, int64_t>> output_range;
+  EXPECT_EQ(output_desc.GetShapeRange(output_range), ge::GRAPH_SUCCESS);
+  std::vector<std::pair<int64_t, int64_t>> expect_range = {{2, 10}, {4, 4}};
+  EXPECT_EQ(output_range, expect_range);
+}
+
+TEST_F(tanh_proto_test, tanh_proto_test_unknown_rank) {
+  ge::op::Tanh op;
+  op.UpdateInputDesc("x", CreateDesc({-2}, ge::DT_FLOAT));
+  EXPECT_EQ(op.InferShapeAndType(), ge::GRAPH_SUCCESS);
+  auto output_desc = op.GetOutputDescByName("y");
+  EXPECT_EQ(output_desc.GetShape().GetDims(), std::vector<int64_t>({-2}));
+  EXPECT_EQ(output_desc.GetOriginShape().GetDims(), std::vector<int64_t>({-2}));
+}
@@ -3,10 +3,19 @@
 # Copyright Huawei Technologies Co., Ltd. 2010-2022. All rights reserved.
 import argparse
 import configparser
+import functools
+import hashlib
 import json
+import mmap
 import os
+import re
 import stat
+import struct
+import sys
+import tempfile
 from collections import defaultdict
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from distutils import util
 
 
@@ -16,33 +25,184 @@ COLOR_END = "\033[0m"
 COLOR_GREEN = "\033[91m"
 COLOR_RED = "\033[91m"
 CUSTOM_PREF = "custom"
+# Only the owner and group have rights
+JSON_FILE_MODE = stat.S_IWGRP + stat.S_IWUSR + stat.S_IRGRP + stat.S_IRUSR
+# bump when the cached op table layout changes
+INI_CACHE_VERSION = 1
+# binary op index beside the json: magic, version, entry size, op count, data offset
+OP_INDEX_SUFFIX = ".idx"
+OP_INDEX_MAGIC = b"AOPI"
+OP_INDEX_VERSION = 1
+OP_INDEX_HEADER = struct.Struct("<4sHHII")
+# name, opInfo, inputs, outputs: each as (offset, length) into the data area
+OP_INDEX_ENTRY = struct.Struct("<8I")
+
+
+def dump_op_table(info):
+    """
+    Serialize one op table the same way IniParser.write does
+    """
+    return json.dumps(info, sort_keys=True, indent=4, separators=(',', ':'))
+
+
+CheckIssue = namedtuple("CheckIssue", ["ini_file", "op_name", "section", "message"])
+
+
+class CheckReport(object):
+    """
+    All issues found while checking ini files, checking goes on after an error
+    so that one run reports every bad op
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.op_count = 0
+
+    @property
+    def passed(self):
+        return not self.errors
+
+    def add_error(self, ini_file, op_name, section, message):
+        self.errors.append(CheckIssue(ini_file, op_name, section, message))
+
+    def merge(self, other):
+        self.errors.extend(other.errors)
+        self.op_count += other.op_count
+
+    def to_dict(self):
+        return {"passed": self.passed, "op_count": self.op_count,
+                "errors": [issue._asdict() for issue in self.errors]}
+
+    def print_errors(self):
+        for issue in self.errors:
+            location = "op [%s] %s" % (issue.op_name, issue.section) if issue.op_name else "file"
+            print("%s## %s: %s: %s%s" % (COLOR_RED, issue.ini_file, location.strip(), issue.message, COLOR_END))
+        if self.errors:
+            print("%s%s errors found in %s ops, failed to generate json file%s" %
+                  (COLOR_BOLD, len(self.errors), len({(i.ini_file, i.op_name) for i in self.errors}), COLOR_END))
+
+
+class OpInfoSchema(object):
+    """
+    Declarative description of a valid ini op, the section names and values are checked
+    against precompiled patterns and sets
+    """
+    op_info_section = "opInfo"
+    io_section_pattern = re.compile(r"^(?:dynamic_)?(?:input|output)\d+$")
+    flag_key_pattern = re.compile(r"^flag[A-Z]\w*$")
+    required_op_info_keys = ("computeCost", "engine", "flagAsync", "flagPartial", "opKernelLib")
+    required_custom_op_info_keys = ("kernelSo", "functionName", "workspaceSize")
+    input_output_info_keys = frozenset(("format", "type", "name"))
+    allowed_op_info_values = {
+        "engine": frozenset(("DNN_VM_AICPU", "DNN_VM_AICPU_ASCEND", "DNN_VM_HOST_CPU")),
+        "opKernelLib": frozenset(("AICPUKernel", "CUSTAICPUKernel", "TFKernel", "CUSTTFKernel")),
+    }
+    bool_values = frozenset(("y", "yes", "t", "true", "on", "1", "n", "no", "f", "false", "off", "0"))
+    # outputs computed in place of an input of the same shape, eg. inplaceOutputs=output0:input0,output0:input1
+    inplace_key = "inplaceOutputs"
+    inplace_pair_pattern = re.compile(r"^(output\d+):(input\d+)$")
+
+    def validate_op_info(self, op_info):
+        """
+        Check the opInfo section, yield an error message for each problem
+        """
+        missing_keys = [k for k in self.required_op_info_keys if k not in op_info]
+        if missing_keys:
+            yield "opInfo missing: " + ",".join(missing_keys)
+        if op_info.get("opKernelLib") == "CUSTAICPUKernel":
+            missing_keys = [k for k in self.required_custom_op_info_keys if k not in op_info]
+            if missing_keys:
+                yield "CUSTAICPUKernel opInfo missing: " + ",".join(missing_keys)
+        for key, value in op_info.items():
+            allowed_values = self.allowed_op_info_values.get(key)
+            if allowed_values is not None and value not in allowed_values:
+                yield "%s should be one of %s, but getting %s" % (key, sorted(allowed_values), value)
+            elif (self.flag_key_pattern.match(key) or key == CUSTOM_PREF) and \
+                    str(value).lower() not in self.bool_values:
+                yield "%s should be a bool value, but getting %s" % (key, value)
+
+    def validate_inplace(self, op_info):
+        """
+        Check opInfo.inplaceOutputs, every pair names an output and an input of the op
+        """
+        value = op_info.get(self.op_info_section, {}).get(self.inplace_key)
+        if value is None:
+            return
+        for pair in value.split(","):
+            match = self.inplace_pair_pattern.match(pair.strip())
+            if match is None:
+                yield "%s should be a list of output<n>:input<m>, but getting %s" % (self.inplace_key, value)
+                return
+            # ops declaring no input/output section are checked by the kernel only
+            if any(self.io_section_pattern.match(op_sec) for op_sec in op_info):
+                missing_sections = [sec for sec in match.groups() if sec not in op_info]
+                if missing_sections:
+                    yield "%s refers to undefined %s" % (self.inplace_key, ",".join(missing_sections))
+
+    def validate_io(self, io_sec_info):
+        """
+        Check input/output section for op, if defined other than ('format', 'type', 'name') maybe
+        """
+        unknown_keys = set(io_sec_info.keys()).difference(self.input_output_info_keys)
+        if unknown_keys:
+            yield "should has format type or name as the key, but getting %s" % sorted(unknown_keys)
+
+    def validate(self, op_info):
+        """
+        Check one op, yield (section, message) for each problem
+        """
+        for op_sec, sec_info in op_info.items():
+            if op_sec == self.op_info_section:
+                messages = self.validate_op_info(sec_info)
+            elif self.io_section_pattern.match(op_sec):
+                messages = self.validate_io(sec_info)
+            else:
+                messages = ["only opInfo, input[0-9], output[0-9], dynamic_input[0-9], dynamic_output[0-9] "
+                            "can be used as a key"]
+            for message in messages:
+                yield op_sec, message
+        for message in self.validate_inplace(op_info):
+            yield self.op_info_section, message
+
+
+OP_INFO_SCHEMA = OpInfoSchema()
 
 
 class IniParser(object):
     """
     initial parser class
     """
-    required_op_info_keys = ["computeCost", "engine", "flagAsync", "flagPartial", "opKernelLib"]
-    required_custom_op_info_keys = ["kernelSo", "functionName", "workspaceSize"]
-    input_output_info_keys = {'format', 'type', 'name'}  # set for difference
 
-    def __init__(self):
+    def __init__(self, schema=OP_INFO_SCHEMA):
+        self.schema = schema
         self.aicpu_ops_info = None
         self.custom_ops_info = None
         self.custom_flag = False
         self.warn_print = False
         self.warning_ops = defaultdict(list)
+        self.report = CheckReport()
+
+    @property
+    def check_passed(self):
+        return self.report.passed
 
     def load_ini_info(self, ini_files):
         """
         Load config info from ini files, store in class struct: self.aicpu_ops_info
+        Every op is checked as soon as it is read
         """
         for ini_file in ini_files:
-            self.parse_ini_to_obj(ini_file)
+            try:
+                for op_name, op_info in self.parse_ini_to_obj(ini_file):
+                    self.aicpu_ops_info[op_name] = op_info
+                    self.check_op(ini_file, op_name, op_info)
+            except configparser.Error as e:
+                self.report.add_error(ini_file, "", "", "bad ini format: %s" % e.message)
 
-    def parse_ini_to_obj(self, ini_file):
+    @staticmethod
+    def parse_ini_to_obj(ini_file):
         """
-        Parse specific ini file
+        Parse specific ini file, yield (op name, op info) for each op
         """
         cfg = configparser.ConfigParser()
         cfg.optionxform = str
@@ -51,7 +211,7 @@ class IniParser(object):
 
         # config file section is op name, eg. "Add", "Cast"
         for op in cfg.sections():
-            self.aicpu_ops_info[op] = {}
+            op_info = {}
             # option in op is configuration for op, eg. opInfo.engine=DNN_VM_AICPU
             for opt in cfg.options(op):
                 if len(opt.split(".")) != 2:
@@ -59,92 +219,49 @@ class IniParser(object):
                     continue
                 # one opt_sec will include serval info, eg. opInfo: {"engine": xxx, "flagAsync": xxx, ...}
                 opt_sec, opt_subsec = opt.split(".")
-                if opt_sec not in self.aicpu_ops_info.get(op):
-                    self.aicpu_ops_info.get(op)[opt_sec] = {opt_subsec: cfg[op][opt]}
-                else:
-                    self.aicpu_ops_info.get(op)[opt_sec].update({opt_subsec: cfg[op][opt]})
+                op_info.setdefault(opt_sec, {})[opt_subsec] = cfg[op][opt]
+            yield op, op_info
 
-    def check_custom_op_info(self, op_name, op_info):
+    def check_op(self, ini_file, op_name, op_info):
         """
-        Check aicpu_cust_kernel.ini op definition
+        Check one op against self.schema, problems are added into self.report:
+        1. if defined CUSTAICPUKernel: opInfo.userDefined is set
+        2. if defined custom(来自众智）, will copy op define into self.custom_ops_info
+        3. ops without opInfo or input/output section are recorded in self.warning_ops
         """
-        missing_keys = [k for k in self.required_custom_op_info_keys if k not in op_info]
-        if len(missing_keys) > 0:
-            print("op: " + op_name + " opInfo missing: " + ",".join(missing_keys))
-            raise KeyError("bad key value")
-        self.aicpu_ops_info.get(op_name)["opInfo"]["userDefined"] = True
+        self.report.op_count += 1
+        op_report = CheckReport()
+        for op_sec, message in self.schema.validate(op_info):
+            op_report.add_error(ini_file, op_name, op_sec, message)
+        self.report.merge(op_report)
+        if not op_report.passed:
+            return
 
-    def check_op_info(self, op_name, op_info):
-        """
-        Check op info:
-        1. if all required section is defined
-        2. if defined CUSTAICPUKernel: will do specific check with check_custom_op_info
-        3. if defined custom(来自众智）, will copy op define into self.custom_ops_info
-        """
-        missing_keys = [k for k in self.required_op_info_keys if k not in op_info]
-        if len(missing_keys) > 0:
-            print("op: " + op_name + " opInfo missing: " + ",".join(missing_keys))
-            raise KeyError("bad key value")
-
-        if op_info["opKernelLib"] == "CUSTAICPUKernel":
-            self.check_custom_op_info(op_name, op_info)
-
-        if CUSTOM_PREF in op_info:
-            custom_set = op_info.get(CUSTOM_PREF)
+        op_sec_info = op_info.get(self.schema.op_info_section)
+        if op_sec_info is None:
+            if self.warn_print:
+                print("%s\t## OP %s: defined missing opInfo section %s" % (COLOR_RED, op_name, COLOR_END))
+            self.warning_ops["opInfo"].append(op_name)
+        else:
+            if op_sec_info.get("opKernelLib") == "CUSTAICPUKernel":
+                op_sec_info["userDefined"] = True
             # NOTE: do not use bool(xxx) here, bool('False') returns True
-            if bool(util.strtobool(custom_set)):
-                self.custom_ops_info[op_name] = self.aicpu_ops_info.get(op_name)
-
-    def check_op_input_output(self, io_sec_info):
-        """
-        Check input/output section for op, if defined other than ('format', 'type', 'name') maybe
-        """
-        subset = set(io_sec_info.keys()).difference(self.input_output_info_keys)
-        return not subset
+            if CUSTOM_PREF in op_sec_info and bool(util.strtobool(op_sec_info.get(CUSTOM_PREF))):
+                self.custom_ops_info[op_name] = op_info
+        if not any(self.schema.io_section_pattern.match(op_sec) for op_sec in op_info):
+            if self.warn_print:
+                print("%s\t## OP %s: defined missing input/output section %s" % (COLOR_CYAN, op_name, COLOR_END))
+            self.warning_ops["io"].append(op_name)
 
-    def check_op_info_setting(self):
+    def finish_check(self):
         """
-        Check ini op info setting correct or enough
         If custom op found and self.custom_flag not set, will remove these op out from aicpu_ops_info
         """
-        print("\n==============check valid for aicpu ops info start==============")
-        for op_name, op_info in self.aicpu_ops_info.items():
-            op_info_flag = False
-            op_io_flag = False
-            for op_sec, sec_info in op_info.items():
-                if op_sec == "opInfo":
-                    self.check_op_info(op_name, sec_info)
-                    op_info_flag = True
-
-                elif (op_sec[:5] == "input" and op_sec[5:].isdigit()) or \
-                        (op_sec[:6] == "output" and op_sec[6:].isdigit()) or \
-                        (op_sec[:13] == "dynamic_input" and op_sec[13:].isdigit()) or \
-                        (op_sec[:14] == "dynamic_output" and op_sec[14:].isdigit()):
-                    ret = self.check_op_input_output(sec_info)
-                    if not ret:
-                        print("## %s: %s should has format type or name as the key, but getting %s" %
-                              (op_name, op_sec, sec_info))
-                        raise KeyError("bad op_sets key")
-                    op_io_flag = False
-
-                else:
-                    print("Only opInfo, input[0-9], output[0-9] can be used as a key, "
-                          "but op %s has the key %s" % (op_name, op_sec))
-                    raise KeyError("bad key value")
-            if not op_info_flag:
-                if self.warn_print:
-                    print("%s\t## OP %s: defined missing opInfo section %s" % (COLOR_RED, op_name, COLOR_END))
-                self.warning_ops["opInfo"].append(op_name)
-            if not op_io_flag:
-                if self.warn_print:
-                    print("%s\t## OP %s: defined missing input/output section %s" % (COLOR_CYAN, op_name, COLOR_END))
-                self.warning_ops["io"].append(op_name)
         # if custom flag is set, we will push all custom op in the aicpu_op_info
         # else we will remove them, and push into individual custom json
         if not self.custom_flag:
             for op_name in self.custom_ops_info:
                 del self.aicpu_ops_info[op_name]
-        print("==============check valid for aicpu ops info end================\n")
 
     def write(self, json_file_path):
         """
@@ -152,9 +269,8 @@ class IniParser(object):
         """
         def _write(info, file):
             with open(file, "a+") as f:
-                # Only the owner and group have rights
-                os.chmod(file, stat.S_IWGRP + stat.S_IWUSR + stat.S_IRGRP + stat.S_IRUSR)
-                json.dump(info, f, sort_keys=True, indent=4, separators=(',', ':'))
+                os.chmod(file, JSON_FILE_MODE)
+                f.write(dump_op_table(info))
 
         json_file_real_path = os.path.realpath(json_file_path)
         _write(self.aicpu_ops_info, json_file_real_path)
@@ -168,6 +284,32 @@ class IniParser(object):
         # else:
         #     print("### Custom flag is set, all custom ops have been integrated into: %s" % json_file_real_path)
 
+    def print_warnings(self):
+        """
+        Print the ops collected into self.warning_ops during check
+        """
+        if self.warning_ops and self.warn_print:
+            print(COLOR_BOLD + "=" * 80 + COLOR_END)
+            for warn_type, warn_ops in self.warning_ops.items():
+                print("\tNo \"%s\" ops set: %s" % (warn_type, warn_ops))
+
+    def collect(self, ini_paths: list, custom=False):
+        """
+        Get info from ini files and check it, without writing anything
+        :param ini_paths: op configuration files
+        :param custom: same as parse
+        :return: the checked op table, it should not be used if self.report did not pass
+        """
+        self.aicpu_ops_info = {}
+        self.custom_ops_info = {}
+        self.custom_flag = custom
+        self.report = CheckReport()
+        print("\n==============check valid for aicpu ops info start==============")
+        self.load_ini_info(ini_paths)
+        self.finish_check()
+        print("==============check valid for aicpu ops info end================\n")
+        return self.aicpu_ops_info
+
     def parse(self, ini_paths: list, out_file_path, custom=False):
         """
         Total parse function: get info from ini files, write into out_file(in json)
@@ -175,22 +317,342 @@ class IniParser(object):
         :param out_file_path: output write path, using json format
         :param custom: if custom True, will merge custom ops into the same json file,
                        if custom False, will split custom ops into the corresponding json
+        :return: CheckReport of the ini files, nothing is written if it did not pass
         """
-        self.aicpu_ops_info = {}
-        self.custom_ops_info = {}
-        self.custom_flag = custom
-        self.load_ini_info(ini_paths)
-        try:
-            self.check_op_info_setting()
-        except KeyError as e:
-            print("bad format key value, failed to generate json file, detail info: \n%s" % e)
-        finally:
+        self.collect(ini_paths, custom)
+        if self.check_passed:
             self.write(out_file_path)
-            if self.warning_ops and self.warn_print:
-                print(COLOR_BOLD + "=" * 80 + COLOR_END)
-                for warn_type, warn_ops in self.warning_ops.items():
-                    print("\tNo \"%s\" ops set: %s" % (warn_type, warn_ops))
-            print("parse try except normal")
+        else:
+            self.report.print_errors()
+        self.print_warnings()
+        return self.report
+
+
+def parse_ini_fragment(ini_file, custom=False):
+    """
+    Parse and check a single ini file, worker of compile_ini_files
+    :return: (op table, CheckReport)
+    """
+    ini_parser = IniParser()
+    op_table = ini_parser.collect([ini_file], custom=custom)
+    ini_parser.print_warnings()
+    return op_table, ini_parser.report
+
+
+def file_sha256(file_path):
+    """
+    Content hash of a file
+    """
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class IniBuildCache(object):
+    """
+    Persistent cache of checked op tables beside the output json, one entry per ini file.
+    An entry is reused when the ini file keeps its mtime and size, or its content hash.
+    The whole cache is dropped when the custom flag or this script changes.
+    """
+
+    def __init__(self, json_file_path, custom=False):
+        json_file_real_path = os.path.realpath(json_file_path)
+        self.cache_path = os.path.join(os.path.dirname(json_file_real_path),
+                                       ".%s.cache" % os.path.basename(json_file_real_path))
+        self.stamp = {"version": INI_CACHE_VERSION, "custom": custom, "parser": file_sha256(__file__)}
+        self.entries = {}
+        self.fingerprints = {}
+        self.hits = 0
+
+    def load(self):
+        """
+        Load cache entries from disk, an unreadable or outdated cache is ignored
+        """
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(cache, dict) and cache.get("stamp") == self.stamp:
+            self.entries = cache.get("entries", {})
+
+    def lookup(self, ini_file):
+        """
+        Get the cached op table of ini_file, None if it is new or changed
+        """
+        file_stat = os.stat(ini_file)
+        fingerprint = {"mtime": file_stat.st_mtime_ns, "size": file_stat.st_size}
+        entry = self.entries.get(ini_file)
+        if entry is not None and entry.get("mtime") == fingerprint.get("mtime") and \
+                entry.get("size") == fingerprint.get("size"):
+            fingerprint["sha256"] = entry.get("sha256")
+        else:
+            fingerprint["sha256"] = file_sha256(ini_file)
+        self.fingerprints[ini_file] = fingerprint
+        if entry is None or entry.get("sha256") != fingerprint.get("sha256"):
+            return None
+        self.hits += 1
+        return entry.get("op_table")
+
+    def update(self, ini_file, op_table):
+        """
+        Record the op table of a looked up ini file
+        """
+        entry = dict(self.fingerprints.get(ini_file))
+        entry["op_table"] = op_table
+        self.entries[ini_file] = entry
+
+    def save(self, ini_files):
+        """
+        Write the cache back, entries of ini files not in ini_files are evicted
+        """
+        entries = {}
+        for ini_file in ini_files:
+            entry = self.entries.get(ini_file)
+            if entry is None:
+                continue
+            # refresh mtime of entries which were hit by content hash
+            entry.update(self.fingerprints.get(ini_file, {}))
+            entries[ini_file] = entry
+        self.entries = entries
+        write_file_atomic(json.dumps({"stamp": self.stamp, "entries": entries}), self.cache_path)
+
+
+def merge_op_tables(op_tables):
+    """
+    Render per file op tables into one json text.
+    The layout is kept identical to appending every table into the same file
+    and replacing each "}{" seam with ",", as the per file mode does.
+    """
+    dumps = [dump_op_table(op_table) for op_table in op_tables]
+    if not dumps:
+        return ""
+    if len(dumps) == 1:
+        return dumps[0]
+    return ",".join([dumps[0][:-1]] + [dump[1:-1] for dump in dumps[1:-1]] + [dumps[-1][1:]])
+
+
+def write_file_atomic(content, file_path):
+    """
+    Write text or bytes into a temp file beside file_path, then rename it over the target
+    """
+    file_real_path = os.path.realpath(file_path)
+    fd, tmp_path = tempfile.mkstemp(prefix=".%s." % os.path.basename(file_real_path),
+                                    dir=os.path.dirname(file_real_path))
+    try:
+        with os.fdopen(fd, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+        os.chmod(tmp_path, JSON_FILE_MODE)
+        os.replace(tmp_path, file_real_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return file_real_path
+
+
+def index_file_path_of(json_file_path):
+    """
+    The op index is written beside the json, eg. aicpu_kernel.json -> aicpu_kernel.idx
+    """
+    return os.path.splitext(json_file_path)[0] + OP_INDEX_SUFFIX
+
+
+def pack_op_index(op_table):
+    """
+    Pack an op table into the binary layout read by OpInfoIndex:
+    header | sorted op entries | op names | op records
+    every op record is opInfo, inputs and outputs sections, each in compact json
+    """
+    names = sorted(op_name.encode("utf-8") for op_name in op_table)
+    data_offset = OP_INDEX_HEADER.size + OP_INDEX_ENTRY.size * len(names)
+    entries = bytearray()
+    data = bytearray()
+
+    def _append(blob):
+        offset = data_offset + len(data)
+        data.extend(blob)
+        return offset, len(blob)
+
+    for name in names:
+        op_info = op_table.get(name.decode("utf-8"))
+        entry = list(_append(name))
+        for section_group in OpInfoIndex.section_groups:
+            record = {op_sec: sec_info for op_sec, sec_info in op_info.items()
+                      if OpInfoIndex.section_group_of(op_sec) == section_group}
+            entry.extend(_append(json.dumps(record, sort_keys=True, separators=(',', ':')).encode("utf-8")))
+        entries.extend(OP_INDEX_ENTRY.pack(*entry))
+    header = OP_INDEX_HEADER.pack(OP_INDEX_MAGIC, OP_INDEX_VERSION, OP_INDEX_ENTRY.size, len(names), data_offset)
+    return bytes(header + entries + data)
+
+
+class OpInfoIndex(object):
+    """
+    Reader of the op index written by pack_op_index.
+    The file is memory mapped, looking up an op is a binary search on the sorted entries
+    and only decodes the records of that op.
+    """
+    section_groups = ("opInfo", "inputs", "outputs")
+
+    def __init__(self, index_file_path):
+        with open(index_file_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, entry_size, self._count, _ = OP_INDEX_HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            self.close()
+            raise ValueError("%s is not an op index file" % index_file_path)
+        if magic != OP_INDEX_MAGIC or version != OP_INDEX_VERSION or entry_size != OP_INDEX_ENTRY.size:
+            self.close()
+            raise ValueError("%s is not an op index file of version %s" % (index_file_path, OP_INDEX_VERSION))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, op_name):
+        return self._find(op_name) is not None
+
+    @staticmethod
+    def section_group_of(op_sec):
+        """
+        opInfo, inputs or outputs, the record an op section is packed into
+        """
+        if op_sec.startswith("input") or op_sec.startswith("dynamic_input"):
+            return "inputs"
+        if op_sec.startswith("output") or op_sec.startswith("dynamic_output"):
+            return "outputs"
+        return "opInfo"
+
+    def close(self):
+        self._mm.close()
+
+    def names(self):
+        """
+        All op names, in sorted order
+        """
+        return [self._read(*self._entry(i)[:2]).decode("utf-8") for i in range(self._count)]
+
+    def get(self, op_name, default=None):
+        """
+        Get the op info of op_name, same as its value in aicpu_kernel.json
+        """
+        entry = self._find(op_name)
+        if entry is None:
+            return default
+        op_info = {}
+        for group_index in range(len(self.section_groups)):
+            op_info.update(self._record(entry, group_index))
+        return op_info
+
+    def get_section_group(self, op_name, section_group):
+        """
+        Get only one record of op_name, eg. get_section_group("Add", "inputs")
+        """
+        entry = self._find(op_name)
+        if entry is None:
+            return None
+        return self._record(entry, self.section_groups.index(section_group))
+
+    def _entry(self, index):
+        return OP_INDEX_ENTRY.unpack_from(self._mm, OP_INDEX_HEADER.size + OP_INDEX_ENTRY.size * index)
+
+    def _read(self, offset, length):
+        return self._mm[offset:offset + length]
+
+    def _record(self, entry, group_index):
+        offset, length = entry[2 + 2 * group_index:4 + 2 * group_index]
+        return json.loads(self._read(offset, length).decode("utf-8"))
+
+    def _find(self, op_name):
+        key = op_name.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            entry = self._entry(mid)
+            name = self._read(*entry[:2])
+            if name == key:
+                return entry
+            if name < key:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+
+def compile_ini_files(ini_paths: list, out_file_path, custom=False, jobs=None, incremental=False,
+                      with_index=False):
+    """
+    Parse ini files in a process pool, merge them in memory and write out_file in one pass
+    :param ini_paths: op configuration files, the output keeps this order
+    :param out_file_path: output write path, using json format
+    :param custom: same as IniParser.parse
+    :param jobs: worker process number, None means os.cpu_count()
+    :param incremental: if True, only ini files changed since the last run are parsed,
+                        the others are taken from IniBuildCache
+    :param with_index: if True, also write the binary op index, see index_file_path_of
+    :return: CheckReport of all the ini files, out_file is only written if it passed
+    """
+    op_tables = [None] * len(ini_paths)
+    build_cache = None
+    if incremental:
+        build_cache = IniBuildCache(out_file_path, custom)
+        build_cache.load()
+        op_tables = [build_cache.lookup(ini_path) for ini_path in ini_paths]
+    stale_paths = [ini_path for ini_path, op_table in zip(ini_paths, op_tables) if op_table is None]
+
+    worker = functools.partial(parse_ini_fragment, custom=custom)
+    if jobs == 1 or len(stale_paths) <= 1:
+        results = [worker(ini_path) for ini_path in stale_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(worker, stale_paths))
+
+    report = CheckReport()
+    parsed = dict(zip(stale_paths, results))
+    op_files = {}
+    for index, ini_path in enumerate(ini_paths):
+        if ini_path in parsed:
+            op_table, file_report = parsed.get(ini_path)
+            op_tables[index] = op_table
+            report.merge(file_report)
+            # a failed file is parsed again next time so its errors are reported again
+            if build_cache is not None and file_report.passed:
+                build_cache.update(ini_path, op_table)
+        else:
+            report.op_count += len(op_tables[index])
+        for op_name in op_tables[index]:
+            if op_name in op_files:
+                report.add_error(ini_path, op_name, "", "op is already defined in %s" % op_files.get(op_name))
+            op_files.setdefault(op_name, ini_path)
+    if build_cache is not None:
+        build_cache.save(ini_paths)
+        print(">>>> Reuse %s of %s ini files from cache: %s" %
+              (build_cache.hits, len(ini_paths), build_cache.cache_path))
+
+    if not report.passed:
+        report.print_errors()
+        return report
+    json_file_real_path = write_file_atomic(merge_op_tables(op_tables), out_file_path)
+    print(">>>> Found %s AICPU ops in %s ini files, write into: %s" %
+          (sum(len(op_table) for op_table in op_tables), len(ini_paths), json_file_real_path))
+    if with_index:
+        merged_op_table = {}
+        for op_table in op_tables:
+            merged_op_table.update(op_table)
+        write_op_index(merged_op_table, json_file_real_path)
+    return report
+
+
+def write_op_index(op_table, json_file_path):
+    """
+    Write the binary op index of op_table beside json_file_path
+    """
+    index_file_real_path = write_file_atomic(pack_op_index(op_table), index_file_path_of(json_file_path))
+    print(">>>> Write index of %s AICPU ops into: %s" % (len(op_table), index_file_real_path))
 
 
 def replace_file_char(file_path, obj_str, new_str):
@@ -215,6 +677,22 @@ def main():
         "-c", "--custom", action="store_true",
         help="Custom op compiled in"
     )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Parse ini files in JOBS processes (0 for all cores) and write the json in one pass"
+    )
+    parser.add_argument(
+        "-i", "--incremental", action="store_true",
+        help="Only parse ini files changed since the last run, in one process unless --jobs is given"
+    )
+    parser.add_argument(
+        "-r", "--report",
+        help="Write the check result of all ini files into REPORT in json format"
+    )
+    parser.add_argument(
+        "-x", "--index", action="store_true",
+        help="Also write a binary op index beside the json, eg. aicpu_kernel.idx"
+    )
     parser.add_argument(
         "FILES", nargs='*',
         help=argparse.SUPPRESS
@@ -232,17 +710,39 @@ def main():
     # if len(ini_file_paths) == 0:
     #     ini_file_paths.append("tf_kernel.ini")
     print("outfile_path=======",outfile_path)
-    if (os.path.exists(outfile_path)):
-        os.remove(outfile_path)
+    op_ini_paths = []
     for (dirname, subs, files) in os.walk('.'):
         for fname in files:
             file_path = os.path.join(dirname, fname)
             if file_path.endswith(".ini") and "cpu" in file_path:
-                ini_parser = IniParser()
-                ini_parser.parse([file_path], outfile_path, custom=args.custom)
+                op_ini_paths.append(file_path)
+
+    if args.jobs is not None or args.incremental:
+        # the cache is kept by compile_ini_files, --incremental alone parses the changed files one by one
+        jobs = 1 if args.jobs is None else args.jobs or None
+        report = compile_ini_files(op_ini_paths, outfile_path, custom=args.custom, jobs=jobs,
+                                   incremental=args.incremental, with_index=args.index)
+    else:
+        if (os.path.exists(outfile_path)):
+            os.remove(outfile_path)
+        report = CheckReport()
+        for file_path in op_ini_paths:
+            ini_parser = IniParser()
+            report.merge(ini_parser.parse([file_path], outfile_path, custom=args.custom))
+
+        if report.passed:
+            replace_file_char(outfile_path,"}{",",")
+            if args.index:
+                with open(outfile_path, "r") as f:
+                    write_op_index(json.load(f), outfile_path)
+        elif os.path.exists(outfile_path):
+            # do not leave the ops of the good files behind as if they were all
+            os.remove(outfile_path)
 
-    replace_file_char(outfile_path,"}{",",")
+    if args.report:
+        write_file_atomic(json.dumps(report.to_dict(), indent=4), args.report)
+    return 0 if report.passed else 1
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())